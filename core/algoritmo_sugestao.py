@@ -10,21 +10,23 @@ Calcula o número ideal de questões por tema considerando:
 """
 
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence
 import sys
 from pathlib import Path
 
+import numpy as np
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.helpers import (
-    carregar_config, carregar_pesos, carregar_temas,
-    carregar_estudo, carregar_calendario, obter_rodizio_atual,
-    calcular_semanas_ate_prova
-)
+from utils.helpers import obter_rodizio_atual, calcular_semanas_ate_prova
 from utils.constants import (
-    MULTIPLICADORES, BONUS_RODIZIO_ATUAL, FATOR_MARGEM,
+    BONUS_RODIZIO_ATUAL, FATOR_MARGEM,
     META_QUESTOES_SEMANA, DISTRIBUICAO_REVISOES
 )
+from core.contexto import ContextoDados
+from core.classificador_yield import obter_classificador
+from core.catalogo_temas import obter_catalogo_temas
+from core.ids_temas import obter_mapa_pesos
 
 
 class AlgoritmoSugestao:
@@ -35,12 +37,15 @@ class AlgoritmoSugestao:
     questoes_tema = base * peso_area * multiplicador_yield * fator_performance * bonus_rodizio
     """
     
-    def __init__(self):
-        self.config = carregar_config()
-        self.pesos = carregar_pesos()
-        self.temas = carregar_temas()
-        self.estudo = carregar_estudo()
-        self.calendario = carregar_calendario()
+    def __init__(self, contexto: Optional[ContextoDados] = None):
+        contexto = contexto or ContextoDados()
+        
+        self.contexto = contexto
+        self.config = contexto.config
+        self.pesos = contexto.pesos
+        self.temas = contexto.temas
+        self.estudo = contexto.estudo
+        self.calendario = contexto.calendario
         
         # Configurações do usuário
         self.nota_meta = self.config.get("metas", {}).get("nota_meta", 90)
@@ -59,21 +64,25 @@ class AlgoritmoSugestao:
         """
         Retorna o multiplicador baseado na classificação High/Low Yield.
         """
-        # Verificar se é high-yield
-        high_yield_temas = self.pesos.get("temas_high_yield", {}).get(grande_area, [])
-        
-        for hy_tema in high_yield_temas:
-            if hy_tema.lower() in tema.lower() or tema.lower() in hy_tema.lower():
-                return MULTIPLICADORES["high_yield"]
-        
-        # Verificar se é low-yield
-        low_yield_temas = self.pesos.get("temas_low_yield", [])
+        return obter_classificador(self.pesos).classificar(tema, grande_area)[1]
+    
+    def _performance_anterior(self, tema_key: str, numero_revisao: int, media_diagnostico: float) -> float:
+        """Performance (%) que orienta a revisão: diagnóstico na 1ª, revisão anterior nas demais."""
+        if numero_revisao == 1:
+            return media_diagnostico
         
-        for ly_tema in low_yield_temas:
-            if ly_tema.lower() in tema.lower():
-                return MULTIPLICADORES["low_yield"]
+        registro_tema = self.estudo.get("registro_temas", {}).get(tema_key, {})
+        dados_rev = registro_tema.get(f"r{numero_revisao - 1}", {})
         
-        return MULTIPLICADORES["normal"]
+        if dados_rev.get("questoes") and dados_rev.get("acertos"):
+            return (dados_rev["acertos"] / dados_rev["questoes"]) * 100
+        return 50  # Assumir média se não houver dados
+    
+    def _media_diagnostico(self) -> float:
+        """Média do diagnóstico inicial (50 se não houver)."""
+        diag = self.config.get("diagnostico_inicial", {})
+        valores = [v for v in diag.values() if v is not None]
+        return sum(valores) / len(valores) if valores else 50
     
     def calcular_fator_performance(
         self, 
@@ -87,45 +96,10 @@ class AlgoritmoSugestao:
         - Performance média (60-80%): mantém (fator = 1)
         - Performance alta (> 80%): reduz questões (fator < 1)
         """
-        registro_tema = self.estudo.get("registro_temas", {}).get(tema_key, {})
-        
-        if numero_revisao == 1:
-            # Usar diagnóstico inicial
-            diag = self.config.get("diagnostico_inicial", {})
-            # Pegar média do diagnóstico
-            valores = [v for v in diag.values() if v is not None]
-            performance = sum(valores) / len(valores) if valores else 50
-        else:
-            # Usar performance da revisão anterior
-            rev_anterior = f"r{numero_revisao - 1}"
-            dados_rev = registro_tema.get(rev_anterior, {})
-            
-            if dados_rev.get("questoes") and dados_rev.get("acertos"):
-                performance = (dados_rev["acertos"] / dados_rev["questoes"]) * 100
-            else:
-                performance = 50  # Assumir média se não houver dados
-        
-        # Calcular fator
-        if performance < 50:
-            return 1.5  # Aumentar bastante
-        elif performance < 60:
-            return 1.3
-        elif performance < 70:
-            return 1.1
-        elif performance < 80:
-            return 1.0
-        elif performance < 90:
-            return 0.9
-        else:
-            return 0.7  # Reduzir para temas dominados
+        performance = self._performance_anterior(tema_key, numero_revisao, self._media_diagnostico())
+        return float(_fatores_performance(np.array([performance]))[0])
     
-    def verificar_bonus_rodizio(self, tema: str, grande_area: str) -> float:
-        """
-        Verifica se o tema está relacionado ao rodízio atual.
-        Retorna o bônus de 20% se estiver.
-        """
-        rodizio_atual = obter_rodizio_atual(self.calendario)
-        
+    def _bonus_rodizio(self, rodizio_atual: Optional[Dict[str, Any]], tema: str, grande_area: str) -> float:
         if not rodizio_atual:
             return 1.0
         
@@ -141,11 +115,19 @@ class AlgoritmoSugestao:
         
         return 1.0
     
+    def verificar_bonus_rodizio(self, tema: str, grande_area: str) -> float:
+        """
+        Verifica se o tema está relacionado ao rodízio atual.
+        Retorna o bônus de 20% se estiver.
+        """
+        rodizio_atual = obter_rodizio_atual(self.calendario, self.contexto.agora)
+        return self._bonus_rodizio(rodizio_atual, tema, grande_area)
+    
     def calcular_base_questoes(self) -> int:
         """
         Calcula a base de questões por tema baseado no modo de estudo.
         """
-        semanas = calcular_semanas_ate_prova(self.data_prova)
+        semanas = calcular_semanas_ate_prova(self.data_prova, self.contexto.agora)
         
         if self.modo == "focado_resultado":
             # Calcular baseado na meta de nota
@@ -168,6 +150,96 @@ class AlgoritmoSugestao:
         
         return max(20, base)  # Mínimo de 20 questões
     
+    def calcular_sugestoes_lote(self, itens: Sequence[Sequence[Any]]) -> Dict[str, np.ndarray]:
+        """
+        Calcula sugestões e prioridades de vários temas de uma só vez.
+        
+        Cada item é (tema, grande_area[, numero_revisao[, tema_key]]), com
+        numero_revisao 1 e tema_key = tema por padrão. A base de questões,
+        o rodízio atual e o diagnóstico são calculados uma única vez, e a
+        fórmula é aplicada a arrays (mesma ordem de operações do cálculo
+        por tema, portanto com resultados idênticos).
+        
+        Retorna arrays alinhados aos itens: questoes_sugeridas, base,
+        peso_area, multiplicador_yield, is_high_yield, fator_performance,
+        bonus_rodizio, percentual_revisao, numero_revisao e prioridade.
+        """
+        n = len(itens)
+        classificador = obter_classificador(self.pesos)
+        catalogo = obter_catalogo_temas(self.temas)
+        mapa = obter_mapa_pesos(catalogo, self.pesos)
+        rodizio_atual = obter_rodizio_atual(self.calendario, self.contexto.agora)
+        media_diagnostico = self._media_diagnostico()
+        
+        # Temas do catálogo relacionados ao rodízio atual, por ID
+        relacionados = mapa.ids_relacionados(rodizio_atual.get("temas_prioritarios", [])) if rodizio_atual else frozenset()
+        
+        peso_area = np.empty(n)
+        multiplicador_yield = np.empty(n)
+        performance = np.empty(n)
+        bonus_rodizio = np.empty(n)
+        numero_revisao = np.empty(n, dtype=np.int64)
+        
+        for i, item in enumerate(itens):
+            tema, grande_area = item[0], item[1]
+            revisao = item[2] if len(item) > 2 else 1
+            tema_key = item[3] if len(item) > 3 and item[3] else tema
+            
+            peso_area[i] = self.obter_peso_area(grande_area)
+            performance[i] = self._performance_anterior(tema_key, revisao, media_diagnostico)
+            numero_revisao[i] = revisao
+            
+            tema_id = catalogo.id_de(tema, grande_area)
+            if tema_id is not None:
+                multiplicador_yield[i] = mapa.classificacao[tema_id][1]
+                bonus_rodizio[i] = BONUS_RODIZIO_ATUAL if rodizio_atual and (
+                    rodizio_atual.get("grande_area_principal") == grande_area or tema_id in relacionados
+                ) else 1.0
+            else:
+                # Tema fora do catálogo: classificação por nome
+                multiplicador_yield[i] = classificador.classificar(tema, grande_area)[1]
+                bonus_rodizio[i] = self._bonus_rodizio(rodizio_atual, tema, grande_area)
+        
+        base = np.full(n, self.calcular_base_questoes(), dtype=np.int64)
+        fator_performance = _fatores_performance(performance)
+        
+        # Aplicar distribuição por revisão
+        percentual_revisao = np.select(
+            [numero_revisao == 1, numero_revisao == 2, numero_revisao == 3],
+            [DISTRIBUICAO_REVISOES["primeira"], DISTRIBUICAO_REVISOES["segunda"], DISTRIBUICAO_REVISOES["terceira"]],
+            0.33
+        )
+        
+        # Fórmula principal
+        questoes = base * peso_area * multiplicador_yield * fator_performance * bonus_rodizio
+        questoes = np.trunc(questoes * (1 + percentual_revisao)).astype(np.int64)  # Ajuste por revisão
+        
+        # Limites
+        questoes = np.clip(questoes, 10, 500)
+        
+        is_high_yield = multiplicador_yield > 1
+        
+        # Score de prioridade (0 a 1): área + high-yield + performance baixa + rodízio
+        prioridade = peso_area + np.where(is_high_yield, 0.2, 0.0)
+        prioridade = prioridade + np.select(
+            [fator_performance > 1.2, fator_performance > 1.0], [0.3, 0.15], 0.0
+        )
+        prioridade = prioridade + np.where(bonus_rodizio > 1, 0.2, 0.0)
+        prioridade = np.minimum(1.0, prioridade)
+        
+        return {
+            "questoes_sugeridas": questoes,
+            "base": base,
+            "peso_area": peso_area,
+            "multiplicador_yield": multiplicador_yield,
+            "is_high_yield": is_high_yield,
+            "fator_performance": fator_performance,
+            "bonus_rodizio": bonus_rodizio,
+            "percentual_revisao": percentual_revisao,
+            "numero_revisao": numero_revisao,
+            "prioridade": prioridade
+        }
+    
     def calcular_sugestao_tema(
         self,
         tema: str,
@@ -182,36 +254,18 @@ class AlgoritmoSugestao:
         - questoes_sugeridas: número de questões
         - detalhes: breakdown dos fatores
         """
-        base = self.calcular_base_questoes()
-        peso_area = self.obter_peso_area(grande_area)
-        multiplicador_yield = self.obter_multiplicador_yield(tema, grande_area)
-        fator_performance = self.calcular_fator_performance(tema_key or tema, numero_revisao)
-        bonus_rodizio = self.verificar_bonus_rodizio(tema, grande_area)
-        
-        # Aplicar distribuição por revisão
-        percentual_revisao = {
-            1: DISTRIBUICAO_REVISOES["primeira"],
-            2: DISTRIBUICAO_REVISOES["segunda"],
-            3: DISTRIBUICAO_REVISOES["terceira"]
-        }.get(numero_revisao, 0.33)
-        
-        # Fórmula principal
-        questoes = base * peso_area * multiplicador_yield * fator_performance * bonus_rodizio
-        questoes = int(questoes * (1 + percentual_revisao))  # Ajuste por revisão
-        
-        # Limites
-        questoes = max(10, min(500, questoes))
+        lote = self.calcular_sugestoes_lote([(tema, grande_area, numero_revisao, tema_key)])
         
         return {
-            "questoes_sugeridas": questoes,
+            "questoes_sugeridas": int(lote["questoes_sugeridas"][0]),
             "detalhes": {
-                "base": base,
-                "peso_area": peso_area,
-                "multiplicador_yield": multiplicador_yield,
-                "is_high_yield": multiplicador_yield > 1,
-                "fator_performance": fator_performance,
-                "bonus_rodizio": bonus_rodizio,
-                "percentual_revisao": percentual_revisao,
+                "base": int(lote["base"][0]),
+                "peso_area": float(lote["peso_area"][0]),
+                "multiplicador_yield": float(lote["multiplicador_yield"][0]),
+                "is_high_yield": bool(lote["is_high_yield"][0]),
+                "fator_performance": float(lote["fator_performance"][0]),
+                "bonus_rodizio": float(lote["bonus_rodizio"][0]),
+                "percentual_revisao": float(lote["percentual_revisao"][0]),
                 "numero_revisao": numero_revisao
             }
         }
@@ -225,46 +279,50 @@ class AlgoritmoSugestao:
         """
         from .calculadora_revisoes import CalculadoraRevisoes
         
-        calc_rev = CalculadoraRevisoes()
-        pendencias = calc_rev.gerar_relatorio_pendencias(self.estudo, apenas_proximas=apenas_proximas)
+        calc_rev = CalculadoraRevisoes(self.contexto)
+        # Top 10 mais próximas, direto da fila de revisões
+        pendencias = calc_rev.gerar_relatorio_pendencias(
+            self.estudo, apenas_proximas=apenas_proximas, limite=10
+        )
         
         plano = {
-            "semana": datetime.now().strftime("%Y-W%W"),
+            "semana": self.contexto.agora.strftime("%Y-W%W"),
             "meta_questoes": self.questoes_semana,
             "temas": [],
             "total_sugerido": 0
         }
         
-        for pend in pendencias[:10]:  # Top 10 mais próximas
+        catalogo = obter_catalogo_temas(self.temas)
+        registro = self.estudo.get("registro_temas", {})
+        
+        selecionadas = []
+        for pend in pendencias:
             tema_key = pend["tema"]
             
-            # Encontrar dados do tema
-            for area, dados in self.temas.get("grandes_areas", {}).items():
-                for tema_info in dados.get("temas", []):
-                    if tema_info["nome"] == tema_key or tema_key in tema_info["nome"]:
-                        numero_rev = int(pend["acao"].split("_")[-1].replace("r", "")) if "r" in pend["acao"] else 1
-                        
-                        sugestao = self.calcular_sugestao_tema(
-                            tema_info["nome"],
-                            area,
-                            numero_rev,
-                            tema_key
-                        )
-                        
-                        plano["temas"].append({
-                            "tema": tema_key,
-                            "grande_area": area,
-                            "revisao": numero_rev,
-                            "questoes": sugestao["questoes_sugeridas"],
-                            "urgencia": pend["urgencia_score"],
-                            "is_high_yield": sugestao["detalhes"]["is_high_yield"],
-                            "status": pend["status"],
-                            "data_sugerida": pend.get("data_sugerida"),
-                            "dias_restantes": pend.get("dias_restantes", 0)
-                        })
-                        
-                        plano["total_sugerido"] += sugestao["questoes_sugeridas"]
-                        break
+            # Encontrar dados do tema (nome, apelido ou área registrada)
+            encontrado = catalogo.resolver(tema_key, registro.get(tema_key, {}).get("grande_area"))
+            if encontrado:
+                numero_rev = int(pend["acao"].split("_")[-1].replace("r", "")) if "r" in pend["acao"] else 1
+                selecionadas.append((pend, encontrado["nome"], encontrado["grande_area"], numero_rev))
+        
+        lote = self.calcular_sugestoes_lote(
+            [(nome, area, numero_rev, pend["tema"]) for pend, nome, area, numero_rev in selecionadas]
+        )
+        
+        for i, (pend, _, area, numero_rev) in enumerate(selecionadas):
+            questoes = int(lote["questoes_sugeridas"][i])
+            plano["temas"].append({
+                "tema": pend["tema"],
+                "grande_area": area,
+                "revisao": numero_rev,
+                "questoes": questoes,
+                "urgencia": pend["urgencia_score"],
+                "is_high_yield": bool(lote["is_high_yield"][i]),
+                "status": pend["status"],
+                "data_sugerida": pend.get("data_sugerida"),
+                "dias_restantes": pend.get("dias_restantes", 0)
+            })
+            plano["total_sugerido"] += questoes
         
         # Ordenar por data sugerida (mais próxima primeiro)
         plano["temas"].sort(key=lambda x: x.get("data_sugerida") or "9999-99-99")
@@ -274,50 +332,44 @@ class AlgoritmoSugestao:
     def calcular_prioridade_tema(self, tema: str, grande_area: str) -> float:
         """
         Calcula um score de prioridade de 0 a 1 para visualização (bolinhas).
-        """
-        sugestao = self.calcular_sugestao_tema(tema, grande_area)
-        detalhes = sugestao["detalhes"]
-        
-        # Combinar fatores para gerar score
-        score = 0.0
-        
-        # Peso da área contribui com até 0.3
-        score += detalhes["peso_area"]
         
-        # High-yield contribui com 0.2
-        if detalhes["is_high_yield"]:
-            score += 0.2
-        
-        # Performance baixa aumenta prioridade
-        if detalhes["fator_performance"] > 1.2:
-            score += 0.3
-        elif detalhes["fator_performance"] > 1.0:
-            score += 0.15
-        
-        # Bonus rodízio
-        if detalhes["bonus_rodizio"] > 1:
-            score += 0.2
-        
-        return min(1.0, score)
+        Para vários temas, prefira calcular_sugestoes_lote(...)["prioridade"].
+        """
+        return float(self.calcular_sugestoes_lote([(tema, grande_area)])["prioridade"][0])
+
+
+def _fatores_performance(performance: np.ndarray) -> np.ndarray:
+    """
+    Fator de ajuste para cada performance (%).
+    
+    Abaixo de 50% aumenta bastante (1.5); a partir de 90% reduz para temas
+    dominados (0.7).
+    """
+    return np.select(
+        [performance < 50, performance < 60, performance < 70, performance < 80, performance < 90],
+        [1.5, 1.3, 1.1, 1.0, 0.9],
+        0.7
+    )
 
 
 def calcular_questoes_tema(
     tema: str,
     grande_area: str,
-    numero_revisao: int = 1
+    numero_revisao: int = 1,
+    contexto: Optional[ContextoDados] = None
 ) -> int:
     """
     Função de conveniência para calcular questões de um tema.
     """
-    alg = AlgoritmoSugestao()
+    alg = AlgoritmoSugestao(contexto)
     resultado = alg.calcular_sugestao_tema(tema, grande_area, numero_revisao)
     return resultado["questoes_sugeridas"]
 
 
-def obter_plano_semanal() -> Dict[str, Any]:
+def obter_plano_semanal(contexto: Optional[ContextoDados] = None) -> Dict[str, Any]:
     """
     Função de conveniência para obter plano semanal.
     """
-    alg = AlgoritmoSugestao()
+    alg = AlgoritmoSugestao(contexto)
     return alg.gerar_plano_semanal()
 
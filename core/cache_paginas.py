@@ -0,0 +1,161 @@
+"""
+Cache das Páginas
+
+Camada de cache do Streamlit sobre os motores. Cada rerun (qualquer
+clique em widget) reexecuta o script da página; com este módulo, os
+resultados só são recalculados quando um arquivo de dados muda.
+
+- st.cache_data guarda os resultados dos motores (estatísticas,
+  alertas, plano semanal, cobertura high-yield) e uma cópia do estudo,
+  com a versão dos arquivos de dados e o dia atual na chave;
+- os agregados do log de eventos por período ficam em st.cache_data
+  com a versão do log na chave;
+- os dados de referência (pesos, temas, calendário) são os congelados
+  de dados_referencia, um por processo; st.cache_resource compartilha
+  entre as sessões o banco de questões (e st.cache_data as suas listas
+  de temas, áreas e bancas).
+
+A versão vem de helpers.versao_arquivos: assinatura em disco mais o
+contador de escritas do processo, que todo salvar_* incrementa. Uma
+gravação invalida exatamente as entradas que dependem do arquivo.
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+from pathlib import Path
+
+import streamlit as st
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers, dados_referencia
+from utils.armazenamento_sqlite import ARQUIVO_DB
+from utils.banco_colunar import BancoColunar, PADROES, carregar_banco
+from utils.eventos_estudo import ARQUIVO_EVENTOS, agregar_eventos
+from core.contexto import ContextoDados
+from core.ids_temas import migrar_ids_temas
+
+ARQUIVOS_ESTUDO = ("config.json", "temas.json", "estudo.json", ARQUIVO_EVENTOS, ARQUIVO_DB)
+
+# Tudo o que os motores leem
+ARQUIVOS_MOTORES = ("config.json", "pesos_enamed.json", "temas.json", "calendario.json",
+                    "estudo.json", ARQUIVO_EVENTOS, ARQUIVO_DB)
+
+
+def _versao(arquivos: Tuple[str, ...]) -> Tuple[Any, ...]:
+    # Antes de ler qualquer versão: a migração dos IDs de temas (uma vez
+    # por diretório de dados) pode regravar temas, estudo e questões
+    migrar_ids_temas()
+    return helpers.versao_arquivos(*arquivos)
+
+
+def carregar_referencia(nome_arquivo: str) -> Dict[str, Any]:
+    """Dados de referência congelados, compartilhados entre sessões."""
+    migrar_ids_temas()
+    return dados_referencia.carregar_referencia(nome_arquivo)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _banco(versao: Tuple[Any, ...]) -> BancoColunar:
+    return carregar_banco()
+
+
+def carregar_banco_compartilhado() -> BancoColunar:
+    """Banco de questões colunar compartilhado entre sessões."""
+    return _banco(_versao(("questoes.json",)))
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _opcoes_banco(versao: Tuple[Any, ...]) -> Dict[str, List[Any]]:
+    banco = carregar_banco_compartilhado()
+    return {
+        "temas": banco.opcoes("tema", PADROES["tema"]),
+        "areas": banco.opcoes("grande_area", PADROES["grande_area"]),
+        "bancas": banco.opcoes("banca", PADROES["banca"])
+    }
+
+
+def opcoes_banco() -> Dict[str, List[Any]]:
+    """Temas, áreas e bancas distintos do banco (listas de seleção)."""
+    return _opcoes_banco(_versao(("questoes.json",)))
+
+
+def _contexto(estudo: Optional[Dict[str, Any]] = None) -> ContextoDados:
+    return ContextoDados(
+        pesos=carregar_referencia("pesos_enamed.json"),
+        temas=carregar_referencia("temas.json"),
+        calendario=carregar_referencia("calendario.json"),
+        estudo=estudo
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _estudo(versao: Tuple[Any, ...]) -> Dict[str, Any]:
+    return _contexto().estudo
+
+
+def contexto_pagina() -> ContextoDados:
+    """
+    Contexto de um render com dados em cache.
+
+    O estudo é uma cópia própria (cache_data devolve uma cópia a cada
+    chamada); os demais dados são os de referência compartilhados.
+    """
+    return _contexto(_estudo(_versao(ARQUIVOS_ESTUDO)))
+
+
+# Resultados dos motores: recalculados quando os dados mudam ou o dia vira
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _estatisticas(versao: Tuple[Any, ...], dia: str) -> Dict[str, Any]:
+    from core.metricas import obter_estatisticas
+    return obter_estatisticas(contexto_pagina())
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _alertas(versao: Tuple[Any, ...], dia: str) -> List[Dict[str, Any]]:
+    from core.priorizador_enamed import obter_alertas
+    return obter_alertas(contexto_pagina())
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _plano_semanal(versao: Tuple[Any, ...], dia: str) -> Dict[str, Any]:
+    from core.algoritmo_sugestao import obter_plano_semanal
+    return obter_plano_semanal(contexto_pagina())
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cobertura_high_yield(versao: Tuple[Any, ...], dia: str) -> Dict[str, Any]:
+    from core.priorizador_enamed import PriorizadorENAMED
+    return PriorizadorENAMED(contexto_pagina()).calcular_cobertura_high_yield()
+
+
+def estatisticas() -> Dict[str, Any]:
+    """obter_estatisticas em cache."""
+    return _estatisticas(_versao(ARQUIVOS_MOTORES), date.today().isoformat())
+
+
+def alertas() -> List[Dict[str, Any]]:
+    """obter_alertas em cache."""
+    return _alertas(_versao(ARQUIVOS_MOTORES), date.today().isoformat())
+
+
+def plano_semanal() -> Dict[str, Any]:
+    """obter_plano_semanal em cache."""
+    return _plano_semanal(_versao(ARQUIVOS_MOTORES), date.today().isoformat())
+
+
+def cobertura_high_yield() -> Dict[str, Any]:
+    """PriorizadorENAMED.calcular_cobertura_high_yield em cache."""
+    return _cobertura_high_yield(_versao(ARQUIVOS_MOTORES), date.today().isoformat())
+
+
+@st.cache_data(show_spinner=False, max_entries=6)
+def _eventos_por_periodo(versao: Tuple[Any, ...], periodo: str) -> Dict[str, Dict[str, int]]:
+    return agregar_eventos(periodo)
+
+
+def eventos_por_periodo(periodo: str = "semana") -> Dict[str, Dict[str, int]]:
+    """agregar_eventos em cache (recalculado quando o log muda)."""
+    return _eventos_por_periodo(_versao((ARQUIVO_EVENTOS,)), periodo)
@@ -5,18 +5,41 @@ Implementa o algoritmo de espaçamento de revisões baseado na metodologia
 SuperPlanner/FluidMed.
 """
 
+import re
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Sequence, Tuple
 import sys
 from pathlib import Path
 
+import numpy as np
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.helpers import carregar_config, carregar_pesos
 from utils.constants import (
     INTERVALOS_REVISAO,
     DISTRIBUICAO_REVISOES
 )
+from core.contexto import ContextoDados
+
+_DATA_ISO = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Microssegundos em um dia (diferenças de datetime64[us] -> dias)
+_US_POR_DIA = 86_400_000_000
+
+
+def converter_datas(textos: Sequence[str]) -> np.ndarray:
+    """
+    Converte datas "AAAA-MM-DD" para um array datetime64[D].
+    
+    Datas fora do formato canônico passam por strptime, que aceita (ou
+    rejeita com ValueError) exatamente o mesmo que o cálculo por tema.
+    """
+    if all(_DATA_ISO.match(t) for t in textos):
+        return np.array(textos, dtype="datetime64[D]")
+    return np.array(
+        [np.datetime64(datetime.strptime(t, "%Y-%m-%d").date(), "D") for t in textos],
+        dtype="datetime64[D]"
+    )
 
 
 class CalculadoraRevisoes:
@@ -27,9 +50,12 @@ class CalculadoraRevisoes:
     mantendo o princípio do espaçamento para maximizar retenção.
     """
     
-    def __init__(self):
-        self.config = carregar_config()
-        self.pesos = carregar_pesos()
+    def __init__(self, contexto: Optional[ContextoDados] = None):
+        contexto = contexto or ContextoDados()
+        
+        self.contexto = contexto
+        self.config = contexto.config
+        self.pesos = contexto.pesos
         self.data_prova = datetime.strptime(
             self.config.get("usuario", {}).get("data_prova_estimada", "2027-11-15"),
             "%Y-%m-%d"
@@ -43,7 +69,7 @@ class CalculadoraRevisoes:
         Retorna um valor entre 0.3 (muito perto) e 1.0 (longe).
         """
         if data_atual is None:
-            data_atual = datetime.now()
+            data_atual = self.contexto.agora
         
         dias_ate_prova = (self.data_prova - data_atual).days
         
@@ -155,7 +181,7 @@ class CalculadoraRevisoes:
         - "atrasada": passou da data e não foi feita
         - "concluida": revisão realizada
         """
-        hoje = datetime.now()
+        hoje = self.contexto.agora
         data_sug = datetime.strptime(data_sugerida, "%Y-%m-%d")
         
         if data_realizada:
@@ -235,10 +261,131 @@ class CalculadoraRevisoes:
             "descricao": "Revisões completas. Aguardar revisão final pré-prova."
         }
     
+    def calcular_fatores_proximidade(self, datas: np.ndarray) -> np.ndarray:
+        """Versão vetorizada de calcular_fator_proximidade para datas datetime64[D]."""
+        prova = np.datetime64(self.data_prova.date(), "D")
+        dias = (prova - datas).astype(np.int64)
+        
+        interpolado = 0.3 + (dias - 60) / (300 - 60) * 0.7
+        return np.where(dias >= 300, 1.0, np.where(dias <= 60, 0.3, interpolado))
+    
+    def calcular_cronogramas_lote(self, datas_teoria: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Calcula os cronogramas de vários temas de uma vez.
+        
+        Recebe as datas de teoria (datetime64[D]) e retorna arrays com
+        fator_proximidade (na data da teoria), as datas sugeridas r1/r2/r3,
+        os intervalos e r3_ajustado, com os mesmos valores de
+        calcular_cronograma_tema.
+        """
+        datas_teoria = np.asarray(datas_teoria, dtype="datetime64[D]")
+        um_dia = np.timedelta64(1, "D")
+        
+        fator = self.calcular_fatores_proximidade(datas_teoria)
+        intervalo_min = INTERVALOS_REVISAO["teoria_para_r1_fim_ano"]
+        intervalo_max = INTERVALOS_REVISAO["teoria_para_r1_inicio_ano"]
+        intervalo_r1 = np.maximum(
+            intervalo_min,
+            np.trunc(intervalo_min + (intervalo_max - intervalo_min) * fator).astype(np.int64)
+        )
+        data_r1 = datas_teoria + intervalo_r1 * um_dia
+        
+        intervalo_r2 = np.maximum(
+            7, np.trunc(INTERVALOS_REVISAO["r1_para_r2"] * self.calcular_fatores_proximidade(data_r1)).astype(np.int64)
+        )
+        data_r2 = data_r1 + intervalo_r2 * um_dia
+        
+        intervalo_r3 = np.maximum(
+            7, np.trunc(INTERVALOS_REVISAO["r2_para_r3"] * self.calcular_fatores_proximidade(data_r2)).astype(np.int64)
+        )
+        data_r3 = data_r2 + intervalo_r3 * um_dia
+        
+        # R3 não ultrapassa a data limite (14 dias antes da prova)
+        data_limite = np.datetime64(self.data_prova.date(), "D") - 14 * um_dia
+        r3_ajustado = data_r3 > data_limite
+        
+        return {
+            "fator_proximidade": fator,
+            "r1": data_r1,
+            "r2": data_r2,
+            "r3": np.where(r3_ajustado, data_limite, data_r3),
+            "intervalo_r1": intervalo_r1,
+            "intervalo_r2": intervalo_r2,
+            "intervalo_r3": intervalo_r3,
+            "r3_ajustado": r3_ajustado
+        }
+    
+    def verificar_status_lote(self, datas_sugeridas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Status (pendente/disponivel/atrasada) e dias até a data sugerida.
+        
+        Os dias são contados a partir do instante do contexto, como em
+        verificar_status_revisao (timedelta.days arredonda para baixo).
+        """
+        hoje = np.datetime64(self.contexto.agora, "us")
+        diferenca = (np.asarray(datas_sugeridas, dtype="datetime64[D]").astype("datetime64[us]") - hoje)
+        dias = diferenca.astype(np.int64) // _US_POR_DIA
+        
+        status = np.where(dias > 7, "pendente", np.where(dias >= -7, "disponivel", "atrasada"))
+        return status, dias
+    
+    def calcular_proximas_acoes_lote(self, registros: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Próxima revisão de vários temas de uma vez.
+        
+        Retorna arrays alinhados aos registros: revisao (1 a 3; 0 se ainda
+        falta a teoria ou se as três revisões já foram feitas), teoria
+        (bool), data_sugerida (datetime64[D], NaT quando revisao == 0),
+        status e dias até a data sugerida.
+        """
+        n = len(registros)
+        revisao = np.zeros(n, dtype=np.int64)
+        teoria = np.zeros(n, dtype=bool)
+        textos_teoria = []
+        
+        for i, registro in enumerate(registros):
+            if not registro.get("data_teoria"):
+                continue
+            teoria[i] = True
+            textos_teoria.append(registro["data_teoria"])
+            for rev_num, rev_key in enumerate(("r1", "r2", "r3"), 1):
+                rev_dados = registro.get(rev_key)
+                if not rev_dados or not rev_dados.get("data"):
+                    revisao[i] = rev_num
+                    break
+        
+        data_sugerida = np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+        status = np.full(n, "", dtype="<U10")
+        dias = np.zeros(n, dtype=np.int64)
+        
+        if textos_teoria:
+            cronogramas = self.calcular_cronogramas_lote(converter_datas(textos_teoria))
+            com_teoria = np.flatnonzero(teoria)
+            revisoes = revisao[com_teoria]
+            datas = np.select(
+                [revisoes == 1, revisoes == 2, revisoes == 3],
+                [cronogramas["r1"], cronogramas["r2"], cronogramas["r3"]],
+                np.datetime64("NaT", "D")
+            )
+            data_sugerida[com_teoria] = datas
+            
+            pendentes = com_teoria[revisoes > 0]
+            status[pendentes], dias[pendentes] = self.verificar_status_lote(data_sugerida[pendentes])
+        
+        return {
+            "revisao": revisao,
+            "teoria": teoria,
+            "data_sugerida": data_sugerida,
+            "status": status,
+            "dias": dias
+        }
+    
     def gerar_relatorio_pendencias(
         self,
         registro_estudo: Dict[str, Any],
-        apenas_proximas: bool = False
+        apenas_proximas: bool = False,
+        limite: Optional[int] = None,
+        dentro_de_dias: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Gera um relatório de todas as pendências de revisão.
@@ -246,65 +393,72 @@ class CalculadoraRevisoes:
         Args:
             registro_estudo: Dados do estudo
             apenas_proximas: Se True, filtra apenas revisões próximas (7 dias)
+            limite: Número máximo de pendências (as mais próximas)
+            dentro_de_dias: Apenas revisões que vencem em até N dias
+                (inclui as atrasadas)
         
-        Retorna lista ordenada por urgência.
+        Retorna lista ordenada por urgência. As pendências vêm da fila
+        persistente de revisões (ver fila_revisoes), mantida tema a tema
+        pelas gravações.
         """
-        pendencias = []
+        from .fila_revisoes import consultar_fila_revisoes
         
-        for tema_key, tema_dados in registro_estudo.get("registro_temas", {}).items():
-            proxima = self.calcular_proxima_acao(tema_dados)
-            
-            if proxima["acao"] not in ["aguardar_revisao_final", "ver_teoria"]:
-                urgencia_score = 0
-                incluir = True
-                
-                if proxima.get("status") == "atrasada":
-                    urgencia_score = 100
-                elif proxima.get("status") == "disponivel":
-                    urgencia_score = 50
-                elif proxima.get("status") == "pendente":
-                    dias = proxima.get("dias_restantes", 30)
-                    urgencia_score = max(0, 30 - dias)
-                    
-                    # Se apenas_proximas, ignorar revisões muito distantes
-                    if apenas_proximas and dias > 7:
-                        incluir = False
-                
-                if incluir:
-                    pendencias.append({
-                        "tema": tema_key,
-                        "acao": proxima["acao"],
-                        "descricao": proxima["descricao"],
-                        "status": proxima.get("status", "pendente"),
-                        "data_sugerida": proxima.get("data_sugerida"),
-                        "urgencia_score": urgencia_score,
-                        "dias_restantes": proxima.get("dias_restantes", 0)
-                    })
-        
-        # Ordenar por data sugerida (mais próxima primeiro)
-        def sort_key(x):
-            if x.get("data_sugerida"):
-                return x["data_sugerida"]
-            return "9999-99-99"
-        
-        pendencias.sort(key=sort_key)
-        
-        return pendencias
+        # Como em calcular_proxima_acao (que não informa dias_restantes),
+        # pendentes contam 30 dias: urgência 0 e fora de apenas_proximas
+        if apenas_proximas:
+            dentro_de_dias = 7 if dentro_de_dias is None else min(dentro_de_dias, 7)
+        
+        ate_dia = None
+        if dentro_de_dias is not None:
+            # Último dia D com (D - agora) em dias, arredondado para baixo, <= N
+            agora = np.datetime64(self.contexto.agora, "us").astype(np.int64)
+            ate_dia = int((agora + (dentro_de_dias + 1) * _US_POR_DIA - 1) // _US_POR_DIA)
+        
+        # Já em ordem de data sugerida (mais próxima primeiro)
+        proximas = consultar_fila_revisoes(self, registro_estudo, limite, ate_dia)
+        if not proximas:
+            return []
+        
+        temas, revisoes, dias = zip(*proximas)
+        datas_sugeridas = np.array(dias, dtype="datetime64[D]")
+        status, _ = self.verificar_status_lote(datas_sugeridas)
+        urgencia = np.select([status == "atrasada", status == "disponivel"], [100, 50], 0)
+        datas = np.datetime_as_string(datas_sugeridas, unit="D")
+        
+        return [
+            {
+                "tema": tema,
+                "acao": f"fazer_r{revisao}",
+                "descricao": f"Fazer {revisao}ª revisão",
+                "status": str(status[i]),
+                "data_sugerida": str(datas[i]),
+                "urgencia_score": int(urgencia[i]),
+                "dias_restantes": 0
+            }
+            for i, (tema, revisao) in enumerate(zip(temas, revisoes))
+        ]
 
 
-def calcular_datas_revisao(data_teoria: str, tema: str = None) -> Dict[str, Any]:
+def calcular_datas_revisao(
+    data_teoria: str,
+    tema: str = None,
+    contexto: Optional[ContextoDados] = None
+) -> Dict[str, Any]:
     """
     Função de conveniência para calcular datas de revisão.
     """
-    calc = CalculadoraRevisoes()
+    calc = CalculadoraRevisoes(contexto)
     data = datetime.strptime(data_teoria, "%Y-%m-%d")
     return calc.calcular_cronograma_tema(data, tema)
 
 
-def obter_proxima_acao(registro_tema: Dict[str, Any]) -> Dict[str, Any]:
+def obter_proxima_acao(
+    registro_tema: Dict[str, Any],
+    contexto: Optional[ContextoDados] = None
+) -> Dict[str, Any]:
     """
     Função de conveniência para obter próxima ação de um tema.
     """
-    calc = CalculadoraRevisoes()
+    calc = CalculadoraRevisoes(contexto)
     return calc.calcular_proxima_acao(registro_tema)
 
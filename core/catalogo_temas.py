@@ -0,0 +1,156 @@
+"""
+Catálogo de Temas
+
+Catálogo canônico dos temas de temas.json, montado uma vez por versão do
+arquivo. Cada tema recebe um ID estável e é encontrado em O(1) pelo nome
+exato, pelo nome normalizado (sem diferenciar caixa, acentos e espaços)
+ou por um apelido (ALIASES_TEMAS ou a lista "aliases" do próprio tema).
+
+Um nome só resolve para um tema quando corresponde a ele por inteiro:
+ao contrário da antiga busca por substring, "Diabetes" não é confundido
+com "Diabetes na Gestação".
+"""
+
+import json
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils import helpers
+from utils.constants import ALIASES_TEMAS
+from core.classificador_yield import normalizar_tema
+
+_LOCK = threading.Lock()
+_CATALOGO: Optional[Tuple[Any, str, "CatalogoTemas"]] = None
+
+
+class CatalogoTemas:
+    """
+    Temas de temas.json indexados por ID, nome, nome normalizado e apelido.
+
+    Cada tema é um dict {"id", "nome", "grande_area", "high_yield"}
+    compartilhado (somente leitura). Temas que já têm "id" em temas.json
+    o mantêm; os demais recebem IDs sequenciais na ordem do arquivo, a
+    partir do maior ID existente.
+    """
+
+    def __init__(
+        self,
+        temas: Dict[str, Any],
+        aliases: Optional[Dict[str, List[str]]] = None
+    ):
+        if aliases is None:
+            aliases = ALIASES_TEMAS
+
+        entradas = [
+            (area, tema)
+            for area, dados in temas.get("grandes_areas", {}).items()
+            for tema in dados.get("temas", [])
+        ]
+        proximo_id = 1 + max(
+            (tema["id"] for _, tema in entradas if isinstance(tema.get("id"), int)),
+            default=0
+        )
+
+        self.temas: List[Dict[str, Any]] = []
+        self._por_id: Dict[int, Dict[str, Any]] = {}
+        self._por_area: Dict[str, List[Dict[str, Any]]] = {}
+        self._por_nome_area: Dict[Tuple[str, str], int] = {}
+        self._por_nome: Dict[str, List[int]] = {}
+        self._por_normalizado: Dict[str, List[int]] = {}
+        self._por_alias: Dict[str, List[int]] = {}
+
+        for area, tema in entradas:
+            tema_id = tema.get("id")
+            if not isinstance(tema_id, int) or tema_id in self._por_id:
+                tema_id, proximo_id = proximo_id, proximo_id + 1
+
+            registro = {
+                "id": tema_id,
+                "nome": tema["nome"],
+                "grande_area": area,
+                "high_yield": bool(tema.get("high_yield", False))
+            }
+            self.temas.append(registro)
+            self._por_id[tema_id] = registro
+            self._por_area.setdefault(area, []).append(registro)
+            self._por_nome_area.setdefault((tema["nome"], area), tema_id)
+            self._por_nome.setdefault(tema["nome"], []).append(tema_id)
+            self._por_normalizado.setdefault(normalizar_tema(tema["nome"]), []).append(tema_id)
+            for alias in tema.get("aliases", []):
+                self._por_alias.setdefault(normalizar_tema(alias), []).append(tema_id)
+
+        # Apelidos globais de temas que existem no catálogo
+        for nome, apelidos in aliases.items():
+            for tema_id in self._por_nome.get(nome, []):
+                for alias in apelidos:
+                    self._por_alias.setdefault(normalizar_tema(alias), []).append(tema_id)
+
+    def __len__(self) -> int:
+        return len(self.temas)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.temas)
+
+    def obter(self, tema_id: int) -> Optional[Dict[str, Any]]:
+        return self._por_id.get(tema_id)
+
+    def id_de(self, nome: str, grande_area: str) -> Optional[int]:
+        """ID do tema com exatamente este nome nesta área (ou None)."""
+        return self._por_nome_area.get((nome, grande_area))
+
+    def nomes_normalizados(self) -> Iterator[Tuple[str, int]]:
+        """Pares (nome normalizado, ID) de todos os nomes e apelidos."""
+        for mapa in (self._por_normalizado, self._por_alias):
+            for nome, ids in mapa.items():
+                for tema_id in ids:
+                    yield nome, tema_id
+
+    def por_area(self, grande_area: str) -> List[Dict[str, Any]]:
+        """Temas da grande área, na ordem de temas.json."""
+        return self._por_area.get(grande_area, [])
+
+    def resolver(self, nome: str, grande_area: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Tema do catálogo correspondente ao nome (ou None).
+
+        Tenta o nome exato, depois o normalizado e por fim os apelidos.
+        Se o mesmo nome existir em mais de uma área, prefere grande_area;
+        sem ela (ou sem tema nessa área), vale o primeiro do arquivo.
+        """
+        if not nome:
+            return None
+
+        ids = self._por_nome.get(nome)
+        if not ids:
+            normalizado = normalizar_tema(nome)
+            ids = self._por_normalizado.get(normalizado) or self._por_alias.get(normalizado)
+        if not ids:
+            return None
+
+        if grande_area is not None and len(ids) > 1:
+            for tema_id in ids:
+                if self._por_id[tema_id]["grande_area"] == grande_area:
+                    return self._por_id[tema_id]
+        return self._por_id[ids[0]]
+
+
+def obter_catalogo_temas(temas: Dict[str, Any]) -> CatalogoTemas:
+    """
+    Catálogo de temas.json, reconstruído apenas quando o conteúdo muda.
+
+    Para o temas congelado de carregar_json (um objeto por versão do
+    arquivo) a verificação é por identidade, O(1); dicts comuns são
+    comparados pelo conteúdo serializado.
+    """
+    global _CATALOGO
+    with _LOCK:
+        if _CATALOGO is not None and _CATALOGO[0] is temas and helpers.e_congelado(temas):
+            return _CATALOGO[2]
+
+    versao = json.dumps(temas, sort_keys=True, ensure_ascii=False)
+    with _LOCK:
+        if _CATALOGO is None or _CATALOGO[1] != versao:
+            _CATALOGO = (temas, versao, CatalogoTemas(temas))
+        else:
+            _CATALOGO = (temas, versao, _CATALOGO[2])
+        return _CATALOGO[2]
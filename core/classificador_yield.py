@@ -0,0 +1,189 @@
+"""
+Classificador High-Yield / Low-Yield
+
+Compila as listas de temas High-Yield e Low-Yield do pesos_enamed.json
+em um autômato de Aho-Corasick sobre textos normalizados (minúsculas,
+sem acentos e com espaços reduzidos). Cada tema é classificado em uma
+única passada pelo seu nome, e o resultado fica memorizado por
+(tema, grande_area).
+
+Um classificador é compilado uma vez por versão dos pesos e
+compartilhado por AlgoritmoSugestao e PriorizadorENAMED, para que os
+dois motores concordem sobre a classificação e o multiplicador.
+"""
+
+import json
+import threading
+import unicodedata
+from collections import deque
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from utils import helpers
+from utils.constants import MULTIPLICADORES
+
+# Padrão encontrado no texto: (área, tema) de um High-Yield ou (None, tema) de um Low-Yield
+Marca = Tuple[Optional[str], str]
+
+HIGH_YIELD = "high_yield"
+NORMAL = "normal"
+LOW_YIELD = "low_yield"
+
+# Quantas versões dos pesos mantêm um classificador compilado
+MAX_CLASSIFICADORES = 4
+
+_LOCK = threading.Lock()
+_CLASSIFICADORES: Dict[str, "ClassificadorYield"] = {}
+
+# Atalho para pesos congelados (carregar_json): id -> (pesos, classificador).
+# A entrada mantém o objeto vivo, então o id não é reaproveitado por outro.
+_POR_OBJETO: Dict[int, Tuple[Any, "ClassificadorYield"]] = {}
+
+
+def normalizar_tema(texto: str) -> str:
+    """Minúsculas, sem acentos e com espaços consecutivos reduzidos a um."""
+    texto = unicodedata.normalize("NFKD", str(texto).casefold())
+    return " ".join("".join(c for c in texto if not unicodedata.combining(c)).split())
+
+
+class ClassificadorYield:
+    """
+    Classificação de temas compilada a partir dos pesos.
+
+    Um tema é High-Yield na sua área se contém algum tema High-Yield da
+    área ou está contido em um deles; caso contrário é Low-Yield se
+    contém algum tema Low-Yield; senão é Normal.
+    """
+
+    def __init__(self, pesos: Dict[str, Any]):
+        multiplicadores = pesos.get("multiplicadores", {})
+        self.multiplicadores = {
+            chave: multiplicadores.get(chave, padrao)
+            for chave, padrao in MULTIPLICADORES.items()
+        }
+
+        # Autômato: transições, link de falha e saídas por estado.
+        # Saída = conjunto de (área, tema High-Yield); Low-Yield usa área None.
+        self._transicoes: List[Dict[str, int]] = [{}]
+        self._falha: List[int] = [0]
+        self._saidas: List[Set[Marca]] = [set()]
+
+        # Substrings dos temas High-Yield de cada área (tema contido no HY)
+        self._trechos_hy: Dict[str, Set[str]] = {}
+
+        for area, temas_hy in pesos.get("temas_high_yield", {}).items():
+            trechos = self._trechos_hy.setdefault(area, set())
+            for tema_hy in temas_hy:
+                padrao = normalizar_tema(tema_hy)
+                self._inserir(padrao, (area, tema_hy))
+                trechos.update(
+                    padrao[i:j] for i in range(len(padrao)) for j in range(i + 1, len(padrao) + 1)
+                )
+                trechos.add("")
+
+        for tema_ly in pesos.get("temas_low_yield", []):
+            self._inserir(normalizar_tema(tema_ly), (None, tema_ly))
+
+        self._ligar_falhas()
+        self._memo: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+    def _inserir(self, padrao: str, marca: Marca) -> None:
+        estado = 0
+        for c in padrao:
+            proximo = self._transicoes[estado].get(c)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes[estado][c] = proximo
+                self._transicoes.append({})
+                self._falha.append(0)
+                self._saidas.append(set())
+            estado = proximo
+        self._saidas[estado].add(marca)
+
+    def _ligar_falhas(self) -> None:
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for c, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falha[estado]
+                while falha and c not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                destino = self._transicoes[falha].get(c, 0)
+                self._falha[proximo] = destino if destino != proximo else 0
+                self._saidas[proximo] |= self._saidas[self._falha[proximo]]
+
+    def _marcas(self, texto: str) -> Set[Marca]:
+        """Marcas de todos os padrões que ocorrem no texto normalizado (uma passada)."""
+        marcas = set(self._saidas[0])
+        estado = 0
+        for c in texto:
+            while estado and c not in self._transicoes[estado]:
+                estado = self._falha[estado]
+            estado = self._transicoes[estado].get(c, 0)
+            marcas |= self._saidas[estado]
+        return marcas
+
+    def classificar(self, tema: str, grande_area: str) -> Tuple[str, float]:
+        """Retorna (classificacao, multiplicador) do tema na área."""
+        chave = (tema, grande_area)
+        resultado = self._memo.get(chave)
+        if resultado is not None:
+            return resultado
+
+        texto = normalizar_tema(tema)
+        areas = {area for area, _ in self._marcas(texto)}
+        if grande_area in areas or texto in self._trechos_hy.get(grande_area, ()):
+            classificacao = HIGH_YIELD
+        elif None in areas:
+            classificacao = LOW_YIELD
+        else:
+            classificacao = NORMAL
+
+        resultado = (classificacao, self.multiplicadores[classificacao])
+        self._memo[chave] = resultado
+        return resultado
+
+    def high_yield_contidos(self, texto: str) -> FrozenSet[Tuple[str, str]]:
+        """(área, tema High-Yield) de todos os temas HY que ocorrem no texto."""
+        return frozenset(
+            marca for marca in self._marcas(normalizar_tema(texto)) if marca[0] is not None
+        )
+
+
+def _versao_pesos(pesos: Dict[str, Any]) -> str:
+    return json.dumps(
+        [pesos.get("temas_high_yield", {}), pesos.get("temas_low_yield", []),
+         pesos.get("multiplicadores", {})],
+        sort_keys=True,
+        ensure_ascii=False
+    )
+
+
+def obter_classificador(pesos: Dict[str, Any]) -> ClassificadorYield:
+    """
+    Classificador compilado para esta versão dos pesos (reaproveitado entre chamadas).
+
+    Os pesos congelados de carregar_json (um objeto por versão do arquivo)
+    são reconhecidos por identidade, O(1); dicts comuns são comparados
+    pelo conteúdo serializado.
+    """
+    congelado = helpers.e_congelado(pesos)
+    if congelado:
+        with _LOCK:
+            entrada = _POR_OBJETO.get(id(pesos))
+            if entrada is not None and entrada[0] is pesos:
+                return entrada[1]
+
+    versao = _versao_pesos(pesos)
+    with _LOCK:
+        classificador = _CLASSIFICADORES.get(versao)
+        if classificador is None:
+            classificador = ClassificadorYield(pesos)
+            if len(_CLASSIFICADORES) >= MAX_CLASSIFICADORES:
+                _CLASSIFICADORES.pop(next(iter(_CLASSIFICADORES)))
+            _CLASSIFICADORES[versao] = classificador
+        if congelado:
+            if len(_POR_OBJETO) >= MAX_CLASSIFICADORES:
+                _POR_OBJETO.pop(next(iter(_POR_OBJETO)))
+            _POR_OBJETO[id(pesos)] = (pesos, classificador)
+        return classificador
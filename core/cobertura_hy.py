@@ -0,0 +1,178 @@
+"""
+Cobertura de Temas High-Yield
+
+Índice invertido tema do registro -> temas High-Yield que ele contém,
+construído com o autômato do classificador (ver classificador_yield).
+Cada chave de registro_temas é analisada uma única vez; depois disso,
+manter a cobertura em dia é só ajustar contadores por tema High-Yield
+quando o estado "revisado" de um tema muda. Os índices acompanham as
+gravações (ver _ao_alterar_estudo), tema a tema; o registro inteiro só é
+percorrido ao montar o índice ou quando ele deixa de acompanhar o estudo
+(mesmas regras da fila de revisões).
+
+O resumo de cobertura (por área, total e pendentes) é recalculado apenas
+quando algum tema muda de estado e é compartilhado por todas as páginas
+que o consultam.
+"""
+
+import threading
+import weakref
+from collections import Counter
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from core.classificador_yield import ClassificadorYield, obter_classificador
+from utils.eventos_estudo import (
+    TIPOS_TEMA, Posicao, ao_alterar_estudo, indice_atrasado, posicao_estudo, seguir_evento
+)
+
+_LOCK = threading.Lock()
+_INDICES: "weakref.WeakKeyDictionary[ClassificadorYield, IndiceCoberturaHY]" = weakref.WeakKeyDictionary()
+
+
+def tema_revisado(dados: Dict[str, Any]) -> bool:
+    """Um tema conta como revisado a partir da primeira revisão."""
+    return bool(dados.get("r1") or dados.get("r2") or dados.get("r3"))
+
+
+class IndiceCoberturaHY:
+    """
+    Contagem, por tema High-Yield, de temas revisados que o contêm.
+
+    Um tema High-Yield está coberto se algum tema revisado do registro
+    contém o seu nome (sem diferenciar caixa e acentos).
+    """
+
+    def __init__(self, classificador: ClassificadorYield):
+        self._classificador = classificador
+        self._hy_da_chave: Dict[str, FrozenSet[Tuple[str, str]]] = {}
+        self._revisado: Dict[str, bool] = {}
+        self._contagem: Counter = Counter()
+        self._cobertura: Optional[Dict[str, Any]] = None
+        self._pesos: Optional[Dict[str, Any]] = None
+        # Posição no log refletida pelo índice (None: sincronizar)
+        self.posicao: Optional[Posicao] = None
+
+    def atualizar_tema(self, chave: str, dados: Dict[str, Any]) -> None:
+        """Atualiza o índice com o estado atual de um tema do registro."""
+        hy = self._hy_da_chave.get(chave)
+        if hy is None:
+            hy = self._hy_da_chave[chave] = self._classificador.high_yield_contidos(chave)
+
+        revisado = tema_revisado(dados)
+        if revisado != self._revisado.get(chave, False):
+            for marca in hy:
+                self._contagem[marca] += 1 if revisado else -1
+            self._cobertura = None
+        self._revisado[chave] = revisado
+
+    def remover_tema(self, chave: str) -> None:
+        """Retira do índice um tema que saiu do registro."""
+        if chave in self._revisado:
+            self.atualizar_tema(chave, {})
+            del self._revisado[chave]
+        self._hy_da_chave.pop(chave, None)
+
+    def sincronizar(self, registro: Dict[str, Dict[str, Any]]) -> None:
+        """Incorpora as alterações do registro percorrendo-o inteiro."""
+        for chave, dados in registro.items():
+            if self._revisado.get(chave) != tema_revisado(dados):
+                self.atualizar_tema(chave, dados)
+        if len(self._revisado) != len(registro):
+            for chave in self._revisado.keys() - registro.keys():
+                self.remover_tema(chave)
+
+    def coberto(self, grande_area: str, tema_hy: str) -> bool:
+        return self._contagem[(grande_area, tema_hy)] > 0
+
+    def cobertura(self, pesos: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resumo da cobertura (compartilhado; tratar como somente leitura).
+
+        Retorna {"por_area": {area: {total, revisados, percentual}},
+        "total": {high_yield_total, high_yield_revisados, percentual_cobertura},
+        "pendentes": [...], "revisados": {(area, tema_hy), ...}}.
+        """
+        if self._cobertura is not None and self._pesos is pesos:
+            return self._cobertura
+
+        resultado = {
+            "por_area": {},
+            "total": {
+                "high_yield_total": 0,
+                "high_yield_revisados": 0,
+                "percentual_cobertura": 0
+            },
+            "pendentes": [],
+            "revisados": set()
+        }
+
+        for area, temas_hy in pesos.get("temas_high_yield", {}).items():
+            revisados = 0
+            for tema_hy in temas_hy:
+                if self.coberto(area, tema_hy):
+                    revisados += 1
+                    resultado["revisados"].add((area, tema_hy))
+                else:
+                    resultado["pendentes"].append({
+                        "tema": tema_hy,
+                        "grande_area": area,
+                        "peso_area": pesos.get("pesos_areas", {}).get(area, 0),
+                        "urgencia": "alta"
+                    })
+
+            total = len(temas_hy)
+            percentual = (revisados / total * 100) if total > 0 else 0
+
+            resultado["por_area"][area] = {
+                "total": total,
+                "revisados": revisados,
+                "percentual": round(percentual, 1)
+            }
+
+            resultado["total"]["high_yield_total"] += total
+            resultado["total"]["high_yield_revisados"] += revisados
+
+        if resultado["total"]["high_yield_total"] > 0:
+            resultado["total"]["percentual_cobertura"] = round(
+                resultado["total"]["high_yield_revisados"] /
+                resultado["total"]["high_yield_total"] * 100, 1
+            )
+
+        # Mais importante primeiro
+        resultado["pendentes"].sort(key=lambda x: x["peso_area"], reverse=True)
+
+        self._cobertura = resultado
+        self._pesos = pesos
+        return resultado
+
+
+@ao_alterar_estudo
+def _ao_alterar_estudo(estudo: Dict[str, Any], evento: Optional[Dict[str, Any]]) -> None:
+    """Mantém os índices em dia a cada gravação, tema a tema."""
+    with _LOCK:
+        for indice in list(_INDICES.values()):
+            if indice.posicao is None:
+                continue
+            posicao = seguir_evento(indice.posicao, evento) if evento is not None else None
+            if posicao is not None and evento["seq"] > indice.posicao[1] and evento["tipo"] in TIPOS_TEMA:
+                indice.atualizar_tema(evento["tema"], estudo["registro_temas"][evento["tema"]])
+            indice.posicao = posicao
+
+
+def obter_cobertura_hy(pesos: Dict[str, Any], estudo: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Cobertura High-Yield do estudo (ver IndiceCoberturaHY.cobertura).
+
+    O índice é mantido por versão dos pesos e atualizado pelas gravações;
+    com ele em dia com o estudo, a consulta não percorre o registro.
+    """
+    classificador = obter_classificador(pesos)
+    posicao = posicao_estudo(estudo)
+    with _LOCK:
+        indice = _INDICES.get(classificador)
+        if indice is None:
+            indice = _INDICES[classificador] = IndiceCoberturaHY(classificador)
+        if indice_atrasado(indice.posicao, posicao):
+            indice.sincronizar(estudo.get("registro_temas", {}))
+            indice.posicao = posicao
+        return indice.cobertura(pesos)
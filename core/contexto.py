@@ -0,0 +1,102 @@
+"""
+Contexto de Dados
+
+Reúne os dados de um render (config, pesos, temas, estudo, calendário)
+e um único instante de referência ("agora"), para que todos os motores
+compartilhem a mesma carga e concordem sobre a data atual.
+"""
+
+from datetime import datetime
+from typing import Dict, Any, Optional
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+
+
+class ContextoDados:
+    """
+    Dados compartilhados por todos os motores durante um render.
+
+    Cada conjunto de dados é carregado no máximo uma vez, na primeira vez
+    em que é acessado. Dados já carregados pelo chamador podem ser passados
+    no construtor para evitar uma nova leitura.
+
+    estudo é uma cópia própria do contexto, que pode ser alterada e
+    gravada. config, pesos, temas e calendário são os objetos congelados
+    compartilhados pelo cache de carregar_json (alterá-los gera
+    TypeError); quem precisar editar um deles deve carregá-lo com
+    copiar=True.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        pesos: Optional[Dict[str, Any]] = None,
+        temas: Optional[Dict[str, Any]] = None,
+        estudo: Optional[Dict[str, Any]] = None,
+        calendario: Optional[Dict[str, Any]] = None,
+        agora: Optional[datetime] = None
+    ):
+        self._config = config
+        self._pesos = pesos
+        self._temas = temas
+        self._estudo = estudo
+        self._calendario = calendario
+        self._agora = agora
+
+    @property
+    def agora(self) -> datetime:
+        """
+        Instante de referência do contexto.
+
+        Fixado no primeiro acesso, para que todos os cálculos feitos com
+        este contexto usem exatamente a mesma data.
+        """
+        if self._agora is None:
+            self._agora = datetime.now()
+        return self._agora
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            self._config = helpers.carregar_config()
+        return self._config
+
+    @property
+    def pesos(self) -> Dict[str, Any]:
+        if self._pesos is None:
+            self._pesos = helpers.carregar_pesos()
+        return self._pesos
+
+    @property
+    def temas(self) -> Dict[str, Any]:
+        if self._temas is None:
+            self._temas = helpers.carregar_temas()
+        return self._temas
+
+    @property
+    def estudo(self) -> Dict[str, Any]:
+        if self._estudo is None:
+            from core.catalogo_temas import obter_catalogo_temas
+            from core.ids_temas import migrar_ids_temas, vincular_registro
+
+            # Dados gravados antes dos IDs (uma vez por diretório de dados)
+            migrar_ids_temas()
+            self._estudo = helpers.carregar_estudo()
+            # Temas registrados antes dos IDs (ou fora do catálogo)
+            vincular_registro(self._estudo.get("registro_temas", {}), obter_catalogo_temas(self.temas))
+        return self._estudo
+
+    @property
+    def calendario(self) -> Dict[str, Any]:
+        if self._calendario is None:
+            self._calendario = helpers.carregar_calendario()
+        return self._calendario
+
+    @property
+    def data_prova(self) -> str:
+        """Data estimada da prova (YYYY-MM-DD) definida na configuração."""
+        return self.config.get("usuario", {}).get("data_prova_estimada", "2027-11-15")
@@ -0,0 +1,249 @@
+"""
+Correspondência de Temas das Questões Importadas
+
+Bancos importados rotulam os temas de formas variadas ("Tuberculose
+pulmonar", "TB", "Tuberculose"). Cada rótulo é levado ao tema canônico
+do catálogo (ver catalogo_temas):
+
+1. nome exato, normalizado ou apelido do catálogo (confiança 1,0);
+2. decisão já tomada na fila de revisão para aquele rótulo;
+3. similaridade de trigramas (coeficiente de Dice) sobre os nomes e
+   apelidos do catálogo, sem acentos nem pontuação.
+
+Rótulos com confiança abaixo de LIMIAR_CONFIANCA não são aplicados: vão
+para a fila de revisão (temas_revisao.json) com o melhor candidato, e a
+decisão tomada lá passa a valer para as próximas importações.
+
+Como cada rótulo distinto é avaliado uma única vez, mapear 100 mil
+questões custa essencialmente uma consulta a dicionário por questão.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils import helpers
+from core.catalogo_temas import CatalogoTemas, obter_catalogo_temas
+from core.classificador_yield import normalizar_tema
+
+ARQUIVO_REVISAO = "temas_revisao.json"
+
+# Confiança mínima para aplicar o tema sem revisão
+LIMIAR_CONFIANCA = 0.75
+
+# Abaixo disto o melhor candidato nem é sugerido
+LIMIAR_CANDIDATO = 0.3
+
+# Vantagem, só para ordenar candidatos, dos temas da área da questão
+BONUS_MESMA_AREA = 0.05
+
+_NAO_ALFANUMERICO = re.compile(r"[\W_]+")
+
+_LOCK = threading.Lock()
+
+
+def rotulo_normalizado(texto: str) -> str:
+    """Rótulo sem acentos, caixa e pontuação (chave da fila de revisão)."""
+    return " ".join(_NAO_ALFANUMERICO.sub(" ", normalizar_tema(texto)).split())
+
+
+def trigramas(texto: str) -> set:
+    """Trigramas do rótulo normalizado, com espaços de borda."""
+    texto = f"  {rotulo_normalizado(texto)} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceTrigramas:
+    """
+    Nomes e apelidos do catálogo como uma matriz entrada x trigrama.
+
+    A interseção de um rótulo com todas as entradas é uma soma de
+    colunas da matriz.
+    """
+
+    def __init__(self, catalogo: CatalogoTemas):
+        self._catalogo = catalogo
+        entradas = sorted(set(catalogo.nomes_normalizados()), key=lambda e: (e[1], e[0]))
+        conjuntos = [trigramas(nome) for nome, _ in entradas]
+
+        self._vocabulario: Dict[str, int] = {}
+        for conjunto in conjuntos:
+            for t in conjunto:
+                self._vocabulario.setdefault(t, len(self._vocabulario))
+
+        self._ids = np.array([tema_id for _, tema_id in entradas], dtype=np.int64)
+        self._tamanhos = np.array([len(c) for c in conjuntos], dtype=np.float64)
+        self._matriz = np.zeros((len(entradas), len(self._vocabulario)), dtype=np.uint8)
+        for i, conjunto in enumerate(conjuntos):
+            self._matriz[i, [self._vocabulario[t] for t in conjunto]] = 1
+
+    def candidatos(
+        self,
+        rotulo: str,
+        grande_area: Optional[str] = None,
+        limite: int = 3
+    ) -> List[Tuple[int, float]]:
+        """
+        Melhores temas para o rótulo: [(tema_id, similaridade)], da maior
+        para a menor (um par por tema).
+        """
+        conjunto = trigramas(rotulo)
+        if not conjunto or not len(self._ids):
+            return []
+
+        colunas = [self._vocabulario[t] for t in conjunto if t in self._vocabulario]
+        intersecao = self._matriz[:, colunas].sum(axis=1, dtype=np.float64)
+        similaridade = 2 * intersecao / (len(conjunto) + self._tamanhos)
+
+        ordem = similaridade.copy()
+        if grande_area is not None:
+            mesma_area = np.array([
+                self._catalogo.obter(int(i))["grande_area"] == grande_area for i in self._ids
+            ])
+            ordem += np.where(mesma_area, BONUS_MESMA_AREA, 0.0)
+
+        resultado = []
+        vistos = set()
+        for i in np.argsort(-ordem, kind="stable"):
+            tema_id = int(self._ids[i])
+            if tema_id in vistos:
+                continue
+            vistos.add(tema_id)
+            resultado.append((tema_id, round(float(similaridade[i]), 3)))
+            if len(resultado) == limite:
+                break
+        return resultado
+
+
+def carregar_revisao() -> Dict[str, Any]:
+    """Fila de revisão: {"pendentes": {rotulo: {...}}, "decisoes": {rotulo: tema_id}}."""
+    revisao = helpers.carregar_json(ARQUIVO_REVISAO, copiar=True)
+    revisao.setdefault("pendentes", {})
+    revisao.setdefault("decisoes", {})
+    return revisao
+
+
+class CorrespondenciaTemas:
+    """
+    Leva o tema de cada questão ao tema canônico do catálogo.
+
+    Usada como vincular_tema de importar_questoes: questões com rótulo
+    confiável recebem o nome canônico em "tema" (o rótulo original fica
+    em "tema_original") e o "tema_id"; as demais mantêm o rótulo e entram
+    na fila de revisão.
+    """
+
+    def __init__(self, catalogo: CatalogoTemas, decisoes: Optional[Dict[str, Optional[int]]] = None):
+        self.catalogo = catalogo
+        self.decisoes = decisoes or {}
+        self._indice: Optional[IndiceTrigramas] = None
+        self._cache: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+        self.pendentes: Dict[str, Dict[str, Any]] = {}
+        self.aplicadas = 0
+
+    def corresponder(self, rotulo: str, grande_area: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Retorna {"tema_id", "confianca", "candidatos"} para o rótulo;
+        tema_id é None quando a confiança fica abaixo de LIMIAR_CONFIANCA.
+        """
+        chave = (rotulo, grande_area)
+        resultado = self._cache.get(chave)
+        if resultado is not None:
+            return resultado
+
+        tema = self.catalogo.resolver(rotulo, grande_area)
+        normalizado = rotulo_normalizado(rotulo)
+        if tema is not None:
+            resultado = {"tema_id": tema["id"], "confianca": 1.0, "candidatos": [(tema["id"], 1.0)]}
+        elif normalizado in self.decisoes:
+            tema_id = self.decisoes[normalizado]
+            resultado = {"tema_id": tema_id, "confianca": 1.0, "candidatos": []}
+        else:
+            if self._indice is None:
+                self._indice = IndiceTrigramas(self.catalogo)
+            candidatos = [c for c in self._indice.candidatos(rotulo, grande_area) if c[1] >= LIMIAR_CANDIDATO]
+            confianca = candidatos[0][1] if candidatos else 0.0
+            resultado = {
+                "tema_id": candidatos[0][0] if confianca >= LIMIAR_CONFIANCA else None,
+                "confianca": confianca,
+                "candidatos": candidatos
+            }
+
+        self._cache[chave] = resultado
+        return resultado
+
+    def __call__(self, questao: Dict[str, Any]) -> None:
+        rotulo = questao.get("tema")
+        if not isinstance(rotulo, str) or self.catalogo.obter(questao.get("tema_id")) is not None:
+            return
+
+        resultado = self.corresponder(rotulo, questao.get("grande_area"))
+        tema_id = resultado["tema_id"]
+        if tema_id is not None:
+            questao["tema_id"] = tema_id
+            nome = self.catalogo.obter(tema_id)["nome"]
+            if nome != rotulo:
+                questao.setdefault("tema_original", rotulo)
+                questao["tema"] = nome
+            self.aplicadas += 1
+            return
+
+        normalizado = rotulo_normalizado(rotulo)
+        if normalizado in self.decisoes:
+            return  # Revisado como "sem tema do catálogo"
+
+        pendente = self.pendentes.setdefault(normalizado, {
+            "rotulo": rotulo,
+            "grande_area": questao.get("grande_area"),
+            "candidatos": [list(c) for c in resultado["candidatos"]],
+            "confianca": resultado["confianca"],
+            "questoes": 0
+        })
+        pendente["questoes"] += 1
+
+    def salvar_revisao(self) -> int:
+        """
+        Grava os rótulos pendentes desta importação na fila de revisão
+        (substituindo a contagem de questões de cada rótulo). Retorna o
+        tamanho da fila.
+        """
+        with _LOCK:
+            revisao = carregar_revisao()
+            revisao["pendentes"].update(self.pendentes)
+            helpers.salvar_json(ARQUIVO_REVISAO, revisao, imediato=True)
+            return len(revisao["pendentes"])
+
+
+def obter_correspondencia() -> CorrespondenciaTemas:
+    """Correspondência com o catálogo atual e as decisões já revisadas."""
+    catalogo = obter_catalogo_temas(helpers.carregar_temas())
+    return CorrespondenciaTemas(catalogo, carregar_revisao()["decisoes"])
+
+
+def decidir_tema(rotulo: str, tema_id: Optional[int]) -> int:
+    """
+    Registra a decisão da fila de revisão para um rótulo (tema_id None =
+    nenhum tema do catálogo) e a aplica às questões já importadas.
+
+    Retorna quantas questões passaram a ter o tema.
+    """
+    normalizado = rotulo_normalizado(rotulo)
+    with _LOCK:
+        revisao = carregar_revisao()
+        revisao["decisoes"][normalizado] = tema_id
+        revisao["pendentes"].pop(normalizado, None)
+        helpers.salvar_json(ARQUIVO_REVISAO, revisao, imediato=True)
+
+    if tema_id is None:
+        return 0
+
+    correspondencia = obter_correspondencia()
+    questoes = helpers.carregar_questoes(copiar=True)
+    for q in questoes.get("questoes", []):
+        if isinstance(q.get("tema"), str) and rotulo_normalizado(q["tema"]) == normalizado:
+            correspondencia(q)
+    if correspondencia.aplicadas:
+        helpers.salvar_questoes(questoes)
+    return correspondencia.aplicadas
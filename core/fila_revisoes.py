@@ -0,0 +1,199 @@
+"""
+Fila de Revisões Pendentes
+
+Min-heap persistente das próximas revisões de cada tema, ordenado pela
+data sugerida. A fila é mantida pelas gravações: cada evento de teoria
+ou de revisão recalcula apenas o tema alterado (ver _ao_alterar_estudo).
+O registro inteiro só é percorrido ao montar a fila, quando a data da
+prova muda (a fila é descartada), quando o estudo é regravado sem
+eventos ou traz eventos que a fila não viu, e para estudos montados em
+memória, sem posição no log; mesmo então só os temas cujas datas de
+teoria ou de revisão mudaram têm o cronograma recalculado.
+
+Entradas substituídas não são retiradas do heap na hora (remoção
+preguiçosa); elas são ignoradas nas consultas e descartadas quando o heap
+é compactado.
+
+As consultas percorrem o heap em ordem (busca pelo menor entre os nós já
+alcançados), de modo que as k primeiras revisões custam O(k log k) e a
+busca "vence até o dia D" para na primeira entrada depois de D.
+"""
+
+import heapq
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.eventos_estudo import (
+    TIPOS_TEMA, Posicao, ao_alterar_estudo, indice_atrasado, posicao_estudo, seguir_evento
+)
+
+_LOCK = threading.Lock()
+_FILA: Optional["FilaRevisoes"] = None
+
+# Entrada do heap: (dia, ordem, versao, chave). O dia é contado desde
+# 1970-01-01; a ordem de chegada do tema desempata datas iguais como a
+# ordenação estável do registro; a versão torna cada entrada única.
+Entrada = Tuple[int, int, int, str]
+
+
+def _assinatura(dados: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Campos do registro de que a próxima revisão depende."""
+    return (dados.get("data_teoria"),) + tuple(
+        (dados.get(rev) or {}).get("data") for rev in ("r1", "r2", "r3")
+    )
+
+
+class FilaRevisoes:
+    """
+    Próxima revisão de cada tema, ordenada por data sugerida.
+
+    Temas sem teoria registrada ou com as três revisões feitas não entram
+    na fila.
+    """
+
+    def __init__(self, data_prova: datetime):
+        self.data_prova = data_prova
+        self._heap: List[Entrada] = []
+        self._entradas: Dict[str, Tuple[Entrada, int]] = {}
+        self._assinaturas: Dict[str, Tuple[Any, ...]] = {}
+        self._ordem: Dict[str, int] = {}
+        self._proxima_ordem = 0
+        self._versao = 0
+        # Posição no log refletida pela fila (None: sincronizar antes de
+        # consultar) e calculadora usada para os temas avisados
+        self.posicao: Optional[Posicao] = None
+        self.calculadora: Any = None
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def atualizar(self, chave: str, revisao: int, dia: int) -> None:
+        """Define a próxima revisão do tema (revisao == 0 o retira da fila)."""
+        if chave not in self._ordem:
+            self._ordem[chave] = self._proxima_ordem
+            self._proxima_ordem += 1
+
+        if not revisao:
+            self._entradas.pop(chave, None)
+            return
+
+        self._versao += 1
+        entrada = (dia, self._ordem[chave], self._versao, chave)
+        self._entradas[chave] = (entrada, revisao)
+        heapq.heappush(self._heap, entrada)
+
+        if len(self._heap) > 2 * len(self._entradas) + 64:
+            self._compactar()
+
+    def remover(self, chave: str) -> None:
+        self._entradas.pop(chave, None)
+        self._assinaturas.pop(chave, None)
+        self._ordem.pop(chave, None)
+
+    def _compactar(self) -> None:
+        """Reconstrói o heap apenas com as entradas vigentes."""
+        self._heap = [entrada for entrada, _ in self._entradas.values()]
+        heapq.heapify(self._heap)
+
+    def _recalcular(self, calculadora, registro: Dict[str, Dict[str, Any]], chaves: List[str]) -> None:
+        """Calcula em lote a próxima revisão dos temas informados."""
+        lote = calculadora.calcular_proximas_acoes_lote([registro[chave] for chave in chaves])
+        dias = lote["data_sugerida"].astype(np.int64).tolist()
+        for chave, revisao, dia in zip(chaves, lote["revisao"].tolist(), dias):
+            self.atualizar(chave, revisao, dia)
+            self._assinaturas[chave] = _assinatura(registro[chave])
+
+    def atualizar_tema(self, calculadora, registro: Dict[str, Dict[str, Any]], chave: str) -> None:
+        """Recalcula um único tema do registro, se suas datas mudaram."""
+        if self._assinaturas.get(chave) != _assinatura(registro[chave]):
+            self._recalcular(calculadora, registro, [chave])
+
+    def sincronizar(self, calculadora, registro: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Incorpora as alterações do registro desde a última sincronização.
+
+        Percorre todo o registro; as próximas revisões dos temas alterados
+        são calculadas em lote por calculadora.calcular_proximas_acoes_lote.
+        """
+        alteradas = [
+            chave for chave, dados in registro.items()
+            if self._assinaturas.get(chave) != _assinatura(dados)
+        ]
+        if alteradas:
+            self._recalcular(calculadora, registro, alteradas)
+
+        # Todo tema do registro já tem ordem; sobras foram removidas dele
+        if len(self._ordem) > len(registro):
+            for chave in self._ordem.keys() - registro.keys():
+                self.remover(chave)
+
+    def menores(self, limite: Optional[int] = None, ate_dia: Optional[int] = None) -> Iterator[Tuple[str, int, int]]:
+        """
+        Percorre a fila em ordem, gerando (chave, revisao, dia).
+
+        Args:
+            limite: Número máximo de revisões
+            ate_dia: Para na primeira revisão sugerida depois deste dia
+        """
+        heap = self._heap
+        if not heap:
+            return
+
+        fronteira = [(heap[0], 0)]
+        entregues = 0
+        while fronteira and (limite is None or entregues < limite):
+            entrada, i = heapq.heappop(fronteira)
+            dia, _, _, chave = entrada
+            if ate_dia is not None and dia > ate_dia:
+                break
+
+            for filho in (2 * i + 1, 2 * i + 2):
+                if filho < len(heap):
+                    heapq.heappush(fronteira, (heap[filho], filho))
+
+            vigente = self._entradas.get(chave)
+            if vigente is not None and vigente[0] is entrada:
+                entregues += 1
+                yield chave, vigente[1], dia
+
+
+@ao_alterar_estudo
+def _ao_alterar_estudo(estudo: Dict[str, Any], evento: Optional[Dict[str, Any]]) -> None:
+    """Mantém a fila em dia a cada gravação, recalculando só o tema alterado."""
+    with _LOCK:
+        fila = _FILA
+        if fila is None or fila.posicao is None:
+            return
+        posicao = seguir_evento(fila.posicao, evento) if evento is not None else None
+        if posicao is not None and evento["seq"] > fila.posicao[1] and evento["tipo"] in TIPOS_TEMA:
+            fila.atualizar_tema(fila.calculadora, estudo["registro_temas"], evento["tema"])
+        fila.posicao = posicao
+
+
+def consultar_fila_revisoes(
+    calculadora,
+    estudo: Dict[str, Any],
+    limite: Optional[int] = None,
+    ate_dia: Optional[int] = None
+) -> List[Tuple[str, int, int]]:
+    """
+    Próximas revisões do estudo, em ordem de data sugerida.
+
+    A fila é compartilhada e reaproveitada enquanto a data da prova da
+    calculadora não mudar. Com a fila em dia com o estudo, a consulta
+    apenas percorre o heap. Retorna [(chave, revisao, dia), ...] (ver
+    FilaRevisoes.menores).
+    """
+    global _FILA
+    posicao = posicao_estudo(estudo)
+    with _LOCK:
+        if _FILA is None or _FILA.data_prova != calculadora.data_prova:
+            _FILA = FilaRevisoes(calculadora.data_prova)
+        _FILA.calculadora = calculadora
+        if indice_atrasado(_FILA.posicao, posicao):
+            _FILA.sincronizar(calculadora, estudo.get("registro_temas", {}))
+            _FILA.posicao = posicao
+        return list(_FILA.menores(limite, ate_dia))
@@ -0,0 +1,168 @@
+"""
+IDs de Temas
+
+Camada de canonização sobre o catálogo de temas (ver catalogo_temas).
+Os IDs inteiros ficam gravados em temas.json e cada fonte de dados é
+associada a eles uma única vez, ao carregar ou importar:
+
+- estudo: "tema_id" ao lado de cada tema de registro_temas;
+- questões: "tema_id" em cada questão cujo tema está no catálogo;
+- pesos_enamed.json: classificação e multiplicador de cada ID, e os IDs
+  relacionados a cada lista de temas prioritários.
+
+Com isso os caminhos quentes comparam inteiros em vez de procurar nomes
+por substring. Temas fora do catálogo (sem ID) seguem pelo caminho por
+nome.
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from utils import helpers
+from core.catalogo_temas import CatalogoTemas, obter_catalogo_temas
+from core.classificador_yield import ClassificadorYield, obter_classificador
+
+CAMPO_ID = "tema_id"
+
+# Chave de migracoes em config.json marcada depois de migrar_ids_temas
+MIGRACAO = "ids_temas"
+
+_LOCK = threading.Lock()
+_MAPA: Optional[Tuple[CatalogoTemas, ClassificadorYield, "MapaPesos"]] = None
+_MIGRADOS: Set[Path] = set()
+
+
+def atribuir_ids_temas(temas: Dict[str, Any]) -> int:
+    """
+    Grava no próprio temas.json (em memória) o "id" de cada tema.
+
+    Os IDs são os do catálogo: temas que já têm um o mantêm. Retorna
+    quantos temas foram alterados.
+    """
+    catalogo = CatalogoTemas(temas)
+    alterados = 0
+    for area, dados in temas.get("grandes_areas", {}).items():
+        for tema, canonico in zip(dados.get("temas", []), catalogo.por_area(area)):
+            if tema.get("id") != canonico["id"]:
+                tema["id"] = canonico["id"]
+                alterados += 1
+    return alterados
+
+
+def _vincular(dados: Dict[str, Any], nome: Any, catalogo: CatalogoTemas) -> bool:
+    """Define o tema_id de um registro; retorna True se ele mudou."""
+    atual = dados.get(CAMPO_ID)
+    if atual is not None and catalogo.obter(atual) is not None:
+        return False
+
+    tema = catalogo.resolver(nome, dados.get("grande_area")) if isinstance(nome, str) else None
+    if tema is None:
+        return dados.pop(CAMPO_ID, None) is not None
+    dados[CAMPO_ID] = tema["id"]
+    return True
+
+
+def vincular_registro(registro: Dict[str, Dict[str, Any]], catalogo: CatalogoTemas) -> int:
+    """
+    Associa cada tema de registro_temas ao seu ID no catálogo.
+
+    IDs já gravados e ainda válidos são mantidos. Retorna quantos temas
+    foram alterados.
+    """
+    return sum(_vincular(dados, chave, catalogo) for chave, dados in registro.items())
+
+
+def vincular_questao(questao: Dict[str, Any], catalogo: CatalogoTemas) -> bool:
+    """Associa a questão ao ID do seu tema; retorna True se ela mudou."""
+    return _vincular(questao, questao.get("tema"), catalogo)
+
+
+def vincular_questoes(questoes: Iterable[Dict[str, Any]], catalogo: CatalogoTemas) -> int:
+    """Associa cada questão ao ID do seu tema; retorna quantas mudaram."""
+    return sum(vincular_questao(q, catalogo) for q in questoes)
+
+
+class MapaPesos:
+    """
+    Pesos do ENAMED associados aos IDs do catálogo.
+
+    A classificação de cada tema do catálogo é calculada uma única vez
+    pelo classificador (mesmo resultado de classificar(nome, área)).
+    """
+
+    def __init__(self, catalogo: CatalogoTemas, classificador: ClassificadorYield):
+        self._catalogo = catalogo
+        self.classificacao: Dict[int, Tuple[str, float]] = {
+            tema["id"]: classificador.classificar(tema["nome"], tema["grande_area"])
+            for tema in catalogo
+        }
+        self._relacionados: Dict[Tuple[str, ...], FrozenSet[int]] = {}
+
+    def ids_relacionados(self, nomes: List[str]) -> FrozenSet[int]:
+        """
+        IDs dos temas relacionados a uma lista de nomes (ex.: temas
+        prioritários de um rodízio): o nome contém o tema ou está contido
+        nele, sem diferenciar maiúsculas.
+        """
+        chave = tuple(nomes)
+        ids = self._relacionados.get(chave)
+        if ids is None:
+            minusculos = [n.lower() for n in nomes]
+            ids = self._relacionados[chave] = frozenset(
+                tema["id"] for tema in self._catalogo
+                if any(n in tema["nome"].lower() or tema["nome"].lower() in n for n in minusculos)
+            )
+        return ids
+
+
+def obter_mapa_pesos(catalogo: CatalogoTemas, pesos: Dict[str, Any]) -> MapaPesos:
+    """Mapa dos pesos para o catálogo, refeito quando um dos dois muda."""
+    global _MAPA
+    classificador = obter_classificador(pesos)
+    with _LOCK:
+        if _MAPA is None or _MAPA[0] is not catalogo or _MAPA[1] is not classificador:
+            _MAPA = (catalogo, classificador, MapaPesos(catalogo, classificador))
+        return _MAPA[2]
+
+
+def migrar_ids_temas() -> Dict[str, int]:
+    """
+    Grava os IDs em temas.json, no estudo e no banco de questões.
+
+    Chamada no carregamento compartilhado dos dados (ContextoDados.estudo
+    e o banco de questões de cache_paginas), não por uma página. Roda uma
+    vez por diretório de dados: a conclusão fica marcada em config.json
+    (migracoes.ids_temas) e, no processo, em _MIGRADOS; arquivos já
+    migrados não são regravados. Retorna quantos temas, temas do
+    registro e questões foram alterados.
+    """
+    with _LOCK:
+        if helpers.DATA_DIR in _MIGRADOS:
+            return {"temas": 0, "estudo": 0, "questoes": 0}
+        _MIGRADOS.add(helpers.DATA_DIR)
+    if helpers.carregar_json("config.json").get("migracoes", {}).get(MIGRACAO):
+        return {"temas": 0, "estudo": 0, "questoes": 0}
+
+    temas = helpers.carregar_temas(copiar=True)
+    resultado = {"temas": atribuir_ids_temas(temas)}
+    if resultado["temas"]:
+        helpers.salvar_json("temas.json", temas, imediato=True)
+    catalogo = obter_catalogo_temas(temas)
+
+    estudo = helpers.carregar_estudo()
+    resultado["estudo"] = vincular_registro(estudo.get("registro_temas", {}), catalogo)
+    if resultado["estudo"]:
+        helpers.salvar_estudo(estudo)
+
+    questoes = helpers.carregar_questoes(copiar=True)
+    resultado["questoes"] = vincular_questoes(questoes.get("questoes", []), catalogo)
+    if resultado["questoes"]:
+        helpers.salvar_questoes(questoes)
+
+    # Sem config.json o sistema ainda não foi configurado: nada a marcar
+    if (helpers.DATA_DIR / "config.json").exists():
+        config = helpers.carregar_json("config.json", copiar=True)
+        config.setdefault("migracoes", {})[MIGRACAO] = True
+        helpers.salvar_json("config.json", config)
+    return resultado
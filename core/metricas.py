@@ -16,13 +16,44 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.helpers import (
-    carregar_config, carregar_pesos, carregar_estudo,
-    calcular_porcentagem_acerto
-)
+from utils.helpers import calcular_porcentagem_acerto
 from utils.constants import (
     NIVEIS_PERFORMANCE, CORES_DEGRADÊ, NIVEIS_PRIORIDADE
 )
+from utils.agregados_estudo import obter_agregados, SEM_AREA
+from core.contexto import ContextoDados
+from core.catalogo_temas import CatalogoTemas, obter_catalogo_temas
+
+# Palavras-chave para temas fora do catálogo (a primeira que aparecer vale)
+_PALAVRAS_AREA = (
+    ("trauma", "Cirurgia Geral"),
+    ("abdome", "Cirurgia Geral"),
+    ("hérnia", "Cirurgia Geral"),
+    ("diabetes", "Clinica Medica"),
+    ("hipertensão", "Clinica Medica"),
+    ("pneumonia", "Clinica Medica"),
+    ("tuberculose", "Clinica Medica"),
+    ("hiv", "Clinica Medica"),
+    ("pré-natal", "Ginecologia e Obstetricia"),
+    ("parto", "Ginecologia e Obstetricia"),
+    ("eclâmpsia", "Ginecologia e Obstetricia"),
+    ("puericultura", "Pediatria"),
+    ("vacina", "Pediatria"),
+    ("neonatal", "Pediatria"),
+    ("sus", "Saude Coletiva"),
+    ("ética", "Saude Coletiva"),
+    ("óbito", "Saude Coletiva")
+)
+
+_AREA_PADRAO = "Clinica Medica"
+
+
+def _area_por_palavras(tema_lower: str) -> str:
+    """Grande área de um tema órfão pela primeira palavra-chave encontrada."""
+    for palavra, area in _PALAVRAS_AREA:
+        if palavra in tema_lower:
+            return area
+    return _AREA_PADRAO
 
 
 class SistemaMetricas:
@@ -30,10 +61,13 @@ class SistemaMetricas:
     Sistema de métricas para acompanhamento de performance.
     """
     
-    def __init__(self):
-        self.config = carregar_config()
-        self.pesos = carregar_pesos()
-        self.estudo = carregar_estudo()
+    def __init__(self, contexto: Optional[ContextoDados] = None):
+        contexto = contexto or ContextoDados()
+        
+        self.contexto = contexto
+        self.config = contexto.config
+        self.pesos = contexto.pesos
+        self.estudo = contexto.estudo
         self.nota_meta = self.config.get("metas", {}).get("nota_meta", 90)
     
     def calcular_setinha(self, porcentagem: float, meta_tema: float = None) -> Dict[str, Any]:
@@ -152,23 +186,28 @@ class SistemaMetricas:
                 "detalhes": {}
             }
         
-        # Calcular por área
-        notas_area = {}
+        # Totais por área já materializados no estudo (ver agregados_estudo)
+        agregados = obter_agregados(self.estudo)
         pesos_areas = self.pesos.get("pesos_areas", {})
         
-        for tema_key, dados in registro.items():
-            # Identificar grande área (simplificado)
-            grande_area = self._identificar_area(tema_key)
-            
-            if grande_area not in notas_area:
-                notas_area[grande_area] = {"acertos": 0, "total": 0}
-            
-            # Somar todas as revisões
-            for rev in ["r1", "r2", "r3"]:
-                rev_dados = dados.get(rev, {})
-                if rev_dados.get("questoes"):
-                    notas_area[grande_area]["total"] += rev_dados["questoes"]
-                    notas_area[grande_area]["acertos"] += rev_dados.get("acertos", 0)
+        notas_area = {
+            area: {"acertos": stats["acertos"], "total": stats["questoes"]}
+            for area, stats in agregados["areas"].items()
+            if area != SEM_AREA
+        }
+        
+        # Temas sem grande_area no registro: área pelo catálogo ou palavras-chave
+        if SEM_AREA in agregados["areas"]:
+            orfaos = {
+                tema_key: registro.get(tema_key, {})
+                for tema_key, tema in agregados["temas"].items()
+                if tema["grande_area"] == SEM_AREA
+            }
+            for tema_key, grande_area in self.mapear_areas(orfaos).items():
+                tema = agregados["temas"][tema_key]
+                stats = notas_area.setdefault(grande_area, {"acertos": 0, "total": 0})
+                stats["acertos"] += tema["acertos"]
+                stats["total"] += tema["questoes"]
         
         # Calcular nota ponderada
         nota_total = 0
@@ -208,36 +247,42 @@ class SistemaMetricas:
             "detalhes": detalhes
         }
     
-    def _identificar_area(self, tema_key: str) -> str:
-        """Identifica a grande área de um tema (simplificado)."""
-        # Mapeamento simplificado
-        mapeamento = {
-            "trauma": "Cirurgia Geral",
-            "abdome": "Cirurgia Geral",
-            "hérnia": "Cirurgia Geral",
-            "diabetes": "Clinica Medica",
-            "hipertensão": "Clinica Medica",
-            "pneumonia": "Clinica Medica",
-            "tuberculose": "Clinica Medica",
-            "hiv": "Clinica Medica",
-            "pré-natal": "Ginecologia e Obstetricia",
-            "parto": "Ginecologia e Obstetricia",
-            "eclâmpsia": "Ginecologia e Obstetricia",
-            "puericultura": "Pediatria",
-            "vacina": "Pediatria",
-            "neonatal": "Pediatria",
-            "sus": "Saude Coletiva",
-            "ética": "Saude Coletiva",
-            "óbito": "Saude Coletiva"
-        }
+    def _identificar_area(
+        self,
+        tema_key: str,
+        dados: Optional[Dict[str, Any]] = None,
+        catalogo: Optional[CatalogoTemas] = None
+    ) -> str:
+        """
+        Identifica a grande área de um tema.
         
-        tema_lower = tema_key.lower()
+        Ordem: tema_id gravado no registro, "grande_area" do próprio
+        registro (a mesma dos agregados), nome no catálogo de temas.json
+        e, só para temas órfãos, palavras-chave.
+        """
+        if catalogo is None:
+            catalogo = obter_catalogo_temas(self.contexto.temas)
+        dados = dados or {}
         
-        for palavra, area in mapeamento.items():
-            if palavra in tema_lower:
-                return area
+        tema = catalogo.obter(dados.get("tema_id"))
+        if tema is not None:
+            return tema["grande_area"]
+        if dados.get("grande_area"):
+            return dados["grande_area"]
         
-        return "Clinica Medica"  # Default
+        tema = catalogo.resolver(tema_key)
+        if tema is not None:
+            return tema["grande_area"]
+        
+        return _area_por_palavras(tema_key.lower())
+    
+    def mapear_areas(self, registro: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        """Grande área de cada tema do registro, em uma única passada."""
+        catalogo = obter_catalogo_temas(self.contexto.temas)
+        return {
+            tema_key: self._identificar_area(tema_key, dados, catalogo)
+            for tema_key, dados in registro.items()
+        }
     
     def calcular_media_questoes_semana(self) -> Dict[str, Any]:
         """
@@ -246,7 +291,7 @@ class SistemaMetricas:
         from utils.helpers import calcular_semanas_ate_prova
         
         data_prova = self.config.get("usuario", {}).get("data_prova_estimada", "2027-11-15")
-        semanas = calcular_semanas_ate_prova(data_prova)
+        semanas = calcular_semanas_ate_prova(data_prova, self.contexto.agora)
         
         stats = self.estudo.get("estatisticas_gerais", {})
         questoes_feitas = stats.get("total_questoes_feitas", 0)
@@ -290,14 +335,14 @@ class SistemaMetricas:
         }
 
 
-def obter_estatisticas() -> Dict[str, Any]:
+def obter_estatisticas(contexto: Optional[ContextoDados] = None) -> Dict[str, Any]:
     """Função de conveniência para obter estatísticas."""
-    metricas = SistemaMetricas()
+    metricas = SistemaMetricas(contexto)
     return metricas.gerar_estatisticas_completas()
 
 
-def obter_nota_estimada() -> float:
+def obter_nota_estimada(contexto: Optional[ContextoDados] = None) -> float:
     """Função de conveniência para obter nota estimada."""
-    metricas = SistemaMetricas()
+    metricas = SistemaMetricas(contexto)
     return metricas.calcular_nota_estimada()["nota_estimada"]
 
@@ -4,13 +4,36 @@ Priorizador ENAMED - High-Yield / Low-Yield
 Classifica e prioriza temas baseado nos pesos estratégicos do ENAMED.
 """
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.helpers import carregar_pesos, carregar_temas, carregar_estudo
+from core.contexto import ContextoDados
+from core.classificador_yield import obter_classificador
+from core.catalogo_temas import obter_catalogo_temas
+from core.ids_temas import obter_mapa_pesos
+from core.cobertura_hy import obter_cobertura_hy
+
+# Cor, ícone e descrição exibidos para cada classificação
+APRESENTACAO_CLASSIFICACAO = {
+    "high_yield": {
+        "cor": "#00CC00",  # Verde
+        "icone": "🔥",
+        "descricao": "Tema com alta probabilidade de cobrança no ENAMED"
+    },
+    "low_yield": {
+        "cor": "#999999",  # Cinza
+        "icone": "📉",
+        "descricao": "Tema com baixa probabilidade de cobrança - pode deprioritizar"
+    },
+    "normal": {
+        "cor": "#FFCC00",  # Amarelo
+        "icone": "📖",
+        "descricao": "Tema regular"
+    }
+}
 
 
 class PriorizadorENAMED:
@@ -23,48 +46,23 @@ class PriorizadorENAMED:
     - Low-Yield: Temas de baixa cobrança (podem ser depriorizados)
     """
     
-    def __init__(self):
-        self.pesos = carregar_pesos()
-        self.temas = carregar_temas()
-        self.estudo = carregar_estudo()
+    def __init__(self, contexto: Optional[ContextoDados] = None):
+        contexto = contexto or ContextoDados()
+        
+        self.contexto = contexto
+        self.pesos = contexto.pesos
+        self.temas = contexto.temas
+        self.estudo = contexto.estudo
     
     def classificar_tema(self, tema: str, grande_area: str) -> Dict[str, Any]:
         """
         Classifica um tema em High-Yield, Normal ou Low-Yield.
         """
-        # Verificar High-Yield
-        high_yield_lista = self.pesos.get("temas_high_yield", {}).get(grande_area, [])
-        
-        for hy in high_yield_lista:
-            if hy.lower() in tema.lower() or tema.lower() in hy.lower():
-                return {
-                    "classificacao": "high_yield",
-                    "cor": "#00CC00",  # Verde
-                    "icone": "🔥",
-                    "multiplicador": self.pesos["multiplicadores"]["high_yield"],
-                    "descricao": "Tema com alta probabilidade de cobrança no ENAMED"
-                }
-        
-        # Verificar Low-Yield
-        low_yield_lista = self.pesos.get("temas_low_yield", [])
-        
-        for ly in low_yield_lista:
-            if ly.lower() in tema.lower():
-                return {
-                    "classificacao": "low_yield",
-                    "cor": "#999999",  # Cinza
-                    "icone": "📉",
-                    "multiplicador": self.pesos["multiplicadores"]["low_yield"],
-                    "descricao": "Tema com baixa probabilidade de cobrança - pode deprioritizar"
-                }
-        
-        # Normal
+        classificacao, multiplicador = obter_classificador(self.pesos).classificar(tema, grande_area)
         return {
-            "classificacao": "normal",
-            "cor": "#FFCC00",  # Amarelo
-            "icone": "📖",
-            "multiplicador": self.pesos["multiplicadores"]["normal"],
-            "descricao": "Tema regular"
+            "classificacao": classificacao,
+            "multiplicador": multiplicador,
+            **APRESENTACAO_CLASSIFICACAO[classificacao]
         }
     
     def listar_high_yield_por_area(self, grande_area: str) -> List[str]:
@@ -83,85 +81,24 @@ class PriorizadorENAMED:
         """
         Calcula a cobertura de temas High-Yield no estudo atual.
         
-        Retorna estatísticas de quantos temas HY foram revisados.
+        Retorna estatísticas de quantos temas HY foram revisados. O
+        resultado é compartilhado entre as páginas (somente leitura).
         """
-        registro = self.estudo.get("registro_temas", {})
-        
-        resultado = {
-            "por_area": {},
-            "total": {
-                "high_yield_total": 0,
-                "high_yield_revisados": 0,
-                "percentual_cobertura": 0
-            }
-        }
-        
-        for area, temas_hy in self.pesos.get("temas_high_yield", {}).items():
-            revisados = 0
-            
-            for tema_hy in temas_hy:
-                # Verificar se existe no registro
-                for tema_key, dados in registro.items():
-                    if tema_hy.lower() in tema_key.lower():
-                        if dados.get("r1") or dados.get("r2") or dados.get("r3"):
-                            revisados += 1
-                            break
-            
-            total = len(temas_hy)
-            percentual = (revisados / total * 100) if total > 0 else 0
-            
-            resultado["por_area"][area] = {
-                "total": total,
-                "revisados": revisados,
-                "percentual": round(percentual, 1)
-            }
-            
-            resultado["total"]["high_yield_total"] += total
-            resultado["total"]["high_yield_revisados"] += revisados
-        
-        if resultado["total"]["high_yield_total"] > 0:
-            resultado["total"]["percentual_cobertura"] = round(
-                resultado["total"]["high_yield_revisados"] / 
-                resultado["total"]["high_yield_total"] * 100, 1
-            )
-        
-        return resultado
+        return obter_cobertura_hy(self.pesos, self.estudo)
     
     def obter_high_yield_pendentes(self) -> List[Dict[str, Any]]:
         """
         Retorna lista de temas High-Yield que ainda não foram revisados.
         """
-        registro = self.estudo.get("registro_temas", {})
-        pendentes = []
-        
-        for area, temas_hy in self.pesos.get("temas_high_yield", {}).items():
-            for tema_hy in temas_hy:
-                revisado = False
-                
-                for tema_key, dados in registro.items():
-                    if tema_hy.lower() in tema_key.lower():
-                        if dados.get("r1") or dados.get("r2") or dados.get("r3"):
-                            revisado = True
-                            break
-                
-                if not revisado:
-                    pendentes.append({
-                        "tema": tema_hy,
-                        "grande_area": area,
-                        "peso_area": self.pesos["pesos_areas"].get(area, 0),
-                        "urgencia": "alta"
-                    })
-        
-        # Ordenar por peso da área (mais importante primeiro)
-        pendentes.sort(key=lambda x: x["peso_area"], reverse=True)
-        
-        return pendentes
+        return list(obter_cobertura_hy(self.pesos, self.estudo)["pendentes"])
     
     def gerar_relatorio_prioridades(self) -> Dict[str, Any]:
         """
         Gera um relatório completo de prioridades.
         """
         todas_areas = self.temas.get("grandes_areas", {})
+        catalogo = obter_catalogo_temas(self.temas)
+        mapa = obter_mapa_pesos(catalogo, self.pesos)
         
         relatorio = {
             "areas": {},
@@ -173,7 +110,7 @@ class PriorizadorENAMED:
             }
         }
         
-        for area, dados in todas_areas.items():
+        for area in todas_areas:
             area_info = {
                 "peso_enamed": self.pesos["pesos_areas"].get(area, 0),
                 "temas": {
@@ -183,14 +120,17 @@ class PriorizadorENAMED:
                 }
             }
             
-            for tema in dados.get("temas", []):
-                classificacao = self.classificar_tema(tema["nome"], area)
-                area_info["temas"][classificacao["classificacao"]].append({
+            for tema in catalogo.por_area(area):
+                classificacao, multiplicador = mapa.classificacao[tema["id"]]
+                area_info["temas"][classificacao].append({
+                    "id": tema["id"],
                     "nome": tema["nome"],
-                    **classificacao
+                    "classificacao": classificacao,
+                    "multiplicador": multiplicador,
+                    **APRESENTACAO_CLASSIFICACAO[classificacao]
                 })
                 
-                relatorio["resumo"][classificacao["classificacao"]] += 1
+                relatorio["resumo"][classificacao] += 1
                 relatorio["resumo"]["total_temas"] += 1
             
             relatorio["areas"][area] = area_info
@@ -216,19 +156,23 @@ class PriorizadorENAMED:
         return alertas
 
 
-def classificar_tema(tema: str, grande_area: str) -> str:
+def classificar_tema(
+    tema: str,
+    grande_area: str,
+    contexto: Optional[ContextoDados] = None
+) -> str:
     """
     Função de conveniência para classificar um tema.
     """
-    prio = PriorizadorENAMED()
+    prio = PriorizadorENAMED(contexto)
     resultado = prio.classificar_tema(tema, grande_area)
     return resultado["classificacao"]
 
 
-def obter_alertas() -> List[Dict[str, Any]]:
+def obter_alertas(contexto: Optional[ContextoDados] = None) -> List[Dict[str, Any]]:
     """
     Função de conveniência para obter alertas High-Yield.
     """
-    prio = PriorizadorENAMED()
+    prio = PriorizadorENAMED(contexto)
     return prio.obter_alertas_high_yield()
 
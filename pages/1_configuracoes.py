@@ -12,8 +12,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.helpers import (
     carregar_config, salvar_config, carregar_pesos,
-    carregar_temas, calcular_dias_ate_prova
+    carregar_temas, calcular_dias_ate_prova,
+    carregar_estudo, salvar_estudo
 )
+from utils.agregados_estudo import verificar_agregados, reconstruir_agregados
 from utils.constants import (
     GRANDES_AREAS, MODOS_ESTUDO, MARGENS_ESTUDO,
     META_QUESTOES_SEMANA
@@ -288,6 +290,29 @@ with tab4:
             help="Marque se este é o ano em que você PRECISA passar. O sistema ajustará a intensidade."
         )
         
+        backend_estudo = st.selectbox(
+            "Armazenamento dos registros",
+            options=["json", "sqlite"],
+            format_func=lambda x: {"json": "Arquivo JSON", "sqlite": "Banco SQLite"}[x],
+            index=0 if config.get("armazenamento", {}).get("estudo", "json") == "json" else 1,
+            help="""
+            **Arquivo JSON**: todo o registro fica em estudo.json (padrão).
+            
+            **Banco SQLite**: cada revisão é gravada isoladamente em estudo.db,
+            recomendado para históricos longos. O estudo.json atual é migrado
+            automaticamente e mantido como cópia de segurança.
+            """
+        )
+        
+        janela_escrita = st.number_input(
+            "Agrupar gravações (segundos)",
+            min_value=0.0,
+            max_value=10.0,
+            step=0.5,
+            value=float(config.get("armazenamento", {}).get("janela_escrita_segundos", 0)),
+            help="Salvamentos feitos dentro deste intervalo são gravados em disco uma única vez. 0 grava imediatamente."
+        )
+        
         st.markdown("---")
         
         if modo == "focado_resultado":
@@ -336,10 +361,19 @@ with col2:
                 "ano_para_valer": ano_valer
             },
             "diagnostico_inicial": areas_inputs,
-            "configurado": True
+            "armazenamento": {
+                "estudo": backend_estudo,
+                "janela_escrita_segundos": janela_escrita
+            },
+            "configurado": True,
+            "migracoes": config.get("migracoes", {})
         }
         
         salvar_config(nova_config)
+        
+        if backend_estudo == "sqlite":
+            from utils.armazenamento_sqlite import migrar_json_para_sqlite
+            migrar_json_para_sqlite()
         st.success("✅ Configurações salvas com sucesso!")
         st.balloons()
 
@@ -360,6 +394,19 @@ with st.sidebar:
         st.warning("Configure o sistema para começar!")
     
     st.markdown("---")
+    st.markdown("### 🧮 Agregados do Estudo")
+    st.caption("Totais por área, revisão e tema usados pelos painéis.")
+    
+    if st.button("🔍 Verificar e reconstruir", width="stretch"):
+        estudo = carregar_estudo()
+        divergencias = verificar_agregados(estudo)
+        if divergencias:
+            reconstruir_agregados(estudo)
+            salvar_estudo(estudo)
+            st.warning(f"{len(divergencias)} divergência(s) corrigida(s): {', '.join(divergencias[:5])}")
+        else:
+            st.success("Agregados íntegros ✓")
+    st.markdown("---")
     st.markdown("""
     ### 📚 Pesos ENAMED
     
@@ -228,6 +228,7 @@ with tab2:
                     "grande_area_principal": grande_area
                 }
                 
+                calendario = carregar_calendario(copiar=True)
                 if "2027" not in calendario.get("ano_2", {}):
                     calendario["ano_2"]["2027"] = []
                 
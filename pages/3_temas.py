@@ -13,6 +13,7 @@ from utils.helpers import carregar_temas, carregar_pesos, carregar_estudo
 from utils.styles import inject_css, render_main_header, render_progress_bar
 from core.priorizador_enamed import PriorizadorENAMED
 from core.algoritmo_sugestao import AlgoritmoSugestao
+from core.contexto import ContextoDados
 
 st.set_page_config(
     page_title="Temas - Plataforma de Estudos",
@@ -30,12 +31,13 @@ st.markdown(
 )
 
 # Carregar dados
-temas = carregar_temas()
-pesos = carregar_pesos()
-estudo = carregar_estudo()
+contexto = ContextoDados()
+temas = contexto.temas
+pesos = contexto.pesos
+estudo = contexto.estudo
 
-priorizador = PriorizadorENAMED()
-algoritmo = AlgoritmoSugestao()
+priorizador = PriorizadorENAMED(contexto)
+algoritmo = AlgoritmoSugestao(contexto)
 
 # Filtros
 col1, col2 = st.columns(2)
@@ -55,6 +57,17 @@ with col2:
 
 st.markdown("---")
 
+# Prioridade de todos os temas em um único cálculo
+itens_prioridade = [
+    (tema_info["nome"], area)
+    for area, dados in temas.get("grandes_areas", {}).items()
+    for tema_info in dados.get("temas", [])
+]
+prioridades = dict(zip(
+    itens_prioridade,
+    algoritmo.calcular_sugestoes_lote(itens_prioridade)["prioridade"].tolist()
+))
+
 # Mostrar temas
 for area, dados in temas.get("grandes_areas", {}).items():
     if area_selecionada != "Todas" and area != area_selecionada:
@@ -90,7 +103,7 @@ for area, dados in temas.get("grandes_areas", {}).items():
             status_r3 = "✅" if registro_tema.get("r3", {}).get("data") else "⬜"
             
             # Calcular prioridade
-            prioridade = algoritmo.calcular_prioridade_tema(nome, area)
+            prioridade = prioridades[(nome, area)]
             
             dados_tabela.append({
                 "Tema": nome,
@@ -11,13 +11,16 @@ import pandas as pd
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.helpers import (
-    carregar_estudo, salvar_estudo, carregar_temas,
+    carregar_estudo, carregar_temas,
     carregar_config, carregar_pesos
 )
+from utils.eventos_estudo import registrar_evento
 from utils.styles import inject_css, render_main_header, render_section_card
 from core.calculadora_revisoes import CalculadoraRevisoes, calcular_datas_revisao
 from core.algoritmo_sugestao import AlgoritmoSugestao
 from core.priorizador_enamed import PriorizadorENAMED
+from core.contexto import ContextoDados
+from core.catalogo_temas import obter_catalogo_temas
 
 st.set_page_config(
     page_title="Registro de Estudo - Plataforma de Estudos",
@@ -40,9 +43,10 @@ temas = carregar_temas()
 config = carregar_config()
 pesos = carregar_pesos()
 
-calc_rev = CalculadoraRevisoes()
-algoritmo = AlgoritmoSugestao()
-priorizador = PriorizadorENAMED()
+contexto = ContextoDados(config=config, pesos=pesos, temas=temas, estudo=estudo)
+calc_rev = CalculadoraRevisoes(contexto)
+algoritmo = AlgoritmoSugestao(contexto)
+priorizador = PriorizadorENAMED(contexto)
 
 # Tabs
 tab1, tab2, tab3 = st.tabs(["📖 Registrar Teoria", "📝 Registrar Revisão", "📋 Meus Registros"])
@@ -90,7 +94,7 @@ with tab1:
             st.info(f"📖 **Normal**: {classif['descricao']}")
     
     if st.checkbox("Ver cronograma de revisões sugerido", key="preview_teoria"):
-        cronograma = calcular_datas_revisao(data_teoria.strftime("%Y-%m-%d"), tema_teoria)
+        cronograma = calcular_datas_revisao(data_teoria.strftime("%Y-%m-%d"), tema_teoria, contexto)
         
         st.markdown("**📅 Cronograma Sugerido:**")
         col1, col2, col3 = st.columns(3)
@@ -105,16 +109,13 @@ with tab1:
                 )
     
     if st.button("💾 Registrar Teoria", type="primary", key="btn_teoria"):
-        registro = estudo.get("registro_temas", {})
-        
-        if tema_teoria not in registro:
-            registro[tema_teoria] = {}
-        
-        registro[tema_teoria]["data_teoria"] = data_teoria.strftime("%Y-%m-%d")
-        registro[tema_teoria]["grande_area"] = area_teoria
-        
-        estudo["registro_temas"] = registro
-        salvar_estudo(estudo)
+        registrar_evento(
+            estudo, "teoria_registrada",
+            tema=tema_teoria,
+            grande_area=area_teoria,
+            tema_id=obter_catalogo_temas(temas).id_de(tema_teoria, area_teoria),
+            data=data_teoria.strftime("%Y-%m-%d")
+        )
         
         st.success(f"✅ Teoria de '{tema_teoria}' registrada!")
         st.balloons()
@@ -217,23 +218,14 @@ with tab2:
                 st.warning(f"📊 Taxa de acerto: **{porcentagem:.1f}%** - Precisa revisar mais!")
         
         if st.button("💾 Registrar Revisão", type="primary", key="btn_revisao"):
-            registro = estudo.get("registro_temas", {})
-            
-            rev_key = f"r{numero_revisao}"
-            
-            registro[tema_revisao][rev_key] = {
-                "data": data_revisao.strftime("%Y-%m-%d"),
-                "questoes": questoes_feitas,
-                "acertos": acertos
-            }
-            
-            stats = estudo.get("estatisticas_gerais", {})
-            stats["total_questoes_feitas"] = stats.get("total_questoes_feitas", 0) + questoes_feitas
-            stats["total_acertos"] = stats.get("total_acertos", 0) + acertos
-            
-            estudo["registro_temas"] = registro
-            estudo["estatisticas_gerais"] = stats
-            salvar_estudo(estudo)
+            registrar_evento(
+                estudo, "revisao_registrada",
+                tema=tema_revisao,
+                revisao=f"r{numero_revisao}",
+                data=data_revisao.strftime("%Y-%m-%d"),
+                questoes=questoes_feitas,
+                acertos=acertos
+            )
             
             st.success(f"✅ {numero_revisao}ª revisão de '{tema_revisao}' registrada!")
             st.balloons()
@@ -6,13 +6,22 @@ import streamlit as st
 import sys
 from pathlib import Path
 from datetime import datetime
-import json
+from itertools import islice
+import io
 import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.helpers import carregar_questoes, salvar_questoes, carregar_estudo, salvar_estudo
+from utils.helpers import carregar_estudo, carregar_temas, alternar_questao_importante
+from utils.banco_colunar import carregar_banco
+from utils.similaridade import carregar_indice_similaridade
+from utils.importador_questoes import (
+    iterar_questoes, analisar_importacao, importar_questoes
+)
 from utils.styles import inject_css, render_main_header
+from core.catalogo_temas import obter_catalogo_temas
+from core import cache_paginas
+from core.correspondencia_temas import obter_correspondencia, carregar_revisao, decidir_tema
 
 st.set_page_config(
     page_title="Banco de Questões - Plataforma de Estudos",
@@ -29,8 +38,8 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Carregar dados
-questoes = carregar_questoes()
+# Carregar dados (o questoes.json completo nunca é carregado na página)
+banco = carregar_banco()
 estudo = carregar_estudo()
 
 # Tabs
@@ -74,47 +83,134 @@ with tab1:
     
     if uploaded_file is not None:
         try:
-            conteudo = json.load(uploaded_file)
+            # Preview lendo apenas as primeiras questões do arquivo
+            texto = io.TextIOWrapper(uploaded_file, encoding="utf-8-sig")
+            preview = list(islice(iterar_questoes(texto), 3))
+            texto.detach()
+            uploaded_file.seek(0)
+            
+            st.success(f"✅ Arquivo recebido ({uploaded_file.size / 1024 / 1024:.1f} MB)")
+            
+            st.markdown("**Preview:**")
+            for i, q in enumerate(preview):
+                if not isinstance(q, dict):
+                    continue
+                with st.expander(f"Questão {i+1}: {q.get('tema', 'Sem tema')}"):
+                    st.markdown(f"**Enunciado:** {str(q.get('enunciado', ''))[:200]}...")
+                    st.markdown(f"**Gabarito:** {q.get('gabarito', '?')}")
+                    st.markdown(f"**Área:** {q.get('grande_area', 'Não informada')}")
+            
+            col1, col2 = st.columns(2)
             
-            if "questoes" not in conteudo:
-                st.error("❌ Formato inválido: campo 'questoes' não encontrado")
+            with col1:
+                modo_import = st.radio(
+                    "Modo de importação",
+                    options=["Substituir tudo", "Adicionar às existentes"]
+                )
+            
+            substituir = modo_import == "Substituir tudo"
+            
+            # Relatório de duplicatas antes de gravar (refeito se o arquivo ou o modo mudar)
+            chave_relatorio = (uploaded_file.file_id, substituir)
+            if st.session_state.get("relatorio_importacao", (None, None))[0] != chave_relatorio:
+                if st.button("🔎 Analisar Duplicatas"):
+                    with st.spinner("Comparando com o banco..."):
+                        relatorio = analisar_importacao(uploaded_file, substituir=substituir)
+                    st.session_state.relatorio_importacao = (chave_relatorio, relatorio)
+                    st.rerun()
             else:
-                questoes_importadas = conteudo["questoes"]
+                relatorio = st.session_state.relatorio_importacao[1]
                 
-                st.success(f"✅ {len(questoes_importadas)} questões encontradas!")
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("🆕 Novas", relatorio["novas"])
+                col2.metric("♻️ Duplicadas", relatorio["duplicadas"])
+                col3.metric("⚠️ Gabarito Conflitante", relatorio["conflitantes"])
+                col4.metric("❌ Inválidas", relatorio["total_erros"])
                 
-                st.markdown("**Preview:**")
-                for i, q in enumerate(questoes_importadas[:3]):
-                    with st.expander(f"Questão {i+1}: {q.get('tema', 'Sem tema')}"):
-                        st.markdown(f"**Enunciado:** {q.get('enunciado', '')[:200]}...")
-                        st.markdown(f"**Gabarito:** {q.get('gabarito', '?')}")
-                        st.markdown(f"**Área:** {q.get('grande_area', 'Não informada')}")
+                if relatorio["repetidas"]:
+                    with st.expander("Ver duplicadas e conflitos"):
+                        st.dataframe(pd.DataFrame(relatorio["repetidas"]), width="stretch", hide_index=True)
                 
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    modo_import = st.radio(
-                        "Modo de importação",
-                        options=["Substituir tudo", "Adicionar às existentes"]
-                    )
+                incluir_conflitantes = st.checkbox(
+                    "Importar também as questões com gabarito conflitante",
+                    value=False,
+                    disabled=not relatorio["conflitantes"]
+                )
                 
                 if st.button("📥 Confirmar Importação", type="primary"):
-                    if modo_import == "Substituir tudo":
-                        questoes["questoes"] = questoes_importadas
-                    else:
-                        questoes["questoes"].extend(questoes_importadas)
+                    barra = st.progress(0.0, text="Importando questões...")
+                    
+                    def atualizar_progresso(lidos: int, total: int) -> None:
+                        barra.progress(min(1.0, lidos / max(1, total)), text=f"Importando questões... {lidos / 1024 / 1024:.1f} MB")
                     
-                    questoes["total"] = len(questoes["questoes"])
-                    salvar_questoes(questoes)
+                    correspondencia = obter_correspondencia()
+                    resultado = importar_questoes(
+                        uploaded_file,
+                        substituir=substituir,
+                        progresso=atualizar_progresso,
+                        tamanho_total=uploaded_file.size,
+                        incluir_conflitantes=incluir_conflitantes,
+                        vincular_tema=correspondencia
+                    )
+                    barra.empty()
+                    del st.session_state["relatorio_importacao"]
+                    pendentes_revisao = correspondencia.salvar_revisao() if correspondencia.pendentes else 0
                     
-                    st.success(f"✅ {len(questoes_importadas)} questões importadas!")
-                    st.balloons()
+                    st.success(f"✅ {resultado['importadas']} questões importadas! Total no banco: {resultado['total']}")
+                    if resultado["duplicadas"]:
+                        st.info(f"♻️ {resultado['duplicadas']} duplicadas ignoradas")
+                    if pendentes_revisao:
+                        st.info(f"🏷️ {len(correspondencia.pendentes)} rótulos de tema sem correspondência segura — veja a revisão de temas abaixo")
+                    if resultado["total_erros"]:
+                        st.warning(f"⚠️ {resultado['total_erros']} registros ignorados por erros de validação")
+                        st.dataframe(pd.DataFrame(resultado["erros"]), width="stretch", hide_index=True)
+                    else:
+                        st.balloons()
                     
-        except json.JSONDecodeError:
-            st.error("❌ Erro ao ler JSON. Verifique o formato.")
+        except ValueError as e:
+            st.error(f"❌ Erro ao ler JSON: {str(e)}")
         except Exception as e:
             st.error(f"❌ Erro: {str(e)}")
     
+    # Fila de revisão dos temas importados com baixa confiança
+    pendentes = carregar_revisao()["pendentes"]
+    if pendentes:
+        st.markdown("---")
+        st.markdown(f"### 🏷️ Revisão de Temas ({len(pendentes)} rótulos)")
+        
+        catalogo = obter_catalogo_temas(carregar_temas())
+        opcoes = [None] + [t["id"] for t in catalogo]
+        
+        def rotular(tema_id):
+            if tema_id is None:
+                return "Nenhum tema do catálogo"
+            tema = catalogo.obter(tema_id)
+            return f"{tema['nome']} ({tema['grande_area']})"
+        
+        pendentes_ordenados = sorted(pendentes.items(), key=lambda item: -item[1].get("questoes", 0))
+        for chave, pendente in pendentes_ordenados[:20]:
+            col1, col2, col3 = st.columns([3, 4, 1])
+            with col1:
+                st.markdown(f"**{pendente['rotulo']}**")
+                st.caption(f"{pendente.get('questoes', 0)} questões · confiança {pendente.get('confianca', 0):.0%}")
+            with col2:
+                sugestao = next((i for i, _ in pendente.get("candidatos", []) if catalogo.obter(i)), None)
+                escolha = st.selectbox(
+                    "Tema canônico",
+                    opcoes,
+                    index=opcoes.index(sugestao),
+                    format_func=rotular,
+                    key=f"revisao_tema_{chave}",
+                    label_visibility="collapsed"
+                )
+            with col3:
+                if st.button("✅", key=f"confirmar_tema_{chave}", help="Confirmar"):
+                    decidir_tema(pendente["rotulo"], escolha)
+                    st.rerun()
+        
+        if len(pendentes) > 20:
+            st.caption(f"Mostrando 20 de {len(pendentes)} rótulos (os com mais questões)")
+    
     st.markdown("</div></div>", unsafe_allow_html=True)
 
 with tab2:
@@ -127,37 +223,33 @@ with tab2:
         <div class="section-body">
     """, unsafe_allow_html=True)
     
-    todas_questoes = questoes.get("questoes", [])
-    
-    if not todas_questoes:
+    if not len(banco):
         st.info("📝 Nenhuma questão no banco. Importe questões na aba anterior.")
     else:
-        st.markdown(f"**Total: {len(todas_questoes)} questões**")
+        indice_similares = carregar_indice_similaridade()
+        st.markdown(
+            f"**Total: {len(banco)} questões** "
+            f"({indice_similares.num_grupos} distintas após agrupar quase duplicatas)"
+        )
         
         col1, col2, col3 = st.columns(3)
+        opcoes = cache_paginas.opcoes_banco()
         
         with col1:
-            areas = list(set(q.get("grande_area", "Não classificada") for q in todas_questoes))
-            area_filtro = st.selectbox("Área", ["Todas"] + sorted(areas))
+            area_filtro = st.selectbox("Área", ["Todas"] + opcoes["areas"])
         
         with col2:
-            temas_unicos = list(set(q.get("tema", "Não classificado") for q in todas_questoes))
-            tema_filtro = st.selectbox("Tema", ["Todos"] + sorted(temas_unicos))
+            tema_filtro = st.selectbox("Tema", ["Todos"] + opcoes["temas"])
         
         with col3:
-            bancas = list(set(q.get("banca", "Não informada") for q in todas_questoes))
-            banca_filtro = st.selectbox("Banca", ["Todas"] + sorted(bancas))
-        
-        questoes_filtradas = todas_questoes
+            banca_filtro = st.selectbox("Banca", ["Todas"] + opcoes["bancas"])
         
-        if area_filtro != "Todas":
-            questoes_filtradas = [q for q in questoes_filtradas if q.get("grande_area") == area_filtro]
-        
-        if tema_filtro != "Todos":
-            questoes_filtradas = [q for q in questoes_filtradas if q.get("tema") == tema_filtro]
-        
-        if banca_filtro != "Todas":
-            questoes_filtradas = [q for q in questoes_filtradas if q.get("banca") == banca_filtro]
+        # AND entre os bitsets das colunas, sem ler as questões
+        questoes_filtradas = banco.indice().indices(
+            grande_area=area_filtro if area_filtro != "Todas" else None,
+            tema=tema_filtro if tema_filtro != "Todos" else None,
+            banca=banca_filtro if banca_filtro != "Todas" else None
+        )
         
         st.markdown(f"**Mostrando: {len(questoes_filtradas)} questões**")
         
@@ -169,7 +261,8 @@ with tab2:
         inicio = (pagina - 1) * questoes_por_pagina
         fim = inicio + questoes_por_pagina
         
-        for i, q in enumerate(questoes_filtradas[inicio:fim], start=inicio+1):
+        indices_pagina = questoes_filtradas[inicio:fim]
+        for i, (indice, q) in enumerate(zip(indices_pagina, banco.questoes(indices_pagina)), start=inicio+1):
             questao_id = q.get("id", str(i))
             marcada = questao_id in estudo.get("questoes_marcadas_importantes", [])
             
@@ -187,18 +280,21 @@ with tab2:
                         st.success(f"**Gabarito:** {q.get('gabarito', '?')}")
                     
                     st.caption(f"Área: {q.get('grande_area', '?')} | Tema: {q.get('tema', '?')} | Banca: {q.get('banca', '?')}")
+                    
+                    if st.button("🔍 Similares", key=f"sim_{questao_id}"):
+                        similares = indice_similares.similares(int(indice))
+                        if not similares:
+                            st.caption("Nenhuma questão parecida no banco.")
+                        for j, similaridade in similares:
+                            meta = banco.metadados(j)
+                            st.markdown(
+                                f"- **{meta.get('id', j + 1)}** · {meta.get('tema', 'Sem tema')} · "
+                                f"{meta.get('banca', '?')} — {similaridade:.0%} parecida"
+                            )
             
             with col2:
                 if st.button("⭐" if not marcada else "★", key=f"mark_{questao_id}"):
-                    marcadas = estudo.get("questoes_marcadas_importantes", [])
-                    
-                    if marcada:
-                        marcadas.remove(questao_id)
-                    else:
-                        marcadas.append(questao_id)
-                    
-                    estudo["questoes_marcadas_importantes"] = marcadas
-                    salvar_estudo(estudo)
+                    alternar_questao_importante(estudo, questao_id, not marcada)
                     st.rerun()
     
     st.markdown("</div></div>", unsafe_allow_html=True)
@@ -229,8 +325,7 @@ with tab3:
     else:
         st.metric("Total de Questões Importantes", len(marcadas))
         
-        todas_questoes = questoes.get("questoes", [])
-        questoes_importantes = [q for q in todas_questoes if q.get("id") in marcadas]
+        questoes_importantes = banco.questoes(banco.filtrar(id=marcadas))
         
         por_area = {}
         for q in questoes_importantes:
@@ -253,7 +348,7 @@ with tab3:
 with st.sidebar:
     st.markdown("### 📊 Estatísticas")
     
-    total = len(questoes.get("questoes", []))
+    total = len(banco)
     st.metric("Total de Questões", total)
     
     marcadas_count = len(estudo.get("questoes_marcadas_importantes", []))
@@ -263,12 +358,7 @@ with st.sidebar:
     
     if total > 0:
         st.markdown("**Por Área:**")
-        todas = questoes.get("questoes", [])
-        
-        contagem = {}
-        for q in todas:
-            area = q.get("grande_area", "Outras")
-            contagem[area] = contagem.get(area, 0) + 1
+        contagem = banco.contagem("grande_area", "Outras")
         
         for area, qtd in sorted(contagem.items(), key=lambda x: x[1], reverse=True):
             st.caption(f"• {area}: {qtd}")
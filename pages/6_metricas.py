@@ -11,9 +11,11 @@ import pandas as pd
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.helpers import carregar_estudo, carregar_config, carregar_pesos
+from utils.agregados_estudo import obter_agregados
 from utils.styles import inject_css, render_main_header
-from core.metricas import SistemaMetricas, obter_estatisticas
+from core.metricas import SistemaMetricas
 from core.priorizador_enamed import PriorizadorENAMED
+from core import cache_paginas
 
 st.set_page_config(
     page_title="Métricas - Plataforma de Estudos",
@@ -31,13 +33,14 @@ st.markdown(
 )
 
 # Carregar dados
-estudo = carregar_estudo()
-config = carregar_config()
-pesos = carregar_pesos()
+contexto = cache_paginas.contexto_pagina()
+estudo = contexto.estudo
+config = contexto.config
+pesos = contexto.pesos
 
-metricas = SistemaMetricas()
-priorizador = PriorizadorENAMED()
-stats = obter_estatisticas()
+metricas = SistemaMetricas(contexto)
+priorizador = PriorizadorENAMED(contexto)
+stats = cache_paginas.estatisticas()
 
 # Métricas principais
 nota = stats["nota_estimada"]["nota_estimada"]
@@ -89,30 +92,10 @@ col1, col2 = st.columns(2)
 
 with col1:
     registro = estudo.get("registro_temas", {})
+    agregados = obter_agregados(estudo)
     
-    stats_area = {}
     for area in pesos["pesos_areas"].keys():
-        stats_area[area] = {"questoes": 0, "acertos": 0, "temas": 0}
-    
-    for tema, dados in registro.items():
-        area = dados.get("grande_area", "Clinica Medica")
-        
-        if area in stats_area:
-            stats_area[area]["temas"] += 1
-            
-            for rev in ["r1", "r2", "r3"]:
-                rev_dados = dados.get(rev, {})
-                if rev_dados.get("questoes"):
-                    stats_area[area]["questoes"] += rev_dados["questoes"]
-                    stats_area[area]["acertos"] += rev_dados.get("acertos", 0)
-    
-    for area, estatisticas in stats_area.items():
-        peso = pesos["pesos_areas"].get(area, 0) * 100
-        
-        if estatisticas["questoes"] > 0:
-            taxa = estatisticas["acertos"] / estatisticas["questoes"] * 100
-        else:
-            taxa = 0
+        taxa = agregados["areas"].get(area, {}).get("taxa", 0)
         
         col_a, col_b = st.columns([3, 1])
         with col_a:
@@ -124,10 +107,10 @@ with col1:
 with col2:
     st.markdown("**📝 Progresso das Revisões**")
     
-    total_temas = len(registro) if registro else 1
-    r1_count = sum(1 for d in registro.values() if d.get("r1"))
-    r2_count = sum(1 for d in registro.values() if d.get("r2"))
-    r3_count = sum(1 for d in registro.values() if d.get("r3"))
+    total_temas = len(agregados["temas"]) if agregados["temas"] else 1
+    r1_count = agregados["revisoes"]["r1"]["temas"]
+    r2_count = agregados["revisoes"]["r2"]["temas"]
+    r3_count = agregados["revisoes"]["r3"]["temas"]
     
     st.progress(r1_count / total_temas if total_temas > 0 else 0, text=f"1ª Revisão: {r1_count}/{total_temas}")
     st.progress(r2_count / total_temas if total_temas > 0 else 0, text=f"2ª Revisão: {r2_count}/{total_temas}")
@@ -150,7 +133,7 @@ with col2:
 st.markdown("---")
 st.subheader("🔥 Cobertura High-Yield por Área")
 
-cobertura = priorizador.calcular_cobertura_high_yield()
+cobertura = cache_paginas.cobertura_high_yield()
 
 cols = st.columns(3)
 col_idx = 0
@@ -200,6 +183,21 @@ if registro:
 else:
     st.info("📝 Nenhum registro de estudo ainda.")
 
+# Questões por semana (derivado do log de eventos)
+por_semana = cache_paginas.eventos_por_periodo("semana")
+if por_semana:
+    st.markdown("**📆 Questões por Semana:**")
+    df_semanas = pd.DataFrame([
+        {
+            "Semana": semana,
+            "Questões": dados["questoes"],
+            "Acertos": dados["acertos"],
+            "Revisões": dados["revisoes"]
+        }
+        for semana, dados in list(por_semana.items())[-8:]
+    ])
+    st.bar_chart(df_semanas, x="Semana", y="Questões")
+
 # Sidebar
 with st.sidebar:
     st.markdown("### 🎯 Meta vs Atual")
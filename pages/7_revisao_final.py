@@ -11,9 +11,10 @@ import pandas as pd
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.helpers import (
-    carregar_estudo, carregar_config, carregar_questoes,
+    carregar_estudo, carregar_config,
     carregar_pesos, calcular_dias_ate_prova
 )
+from utils.agregados_estudo import obter_agregados
 from utils.styles import inject_css
 
 st.set_page_config(
@@ -42,10 +43,12 @@ st.markdown("""
 
 # Carregar dados com tratamento de erro
 try:
-    config = carregar_config()
-    estudo = carregar_estudo()
-    questoes = carregar_questoes()
-    pesos = carregar_pesos()
+    from core import cache_paginas
+    contexto = cache_paginas.contexto_pagina()
+    config = contexto.config
+    estudo = contexto.estudo
+    banco = cache_paginas.carregar_banco_compartilhado()
+    pesos = contexto.pesos
 except Exception as e:
     st.error(f"Erro ao carregar dados: {e}")
     st.stop()
@@ -54,8 +57,8 @@ except Exception as e:
 try:
     from core.priorizador_enamed import PriorizadorENAMED
     from core.metricas import SistemaMetricas
-    priorizador = PriorizadorENAMED()
-    metricas = SistemaMetricas()
+    priorizador = PriorizadorENAMED(contexto)
+    metricas = SistemaMetricas(contexto)
 except Exception as e:
     st.warning(f"Alguns módulos não puderam ser carregados: {e}")
     priorizador = None
@@ -63,7 +66,7 @@ except Exception as e:
 
 # Calcular dias até a prova
 data_prova = config.get("usuario", {}).get("data_prova_estimada", "2027-11-15")
-dias_ate_prova = calcular_dias_ate_prova(data_prova)
+dias_ate_prova = calcular_dias_ate_prova(data_prova, contexto.agora)
 
 JANELA_REVISAO_FINAL = 14
 
@@ -115,7 +118,7 @@ with tab1:
     
     if priorizador:
         try:
-            cobertura = priorizador.calcular_cobertura_high_yield()
+            cobertura = cache_paginas.cobertura_high_yield()
             
             col1, col2, col3 = st.columns(3)
             
@@ -151,11 +154,7 @@ with tab1:
                     with col1:
                         st.markdown("**Temas High-Yield:**")
                         for tema in temas_list:
-                            revisado = any(
-                                tema.lower() in k.lower() 
-                                for k, v in estudo.get("registro_temas", {}).items()
-                                if v.get("r1")
-                            )
+                            revisado = (area, tema) in cobertura["revisados"]
                             
                             status = "✅" if revisado else "❌"
                             st.markdown(f"{status} {tema}")
@@ -184,8 +183,6 @@ with tab2:
     st.subheader("⭐ Questões Marcadas como Importantes")
     
     marcadas = estudo.get("questoes_marcadas_importantes", [])
-    todas_questoes = questoes.get("questoes", [])
-    
     if not marcadas:
         st.info("""
         📝 Nenhuma questão marcada como importante ainda.
@@ -203,7 +200,7 @@ with tab2:
     else:
         st.metric("Questões para Revisar", len(marcadas))
         
-        questoes_importantes = [q for q in todas_questoes if q.get("id") in marcadas]
+        questoes_importantes = banco.questoes(banco.filtrar(id=marcadas))
         
         # Agrupar por área
         por_area = {}
@@ -271,26 +268,14 @@ with tab3:
     
     temas_criticos = []
     
-    for tema, dados in registro.items():
-        questoes_total = 0
-        acertos_total = 0
-        
-        for rev in ["r1", "r2", "r3"]:
-            rev_dados = dados.get(rev, {})
-            if rev_dados and rev_dados.get("questoes"):
-                questoes_total += rev_dados["questoes"]
-                acertos_total += rev_dados.get("acertos", 0)
-        
-        if questoes_total > 0:
-            taxa = (acertos_total / questoes_total) * 100
-            
-            if taxa < 70:
-                temas_criticos.append({
-                    "tema": tema,
-                    "area": dados.get("grande_area", "?"),
-                    "taxa": taxa,
-                    "questoes": questoes_total
-                })
+    for tema, totais in obter_agregados(estudo)["temas"].items():
+        if totais["questoes"] > 0 and totais["taxa"] < 70:
+            temas_criticos.append({
+                "tema": tema,
+                "area": registro.get(tema, {}).get("grande_area", "?"),
+                "taxa": totais["taxa"],
+                "questoes": totais["questoes"]
+            })
     
     if temas_criticos:
         temas_criticos.sort(key=lambda x: x["taxa"])
@@ -19,8 +19,13 @@ from utils.helpers import (
     carregar_pesos, carregar_temas, obter_rodizio_atual,
     calcular_dias_ate_prova, calcular_semanas_ate_prova
 )
+from utils.rodizios import obter_indice_rodizios
 from utils.styles import inject_css
 from core.calculadora_revisoes import CalculadoraRevisoes
+from core.contexto import ContextoDados
+from core import cache_paginas
+from core.catalogo_temas import obter_catalogo_temas
+from core.ids_temas import obter_mapa_pesos
 
 st.set_page_config(
     page_title="Cronograma - Plataforma de Estudos",
@@ -47,13 +52,14 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Carregar dados
-config = carregar_config()
-calendario = carregar_calendario()
-estudo = carregar_estudo()
-pesos = carregar_pesos()
-temas = carregar_temas()
+contexto = ContextoDados()
+config = contexto.config
+calendario = contexto.calendario
+estudo = contexto.estudo
+pesos = contexto.pesos
+temas = contexto.temas
 
-calc_rev = CalculadoraRevisoes()
+calc_rev = CalculadoraRevisoes(contexto)
 
 # Configurações do usuário
 meta_semanal = config.get("metas", {}).get("questoes_semana_meta", 320)
@@ -170,20 +176,22 @@ with tab2:
     hoje = datetime.now()
     rodizio_atual = obter_rodizio_atual(calendario)
     
+    # Rodízio de cada uma das próximas 4 semanas (qualquer ano do calendário)
+    rodizios_semanas = obter_indice_rodizios(calendario).por_semana(
+        (hoje - timedelta(days=hoje.weekday())).date(), 4
+    )
+    
+    # Temas já registrados: por ID e, fora do catálogo, por nome
+    mapa_pesos = obter_mapa_pesos(obter_catalogo_temas(temas), pesos)
+    registro = estudo.get("registro_temas", {})
+    ids_estudados = {dados["tema_id"] for dados in registro.values() if "tema_id" in dados}
+    orfaos_estudados = [chave.lower() for chave, dados in registro.items() if "tema_id" not in dados]
+    
     # Gerar plano para as próximas 4 semanas
-    for semana_offset in range(4):
+    for semana_offset, rodizio_semana in enumerate(rodizios_semanas):
         data_inicio_semana = hoje + timedelta(days=(7 * semana_offset) - hoje.weekday())
         data_fim_semana = data_inicio_semana + timedelta(days=6)
         
-        # Determinar rodízio desta semana
-        rodizio_semana = None
-        for rod in calendario.get("ano_1", {}).get("2026", []):
-            inicio = datetime.strptime(rod["inicio"], "%Y-%m-%d")
-            fim = datetime.strptime(rod["fim"], "%Y-%m-%d")
-            if inicio <= data_inicio_semana <= fim or inicio <= data_fim_semana <= fim:
-                rodizio_semana = rod
-                break
-        
         semana_num = data_inicio_semana.isocalendar()[1]
         is_semana_atual = semana_offset == 0
         
@@ -242,7 +250,9 @@ with tab2:
                     st.caption("~40 questões")
                 with col3:
                     # Verificar se já estudou
-                    estudado = tema.lower() in str(estudo.get("registro_temas", {})).lower()
+                    estudado = bool(mapa_pesos.ids_relacionados([tema]) & ids_estudados) or any(
+                        tema.lower() in chave for chave in orfaos_estudados
+                    )
                     if estudado:
                         st.markdown("✅")
                     else:
@@ -374,17 +384,24 @@ with tab4:
     
     st.markdown("---")
     
-    # Gráfico de progresso por mês (simulado)
+    # Progresso por mês do ano corrente, a partir do log de eventos
     st.markdown("**📈 Distribuição Esperada vs Real:**")
     
     meses = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
     esperado = [1200, 1400, 1400, 1400, 1400, 1200, 1400, 1400, 1400, 1400, 1200, 0]  # Meta mensal
     
+    por_mes = cache_paginas.eventos_por_periodo("mes")
+    ano = contexto.agora.year
+    realizado = [
+        por_mes.get(f"{ano}-{m:02d}", {}).get("questoes", 0)
+        for m in range(1, 13)
+    ]
+    
     # Criar DataFrame para exibição
     df_progresso = pd.DataFrame({
         "Mês": meses,
         "Meta": esperado,
-        "Realizado": [0] * 12  # Placeholder - seria calculado do estudo real
+        "Realizado": realizado
     })
     
     st.dataframe(df_progresso, width="stretch", hide_index=True)
@@ -11,15 +11,26 @@ from pathlib import Path
 from datetime import datetime
 import random
 import json
-import re
+import time
+import numpy as np
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.helpers import (
-    carregar_questoes, carregar_temas, carregar_estudo, salvar_estudo,
-    carregar_config
+    carregar_estudo, alternar_questao_importante, carregar_config
 )
+from utils.dados_referencia import carregar_referencia, relatorio_memoria, tamanho_profundo
+from utils.similaridade import carregar_indice_similaridade
+from utils.eventos_estudo import registrar_eventos
 from utils.styles import inject_css
+from utils.modo_rapido import (
+    letra_alternativa, preparar_lote, mesclar_respostas, resolver_rapido,
+    SINCRONIZAR_A_CADA_PADRAO
+)
+from core.catalogo_temas import obter_catalogo_temas
+from core import cache_paginas
+
+inicio_pagina = time.perf_counter()
 
 st.set_page_config(
     page_title="Resolver Questões - Plataforma de Estudos",
@@ -30,7 +41,8 @@ st.set_page_config(
 # Injetar CSS
 inject_css()
 
-# Inicializar session state
+# Inicializar session state (a sessão guarda só os índices das questões no
+# banco e as respostas; o texto é lido do banco compartilhado ao exibir)
 if "questoes_selecionadas" not in st.session_state:
     st.session_state.questoes_selecionadas = []
 if "indice_atual" not in st.session_state:
@@ -43,6 +55,14 @@ if "sessao_finalizada" not in st.session_state:
     st.session_state.sessao_finalizada = False
 if "tema_sessao" not in st.session_state:
     st.session_state.tema_sessao = None
+if "origem_banco" not in st.session_state:
+    st.session_state.origem_banco = None
+if "modo_rapido" not in st.session_state:
+    st.session_state.modo_rapido = False
+if "sincronizar_a_cada" not in st.session_state:
+    st.session_state.sincronizar_a_cada = SINCRONIZAR_A_CADA_PADRAO
+if "id_sessao" not in st.session_state:
+    st.session_state.id_sessao = 0
 
 # Header
 st.markdown("""
@@ -59,104 +79,54 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Carregar dados
-questoes_data = carregar_questoes()
-temas_data = carregar_temas()
+# Carregar dados (filtros usam só as colunas de metadados do banco;
+# banco e temas são compartilhados por todas as sessões)
+banco = cache_paginas.carregar_banco_compartilhado()
+temas_data = carregar_referencia("temas.json")
 estudo = carregar_estudo()
 config = carregar_config()
 
-todas_questoes = questoes_data.get("questoes", [])
+# Banco reimportado durante a sessão: os índices guardados não valem mais
+if st.session_state.questoes_selecionadas and st.session_state.origem_banco != banco.origem:
+    st.session_state.questoes_selecionadas = []
+    st.session_state.sessao_finalizada = False
+    st.warning("⚠️ O banco de questões mudou e a sessão em andamento foi encerrada.")
 
-# Extrair opções únicas
-temas_unicos = sorted(list(set(q.get("tema", "Não classificado") for q in todas_questoes)))
-areas_unicas = sorted(list(set(q.get("grande_area", "Não classificada") for q in todas_questoes)))
-bancas_unicas = sorted(list(set(q.get("banca", "Não informada") for q in todas_questoes)))
+# Extrair opções únicas (em cache até o banco mudar)
+opcoes = cache_paginas.opcoes_banco()
+temas_unicos = opcoes["temas"]
+areas_unicas = opcoes["areas"]
+bancas_unicas = opcoes["bancas"]
 
 # ============================================
-# MODO: CONFIGURAÇÃO DE SESSÃO
+# CARTÃO DA QUESTÃO (fragmento)
 # ============================================
 
-# Só mostrar configuração se não estiver em sessão finalizada com dados
-if not st.session_state.questoes_selecionadas and not st.session_state.sessao_finalizada:
-    
-    st.subheader("🎯 Configurar Sessão de Questões")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        modo = st.selectbox(
-            "📋 Modo de Estudo:",
-            ["Por Tema", "Por Grande Área", "Aleatório", "Todas"]
-        )
-        
-        if modo == "Por Tema":
-            tema_selecionado = st.selectbox("Selecione o tema:", temas_unicos)
-            questoes_filtradas = [q for q in todas_questoes if q.get("tema") == tema_selecionado]
-            st.session_state.tema_sessao = tema_selecionado
-            
-        elif modo == "Por Grande Área":
-            area_selecionada = st.selectbox("Selecione a área:", areas_unicas)
-            questoes_filtradas = [q for q in todas_questoes if q.get("grande_area") == area_selecionada]
-            st.session_state.tema_sessao = area_selecionada
-            
-        elif modo == "Aleatório":
-            questoes_filtradas = todas_questoes.copy()
-            st.session_state.tema_sessao = "Aleatório"
-            
-        else:
-            questoes_filtradas = todas_questoes.copy()
-            st.session_state.tema_sessao = "Geral"
-        
-        st.caption(f"📊 {len(questoes_filtradas)} questões disponíveis")
-    
-    with col2:
-        # Garantir que max_value seja maior que min_value
-        max_questoes = max(6, min(100, len(questoes_filtradas))) if questoes_filtradas else 6
-        valor_padrao = min(20, max_questoes - 1) if max_questoes > 5 else 5
-        
-        quantidade = st.slider(
-            "📏 Quantidade de questões:",
-            min_value=1,
-            max_value=max_questoes,
-            value=min(valor_padrao, len(questoes_filtradas)) if questoes_filtradas else 5
-        )
-        
-        aleatorizar = st.checkbox("🔀 Aleatorizar ordem", value=True)
-        
-        # Filtros adicionais
-        with st.expander("⚙️ Filtros Avançados"):
-            banca_filtro = st.multiselect(
-                "Filtrar por banca:",
-                bancas_unicas,
-                default=[]
-            )
-            
-            if banca_filtro:
-                questoes_filtradas = [q for q in questoes_filtradas if q.get("banca") in banca_filtro]
-                st.caption(f"📊 {len(questoes_filtradas)} após filtro de banca")
-    
-    st.markdown("---")
-    
-    if questoes_filtradas:
-        if st.button("🚀 Iniciar Sessão", type="primary", width="stretch"):
-            # Selecionar questões
-            if aleatorizar:
-                random.shuffle(questoes_filtradas)
-            
-            st.session_state.questoes_selecionadas = questoes_filtradas[:quantidade]
-            st.session_state.indice_atual = 0
-            st.session_state.respostas = {}
-            st.session_state.mostrar_gabarito = False
-            st.session_state.sessao_finalizada = False
-            st.rerun()
-    else:
-        st.warning("⚠️ Nenhuma questão encontrada com os filtros selecionados.")
+# Callbacks dos botões: o estado muda antes da reexecução do fragmento,
+# então o clique não precisa de um st.rerun() extra
 
-# ============================================
-# MODO: RESOLVENDO QUESTÕES
-# ============================================
+def responder(indice, letra, correta):
+    st.session_state.respostas[indice] = {"resposta": letra, "correta": correta}
 
-else:
+
+def mostrar_gabarito():
+    st.session_state.mostrar_gabarito = True
+
+
+def ir_para_questao(indice):
+    st.session_state.indice_atual = indice
+    st.session_state.mostrar_gabarito = False
+
+
+@st.fragment
+def resolver_questao():
+    """
+    Cabeçalho de progresso e cartão da questão atual.
+
+    Executado como fragmento: responder, ver o gabarito e navegar entre as
+    questões reexecutam só esta função, sem recarregar os dados da página.
+    """
+    inicio = time.perf_counter()
     questoes = st.session_state.questoes_selecionadas
     idx = st.session_state.indice_atual
     total = len(questoes)
@@ -178,8 +148,8 @@ else:
     
     st.markdown("---")
     
-    # Questão atual
-    questao = questoes[idx]
+    # Questão atual (único texto lido neste render)
+    questao = banco.questao(questoes[idx])
     
     # Card da questão
     st.markdown(f"""
@@ -212,14 +182,7 @@ else:
     
     for alt in alternativas:
         # Extrair letra da alternativa (suporta formatos: "(A)", "A)", "A.")
-        letra = ""
-        if alt:
-            # Procurar letra entre parênteses ou no início
-            match = re.search(r'\(?([A-Ea-e])\)?', alt[:5])
-            if match:
-                letra = match.group(1).upper()
-            else:
-                letra = alt[0].upper() if alt[0].isalpha() else ""
+        letra = letra_alternativa(alt)
         
         # Determinar estilo baseado no estado
         if st.session_state.mostrar_gabarito:
@@ -240,17 +203,14 @@ else:
                 estilo = "background: #1e293b; border: 1px solid #334155;"
                 icone = ""
         
-        if st.button(
+        st.button(
             f"{icone} {alt}" if icone else alt,
             key=f"alt_{idx}_{letra}",
             width="stretch",
-            disabled=st.session_state.mostrar_gabarito
-        ):
-            st.session_state.respostas[idx] = {
-                "resposta": letra.upper(),
-                "correta": letra.upper() == gabarito.upper()
-            }
-            st.rerun()
+            disabled=st.session_state.mostrar_gabarito,
+            on_click=responder,
+            args=(idx, letra.upper(), letra.upper() == gabarito.upper())
+        )
     
     st.markdown("---")
     
@@ -258,39 +218,33 @@ else:
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        if st.button("⬅️ Anterior", disabled=(idx == 0)):
-            st.session_state.indice_atual -= 1
-            st.session_state.mostrar_gabarito = False
-            st.rerun()
+        st.button("⬅️ Anterior", disabled=(idx == 0), on_click=ir_para_questao, args=(idx - 1,))
     
     with col2:
         if not st.session_state.mostrar_gabarito:
-            if st.button("👁️ Ver Gabarito", type="primary", disabled=(idx not in st.session_state.respostas)):
-                st.session_state.mostrar_gabarito = True
-                st.rerun()
+            st.button(
+                "👁️ Ver Gabarito", type="primary",
+                disabled=(idx not in st.session_state.respostas),
+                on_click=mostrar_gabarito
+            )
         else:
             st.success(f"Gabarito: **{gabarito}**")
     
     with col3:
         if st.button("⭐ Marcar Importante"):
             # Salvar como importante
-            if "questoes_marcadas_importantes" not in estudo:
-                estudo["questoes_marcadas_importantes"] = []
-            
             q_id = questao.get("id", str(idx))
-            if q_id not in estudo["questoes_marcadas_importantes"]:
-                estudo["questoes_marcadas_importantes"].append(q_id)
-                salvar_estudo(estudo)
+            estudo = carregar_estudo()
+            if q_id not in estudo.get("questoes_marcadas_importantes", []):
+                alternar_questao_importante(estudo, q_id, True)
                 st.toast("⭐ Questão marcada como importante!")
     
     with col4:
         if idx < total - 1:
-            if st.button("Próxima ➡️"):
-                st.session_state.indice_atual += 1
-                st.session_state.mostrar_gabarito = False
-                st.rerun()
+            st.button("Próxima ➡️", on_click=ir_para_questao, args=(idx + 1,))
         else:
             if st.button("📊 Finalizar", type="primary"):
+                # O resultado fica fora do fragmento: recarrega a página inteira
                 st.session_state.sessao_finalizada = True
                 st.rerun()
     
@@ -308,10 +262,177 @@ else:
                 else:
                     status = str(i + 1)
                 
-                if st.button(status, key=f"nav_{i}"):
-                    st.session_state.indice_atual = i
-                    st.session_state.mostrar_gabarito = False
-                    st.rerun()
+                st.button(status, key=f"nav_{i}", on_click=ir_para_questao, args=(i,))
+    
+    # Tempo de servidor: este fragmento x a última execução da página inteira
+    tempo_cartao = (time.perf_counter() - inicio) * 1000
+    tempo_pagina = st.session_state.get("tempo_pagina_ms")
+    st.caption(
+        f"⏱️ Servidor por clique: {tempo_cartao:.0f} ms (só a questão)"
+        + (f" · {tempo_pagina:.0f} ms recarregando a página inteira" if tempo_pagina else "")
+    )
+
+
+def resolver_em_lote():
+    """
+    Modo rápido: a sessão inteira vai para o componente de uma vez.
+
+    Só há rerun quando o componente envia um lote de respostas (a cada
+    sincronizar_a_cada questões e ao finalizar).
+    """
+    questoes = st.session_state.questoes_selecionadas
+    lote = preparar_lote(banco.questoes(questoes))
+    envio = resolver_rapido(
+        lote,
+        st.session_state.respostas,
+        sincronizar_a_cada=st.session_state.sincronizar_a_cada,
+        chave=f"resolver_rapido_{st.session_state.id_sessao}"
+    )
+    if not envio:
+        return
+    
+    mesclar_respostas(st.session_state.respostas, envio.get("respostas", {}), lote)
+    
+    # Marcar já marcada não gera evento, então reaplicar o envio é seguro
+    for posicao in envio.get("importantes", []):
+        if isinstance(posicao, int) and 0 <= posicao < len(lote):
+            alternar_questao_importante(estudo, lote[posicao]["id"] or str(posicao), True)
+    
+    if envio.get("finalizado"):
+        st.session_state.sessao_finalizada = True
+
+
+# ============================================
+# MODO: CONFIGURAÇÃO DE SESSÃO
+# ============================================
+
+# Só mostrar configuração se não estiver em sessão finalizada com dados
+if not st.session_state.questoes_selecionadas and not st.session_state.sessao_finalizada:
+    
+    st.subheader("🎯 Configurar Sessão de Questões")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        modo = st.selectbox(
+            "📋 Modo de Estudo:",
+            ["Por Tema", "Por Grande Área", "Aleatório", "Todas"]
+        )
+        
+        # Critérios sobre os bitsets do banco: contagens sem listar índices
+        indice = banco.indice()
+        criterios = {}
+        
+        if modo == "Por Tema":
+            tema_selecionado = st.selectbox("Selecione o tema:", temas_unicos)
+            criterios["tema"] = tema_selecionado
+            st.session_state.tema_sessao = tema_selecionado
+            
+        elif modo == "Por Grande Área":
+            area_selecionada = st.selectbox("Selecione a área:", areas_unicas)
+            criterios["grande_area"] = area_selecionada
+            st.session_state.tema_sessao = area_selecionada
+            
+        elif modo == "Aleatório":
+            st.session_state.tema_sessao = "Aleatório"
+            
+        else:
+            st.session_state.tema_sessao = "Geral"
+        
+        disponiveis = indice.contar(**criterios)
+        st.caption(f"📊 {disponiveis} questões disponíveis")
+    
+    with col2:
+        # Garantir que max_value seja maior que min_value
+        max_questoes = max(6, min(100, disponiveis)) if disponiveis else 6
+        valor_padrao = min(20, max_questoes - 1) if max_questoes > 5 else 5
+        
+        quantidade = st.slider(
+            "📏 Quantidade de questões:",
+            min_value=1,
+            max_value=max_questoes,
+            value=min(valor_padrao, disponiveis) if disponiveis else 5
+        )
+        
+        aleatorizar = st.checkbox("🔀 Aleatorizar ordem", value=True)
+        
+        modo_rapido = st.checkbox(
+            "⚡ Modo rápido",
+            value=st.session_state.modo_rapido,
+            help="Marcação, gabarito e navegação no navegador, sem ida ao servidor a cada clique"
+        )
+        if modo_rapido:
+            sincronizar_a_cada = st.number_input(
+                "Enviar respostas a cada N questões (0 = só ao finalizar):",
+                min_value=0, max_value=50,
+                value=st.session_state.sincronizar_a_cada
+            )
+        
+        # Filtros adicionais
+        with st.expander("⚙️ Filtros Avançados"):
+            banca_filtro = st.multiselect(
+                "Filtrar por banca:",
+                bancas_unicas,
+                default=[]
+            )
+            
+            if banca_filtro:
+                criterios["banca"] = banca_filtro
+                disponiveis = indice.contar(**criterios)
+                st.caption(f"📊 {disponiveis} após filtro de banca")
+            
+            questoes_filtradas = indice.indices(**criterios)
+            
+            um_por_grupo = st.checkbox(
+                "Uma questão por grupo de similares",
+                value=False,
+                help="Evita questões quase idênticas (mesma questão de provas/fontes diferentes) na mesma sessão"
+            )
+            
+            if um_por_grupo and len(questoes_filtradas):
+                indice_similares = carregar_indice_similaridade()
+                questoes_agrupadas = questoes_filtradas
+                questoes_filtradas = indice_similares.um_por_grupo(questoes_agrupadas)
+                st.caption(f"📊 {len(questoes_filtradas)} após remover quase duplicatas")
+    
+    st.markdown("---")
+    
+    if len(questoes_filtradas):
+        if st.button("🚀 Iniciar Sessão", type="primary", width="stretch"):
+            # Selecionar questões (só as escolhidas têm o texto lido)
+            quantidade = min(quantidade, len(questoes_filtradas))
+            if aleatorizar:
+                if um_por_grupo:
+                    # Sorteia também qual questão representa cada grupo
+                    questoes_filtradas = indice_similares.um_por_grupo(
+                        questoes_agrupadas, rng=np.random.default_rng()
+                    )
+                indices = random.sample(list(questoes_filtradas), quantidade)
+            else:
+                indices = questoes_filtradas[:quantidade]
+            
+            st.session_state.questoes_selecionadas = [int(i) for i in indices]
+            st.session_state.origem_banco = banco.origem
+            st.session_state.indice_atual = 0
+            st.session_state.respostas = {}
+            st.session_state.mostrar_gabarito = False
+            st.session_state.sessao_finalizada = False
+            st.session_state.modo_rapido = modo_rapido
+            if modo_rapido:
+                st.session_state.sincronizar_a_cada = int(sincronizar_a_cada)
+            st.session_state.id_sessao += 1
+            st.rerun()
+    else:
+        st.warning("⚠️ Nenhuma questão encontrada com os filtros selecionados.")
+
+# ============================================
+# MODO: RESOLVENDO QUESTÕES
+# ============================================
+
+elif st.session_state.modo_rapido:
+    resolver_em_lote()
+else:
+    resolver_questao()
 
 # ============================================
 # MODO: RESULTADO FINAL
@@ -353,27 +474,30 @@ if st.session_state.sessao_finalizada and st.session_state.questoes_selecionadas
     if tema_para_salvar in ["Aleatório", "Geral", None]:
         # Usar o tema da primeira questão da sessão
         if st.session_state.questoes_selecionadas:
-            tema_para_salvar = st.session_state.questoes_selecionadas[0].get("tema", "Geral")
+            tema_para_salvar = banco.metadados(st.session_state.questoes_selecionadas[0]).get("tema", "Geral")
     
     # Mostrar em qual tema será salvo
     st.info(f"📁 Será registrado no tema: **{tema_para_salvar}**")
     
     if st.button("💾 Salvar no Histórico de Estudo", type="primary"):
-        # Atualizar registro de estudo
-        if "registro_temas" not in estudo:
-            estudo["registro_temas"] = {}
+        grande_area = banco.metadados(st.session_state.questoes_selecionadas[0]).get("grande_area", "Geral") if st.session_state.questoes_selecionadas else "Geral"
+        hoje = datetime.now().strftime("%Y-%m-%d")
+        eventos = []
         
-        grande_area = st.session_state.questoes_selecionadas[0].get("grande_area", "Geral") if st.session_state.questoes_selecionadas else "Geral"
+        tema_canonico = obter_catalogo_temas(temas_data).resolver(tema_para_salvar, grande_area)
+        tema_id = tema_canonico["id"] if tema_canonico else None
         
-        if tema_para_salvar not in estudo["registro_temas"]:
-            estudo["registro_temas"][tema_para_salvar] = {
-                "data_teoria": datetime.now().strftime("%Y-%m-%d"),
-                "grande_area": grande_area
-            }
+        registro = estudo.get("registro_temas", {}).get(tema_para_salvar)
+        if registro is None:
+            registro = {}
+            eventos.append(("teoria_registrada", {
+                "tema": tema_para_salvar,
+                "grande_area": grande_area,
+                "tema_id": tema_id,
+                "data": hoje
+            }))
         
         # Determinar qual revisão registrar
-        registro = estudo["registro_temas"][tema_para_salvar]
-        
         if not registro.get("r1"):
             rev_key = "r1"
         elif not registro.get("r2"):
@@ -383,22 +507,27 @@ if st.session_state.sessao_finalizada and st.session_state.questoes_selecionadas
         else:
             rev_key = "extra"
         
-        if rev_key != "extra":
-            registro[rev_key] = {
-                "data": datetime.now().strftime("%Y-%m-%d"),
-                "questoes": respondidas,
-                "acertos": acertos
-            }
-        
-        # Atualizar estatísticas gerais
-        if "estatisticas_gerais" not in estudo:
-            estudo["estatisticas_gerais"] = {"total_questoes_feitas": 0, "total_acertos": 0}
+        # Cada resposta da sessão fica no histórico; os totais entram pela revisão
+        for i, resposta in sorted(st.session_state.respostas.items()):
+            questao = banco.questao(st.session_state.questoes_selecionadas[i])
+            eventos.append(("questao_respondida", {
+                "questao_id": questao.get("id"),
+                "tema": questao.get("tema"),
+                "tema_id": questao.get("tema_id"),
+                "grande_area": questao.get("grande_area"),
+                "resposta": resposta.get("resposta"),
+                "correta": resposta.get("correta", False)
+            }))
         
-        estudo["estatisticas_gerais"]["total_questoes_feitas"] = estudo["estatisticas_gerais"].get("total_questoes_feitas", 0) + respondidas
-        estudo["estatisticas_gerais"]["total_acertos"] = estudo["estatisticas_gerais"].get("total_acertos", 0) + acertos
-        estudo["ultima_atualizacao"] = datetime.now().isoformat()
-        
-        salvar_estudo(estudo)
+        eventos.append(("revisao_registrada", {
+            "tema": tema_para_salvar,
+            "revisao": rev_key,
+            "tema_id": tema_id,
+            "data": hoje,
+            "questoes": respondidas,
+            "acertos": acertos
+        }))
+        registrar_eventos(estudo, eventos)
         st.success(f"✅ Resultado salvo! {rev_key.upper()} registrada para '{tema_para_salvar}'")
         st.balloons()
     
@@ -435,9 +564,21 @@ with st.sidebar:
     
     st.markdown("---")
     
+    if st.checkbox("🧠 Medir memória da sessão", value=False):
+        relatorio = relatorio_memoria(st.session_state.to_dict())
+        st.caption(f"Sessão: {relatorio['total_sessao'] / 1024:.1f} KB")
+        for chave, tamanho in list(relatorio["sessao"].items())[:5]:
+            st.caption(f"- {chave}: {tamanho / 1024:.1f} KB")
+        st.caption(f"Compartilhado entre sessões: {relatorio['total_compartilhado'] / 1024:.0f} KB")
+        if st.session_state.questoes_selecionadas:
+            completas = tamanho_profundo(banco.questoes(st.session_state.questoes_selecionadas))
+            st.caption(f"Questões completas na sessão ocupariam {completas / 1024:.1f} KB")
+    
+    st.markdown("---")
+    
     st.markdown(f"""
     **📊 Banco de Questões:**
-    - Total: {len(todas_questoes)}
+    - Total: {len(banco)}
     - Temas: {len(temas_unicos)}
     - Áreas: {len(areas_unicas)}
     """)
@@ -453,3 +594,5 @@ with st.sidebar:
     - Navegue rapidamente pelos números
     """)
 
+# Tempo da última execução completa (comparado ao do fragmento)
+st.session_state.tempo_pagina_ms = (time.perf_counter() - inicio_pagina) * 1000
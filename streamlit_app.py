@@ -19,10 +19,12 @@ from utils.helpers import (
     calcular_dias_ate_prova
 )
 from utils.styles import inject_css, render_main_header
-from core.metricas import SistemaMetricas, obter_estatisticas
-from core.priorizador_enamed import PriorizadorENAMED, obter_alertas
-from core.algoritmo_sugestao import AlgoritmoSugestao, obter_plano_semanal
+from utils.agregados_estudo import obter_agregados
+from core.metricas import SistemaMetricas
+from core.priorizador_enamed import PriorizadorENAMED
+from core.algoritmo_sugestao import AlgoritmoSugestao
 from core.calculadora_revisoes import CalculadoraRevisoes
+from core import cache_paginas
 
 # Configuração da página
 st.set_page_config(
@@ -59,21 +61,23 @@ if not is_configurado():
     st.info("👈 Clique em **configuracoes** no menu lateral para começar.")
     st.stop()
 
-# Carregar dados
-config = carregar_config()
-estudo = carregar_estudo()
-calendario = carregar_calendario()
-pesos = carregar_pesos()
+# Carregar dados (uma única vez por render, compartilhados por todos os motores;
+# estudo e dados de referência vêm do cache enquanto os arquivos não mudam)
+contexto = cache_paginas.contexto_pagina()
+config = contexto.config
+estudo = contexto.estudo
+calendario = contexto.calendario
+pesos = contexto.pesos
 
 # Instanciar classes
-metricas_sys = SistemaMetricas()
-priorizador = PriorizadorENAMED()
-algoritmo = AlgoritmoSugestao()
+metricas_sys = SistemaMetricas(contexto)
+priorizador = PriorizadorENAMED(contexto)
+algoritmo = AlgoritmoSugestao(contexto)
 
 # Obter estatísticas
-stats = obter_estatisticas()
-data_prova = config.get("usuario", {}).get("data_prova_estimada", "2027-11-15")
-dias = calcular_dias_ate_prova(data_prova)
+stats = cache_paginas.estatisticas()
+data_prova = contexto.data_prova
+dias = calcular_dias_ate_prova(data_prova, contexto.agora)
 meta = config.get("metas", {}).get("nota_meta", 90)
 
 # ============================================
@@ -129,12 +133,12 @@ st.markdown("---")
 col1, col2 = st.columns([3, 2])
 
 with col1:
-    rodizio = obter_rodizio_atual(calendario)
+    rodizio = obter_rodizio_atual(calendario, contexto.agora)
     
     if rodizio:
         inicio = datetime.strptime(rodizio["inicio"], "%Y-%m-%d")
         fim = datetime.strptime(rodizio["fim"], "%Y-%m-%d")
-        hoje = datetime.now()
+        hoje = contexto.agora
         
         progresso = max(0, min(1.0, (hoje - inicio).days / (fim - inicio).days))
         
@@ -171,7 +175,7 @@ with col1:
 with col2:
     st.subheader("⚠️ Alertas High-Yield")
     
-    alertas = obter_alertas()
+    alertas = cache_paginas.alertas()
     
     if alertas:
         for alerta in alertas[:4]:
@@ -192,7 +196,7 @@ with col2:
 st.markdown("---")
 st.subheader("📋 Próximas Revisões")
 
-plano = obter_plano_semanal()
+plano = cache_paginas.plano_semanal()
 
 if plano["temas"]:
     col1, col2 = st.columns([3, 1])
@@ -257,7 +261,7 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("🔥 Cobertura High-Yield")
     
-    cobertura = priorizador.calcular_cobertura_high_yield()
+    cobertura = cache_paginas.cobertura_high_yield()
     
     for area, dados in cobertura["por_area"].items():
         perc = dados["percentual"]
@@ -272,12 +276,12 @@ with col1:
 with col2:
     st.subheader("📈 Progresso das Revisões")
     
-    registro = estudo.get("registro_temas", {})
-    total_temas = len(registro) if registro else 1
+    agregados = obter_agregados(estudo)
+    total_temas = len(agregados["temas"]) if agregados["temas"] else 1
     
-    r1_count = sum(1 for d in registro.values() if d.get("r1"))
-    r2_count = sum(1 for d in registro.values() if d.get("r2"))
-    r3_count = sum(1 for d in registro.values() if d.get("r3"))
+    r1_count = agregados["revisoes"]["r1"]["temas"]
+    r2_count = agregados["revisoes"]["r2"]["temas"]
+    r3_count = agregados["revisoes"]["r3"]["temas"]
     
     st.progress(r1_count / total_temas if total_temas > 0 else 0, text=f"1ª Revisão: {r1_count}/{total_temas}")
     st.progress(r2_count / total_temas if total_temas > 0 else 0, text=f"2ª Revisão: {r2_count}/{total_temas}")
@@ -0,0 +1,124 @@
+"""
+Testes para os Agregados do Estudo
+
+Valida o cálculo do bloco de agregados, a atualização incremental pelos
+eventos, a persistência no snapshot e a verificação/reconstrução.
+"""
+
+import pytest
+import sys
+import json
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from utils import eventos_estudo as eventos
+from utils.agregados_estudo import (
+    calcular_agregados, obter_agregados, verificar_agregados,
+    reconstruir_agregados, SEM_AREA
+)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, estudo_com_dados):
+    """Diretório de dados temporário com o backend JSON."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    (tmp_path / "config.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "estudo.json").write_text(
+        json.dumps(estudo_com_dados, ensure_ascii=False), encoding="utf-8"
+    )
+    yield tmp_path
+    helpers.invalidar_cache_json()
+
+
+def _totais_percorrendo(registro):
+    """Totais como os painéis calculavam, percorrendo r1 a r3."""
+    areas, revisoes = {}, {"r1": 0, "r2": 0, "r3": 0}
+    for dados in registro.values():
+        area = areas.setdefault(dados.get("grande_area") or SEM_AREA, [0, 0])
+        for rev in revisoes:
+            if dados.get(rev):
+                revisoes[rev] += 1
+                if dados[rev].get("questoes"):
+                    area[0] += dados[rev]["questoes"]
+                    area[1] += dados[rev].get("acertos", 0)
+    return areas, revisoes
+
+
+class TestCalculo:
+    """Testes do bloco calculado a partir do registro."""
+
+    def test_totais_iguais_aos_dos_paineis(self, estudo_com_dados):
+        agregados = calcular_agregados(estudo_com_dados)
+        areas, revisoes = _totais_percorrendo(estudo_com_dados["registro_temas"])
+
+        assert {a: [t["questoes"], t["acertos"]] for a, t in agregados["areas"].items()} == areas
+        assert {r: t["temas"] for r, t in agregados["revisoes"].items()} == revisoes
+        assert agregados["temas"].keys() == estudo_com_dados["registro_temas"].keys()
+
+    def test_taxas_e_extras(self):
+        estudo = {"registro_temas": {
+            "A": {"grande_area": "Pediatria", "r1": {"questoes": 10, "acertos": 6},
+                  "extras": [{"questoes": 50, "acertos": 50}]},
+            "B": {"r1": {"questoes": 0, "acertos": 0}}
+        }}
+
+        agregados = calcular_agregados(estudo)
+
+        assert agregados["temas"]["A"]["taxa"] == 60.0
+        assert agregados["areas"]["Pediatria"]["questoes"] == 10
+        assert agregados["areas"][SEM_AREA] == {"temas": 1, "questoes": 0, "acertos": 0, "taxa": 0.0}
+        assert agregados["revisoes"]["r1"]["temas"] == 2
+
+    def test_obter_nao_altera_estudo_sem_bloco(self, estudo_com_dados):
+        obter_agregados(estudo_com_dados)
+
+        assert "agregados" not in estudo_com_dados
+
+
+class TestIncremental:
+    """Testes da manutenção pelos eventos."""
+
+    def test_eventos_mantem_bloco_igual_a_reconstrucao(self, data_dir):
+        estudo = helpers.carregar_estudo()
+        assert verificar_agregados(estudo) == []
+
+        eventos.registrar_eventos(estudo, [
+            ("revisao_registrada", {"tema": "Tuberculose", "revisao": "r2", "data": "2026-02-10", "questoes": 20, "acertos": 15}),
+            ("revisao_registrada", {"tema": "Tuberculose", "revisao": "r2", "data": "2026-02-11", "questoes": 10, "acertos": 2}),
+            ("teoria_registrada", {"tema": "Tema Novo", "grande_area": "Saude Mental", "data": "2026-02-12"}),
+            ("revisao_registrada", {"tema": "Tema Novo", "revisao": "r1", "data": "2026-02-13", "questoes": 5, "acertos": 5}),
+            ("teoria_registrada", {"tema": "Tema Novo", "grande_area": "Pediatria", "data": "2026-02-14"})
+        ])
+
+        assert verificar_agregados(estudo) == []
+        assert "Saude Mental" not in estudo["agregados"]["areas"]
+        assert estudo["agregados"]["temas"]["Tema Novo"]["grande_area"] == "Pediatria"
+
+    def test_bloco_persistido_e_reaplicado(self, data_dir):
+        estudo = helpers.carregar_estudo()
+        helpers.salvar_estudo(estudo)
+        eventos.registrar_evento(
+            estudo, "revisao_registrada",
+            tema="Diabetes", revisao="r3", data="2026-02-10", questoes=30, acertos=21
+        )
+
+        recarregado = helpers.carregar_estudo()
+
+        assert recarregado["agregados"] == estudo["agregados"]
+        assert verificar_agregados(recarregado) == []
+
+    def test_verificar_e_reconstruir(self, estudo_com_dados):
+        reconstruir_agregados(estudo_com_dados)
+        tema = next(iter(estudo_com_dados["registro_temas"]))
+        estudo_com_dados["registro_temas"][tema]["r1"] = {"questoes": 99, "acertos": 1}
+
+        divergencias = verificar_agregados(estudo_com_dados)
+
+        assert f"temas/{tema}" in divergencias
+        assert "revisoes/r1" in divergencias
+        reconstruir_agregados(estudo_com_dados)
+        assert verificar_agregados(estudo_com_dados) == []
@@ -249,3 +249,50 @@ class TestFatorPerformance:
             # Alta performance deve ter fator <= 1 (não aumentar questões)
             assert fator <= 1.5, f"Fator para alta performance deve ser <= 1.5, obtido {fator}"
 
+
+
+class TestSugestoesLote:
+    """Testes para o cálculo vetorizado de vários temas."""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, config_teste, pesos_teste, temas_teste, estudo_com_dados, calendario_teste):
+        """Setup para cada teste."""
+        from core.algoritmo_sugestao import AlgoritmoSugestao
+        from core.contexto import ContextoDados
+        self.alg = AlgoritmoSugestao(ContextoDados(
+            config=config_teste,
+            pesos=pesos_teste,
+            temas=temas_teste,
+            estudo=estudo_com_dados,
+            calendario=calendario_teste,
+            agora=datetime(2026, 2, 10)
+        ))
+        self.itens = [
+            (tema["nome"], area, revisao, tema["nome"])
+            for area, dados in temas_teste["grandes_areas"].items()
+            for tema in dados["temas"]
+            for revisao in (1, 2, 3, 4)
+        ]
+    
+    def test_lote_igual_ao_calculo_por_tema(self):
+        """Cada posição do lote deve coincidir com calcular_sugestao_tema."""
+        lote = self.alg.calcular_sugestoes_lote(self.itens)
+        
+        for i, (tema, area, revisao, tema_key) in enumerate(self.itens):
+            sugestao = self.alg.calcular_sugestao_tema(tema, area, revisao, tema_key)
+            assert lote["questoes_sugeridas"][i] == sugestao["questoes_sugeridas"]
+            assert lote["fator_performance"][i] == sugestao["detalhes"]["fator_performance"]
+            assert lote["bonus_rodizio"][i] == sugestao["detalhes"]["bonus_rodizio"]
+    
+    def test_prioridade_do_lote(self):
+        """A prioridade por tema deve vir do mesmo cálculo do lote."""
+        itens = [(tema, area) for tema, area, revisao, _ in self.itens if revisao == 1]
+        prioridades = self.alg.calcular_sugestoes_lote(itens)["prioridade"]
+        
+        assert all(0 <= p <= 1 for p in prioridades)
+        assert [self.alg.calcular_prioridade_tema(*item) for item in itens] == prioridades.tolist()
+    
+    def test_lote_vazio(self):
+        lote = self.alg.calcular_sugestoes_lote([])
+        
+        assert len(lote["questoes_sugeridas"]) == 0
@@ -0,0 +1,158 @@
+"""
+Testes para o Backend SQLite do Registro de Estudos
+
+Valida ida e volta do dicionário de estudo, gravações pontuais
+(um tema, uma questão marcada) e a migração a partir do estudo.json.
+"""
+
+import pytest
+import sys
+import json
+import copy
+import threading
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from utils import armazenamento_sqlite as db
+from utils import agregados_estudo
+from utils.eventos_estudo import registrar_evento
+
+
+@pytest.fixture
+def data_dir_sqlite(tmp_path, monkeypatch, estudo_com_dados):
+    """Diretório de dados temporário configurado para o backend SQLite."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    (tmp_path / "config.json").write_text(
+        json.dumps({"armazenamento": {"estudo": "sqlite"}}), encoding="utf-8"
+    )
+    (tmp_path / "estudo.json").write_text(
+        json.dumps(estudo_com_dados, ensure_ascii=False), encoding="utf-8"
+    )
+    yield tmp_path
+    db.fechar_conexoes()
+    helpers.invalidar_cache_json()
+
+
+class TestBackendSqlite:
+    """Testes de leitura e gravação no banco."""
+
+    def test_migracao_preserva_dados(self, data_dir_sqlite, estudo_com_dados):
+        """carregar_estudo deve migrar o JSON e devolver o mesmo conteúdo."""
+        estudo = helpers.carregar_estudo()
+
+        assert estudo["registro_temas"] == estudo_com_dados["registro_temas"]
+        assert estudo["questoes_marcadas_importantes"] == ["T001", "T003"]
+        assert estudo["estatisticas_gerais"] == estudo_com_dados["estatisticas_gerais"]
+        assert (data_dir_sqlite / "estudo.db").exists()
+
+    def test_migracao_executa_uma_vez(self, data_dir_sqlite):
+        """A segunda chamada de migração não deve reimportar o JSON."""
+        assert db.migrar_json_para_sqlite() is True
+        assert db.migrar_json_para_sqlite() is False
+
+    def test_salvar_registro_tema_grava_so_o_tema(self, data_dir_sqlite):
+        """Registrar uma revisão deve tocar apenas as linhas do tema."""
+        estudo = helpers.carregar_estudo()
+        estudo["registro_temas"]["Pré-natal"]["r1"] = {
+            "data": "2026-02-25", "questoes": 30, "acertos": 20
+        }
+        estudo["registro_temas"]["Tuberculose"]["data_teoria"] = "1999-01-01"  # não salvo
+
+        helpers.salvar_registro_tema(estudo, "Pré-natal")
+
+        recarregado = db.carregar_estudo_sqlite()
+        assert recarregado["registro_temas"]["Pré-natal"]["r1"]["acertos"] == 20
+        assert recarregado["registro_temas"]["Tuberculose"]["data_teoria"] == "2026-01-15"
+
+    def test_salvar_estudo_completo_remove_temas(self, data_dir_sqlite):
+        """salvar_estudo deve refletir temas e revisões removidos."""
+        estudo = helpers.carregar_estudo()
+        del estudo["registro_temas"]["Tuberculose"]
+        del estudo["registro_temas"]["HIV e AIDS"]["r2"]
+
+        helpers.salvar_estudo(estudo)
+
+        recarregado = db.carregar_estudo_sqlite()
+        assert "Tuberculose" not in recarregado["registro_temas"]
+        assert "r2" not in recarregado["registro_temas"]["HIV e AIDS"]
+        assert recarregado["ultima_atualizacao"] == estudo["ultima_atualizacao"]
+
+    def test_revisoes_extras_e_campos_livres(self, data_dir_sqlite):
+        """Revisões extras e campos sem coluna própria devem sobreviver."""
+        estudo = helpers.carregar_estudo()
+        tema = estudo["registro_temas"]["Tuberculose"]
+        tema["observacao"] = "rever BAAR"
+        tema["extras"] = [
+            {"data": "2026-03-01", "questoes": 10, "acertos": 9},
+            {"data": "2026-03-08", "questoes": 12, "acertos": 10, "fonte": "simulado"}
+        ]
+
+        helpers.salvar_registro_tema(estudo, "Tuberculose")
+
+        recarregado = db.carregar_estudo_sqlite()["registro_temas"]["Tuberculose"]
+        assert recarregado["observacao"] == "rever BAAR"
+        assert recarregado["extras"] == tema["extras"]
+
+    def test_alternar_questao_importante(self, data_dir_sqlite):
+        """Marcar/desmarcar deve inserir/remover uma única linha."""
+        estudo = helpers.carregar_estudo()
+
+        assert helpers.alternar_questao_importante(estudo, "T002") is True
+        assert helpers.alternar_questao_importante(estudo, "T001") is False
+
+        recarregado = db.carregar_estudo_sqlite()
+        assert recarregado["questoes_marcadas_importantes"] == ["T003", "T002"]
+        assert estudo["questoes_marcadas_importantes"] == ["T003", "T002"]
+
+
+    def test_threads_compartilham_uma_conexao(self, data_dir_sqlite):
+        """Gravações de várias threads usam a mesma conexão."""
+        helpers.carregar_estudo()
+        ids = [f"Q{i:03d}" for i in range(20)]
+        threads = [
+            threading.Thread(target=db.marcar_questao_sqlite, args=(qid, True))
+            for qid in ids
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(db._CONEXOES) == 1
+        marcadas = helpers.carregar_estudo()["questoes_marcadas_importantes"]
+        assert set(ids) <= set(marcadas)
+
+    def test_agregados_gravados_com_o_tema(self, data_dir_sqlite, mocker):
+        """O bloco de agregados é lido do banco, sem recalcular o registro."""
+        estudo = helpers.carregar_estudo()
+        registrar_evento(
+            estudo, "revisao_registrada", tema="Pré-natal", revisao="r1",
+            data="2026-02-25", questoes=30, acertos=20
+        )
+
+        recalculo = mocker.spy(agregados_estudo, "calcular_agregados")
+        recarregado = helpers.carregar_estudo()
+
+        assert recalculo.call_count == 0
+        assert recarregado["agregados"] == estudo["agregados"]
+        assert agregados_estudo.verificar_agregados(recarregado) == []
+
+class TestBackendJsonPadrao:
+    """Sem configuração, o backend continua sendo o estudo.json."""
+
+    def test_backend_padrao_json(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+        helpers.invalidar_cache_json()
+
+        estudo = {"registro_temas": {}, "questoes_marcadas_importantes": []}
+        helpers.alternar_questao_importante(estudo, "Q1")
+
+        assert helpers.obter_backend_estudo() == "json"
+        assert helpers.carregar_estudo()["questoes_marcadas_importantes"] == ["Q1"]
+        assert (tmp_path / "estudo_eventos.jsonl").exists()
+        assert not (tmp_path / "estudo.db").exists()
+        helpers.invalidar_cache_json()
@@ -0,0 +1,161 @@
+"""
+Testes para o Banco de Questões Colunar
+
+Valida a compilação do questoes.json, a reconstrução das questões,
+os filtros sobre os códigos e a recompilação quando o banco muda.
+"""
+
+import pytest
+import sys
+import json
+import os
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from utils import banco_colunar
+from utils.banco_colunar import carregar_banco
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, questoes_teste):
+    """Diretório de dados temporário com o banco de questões de teste."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    (tmp_path / "questoes.json").write_text(
+        json.dumps(questoes_teste, ensure_ascii=False), encoding="utf-8"
+    )
+    yield tmp_path
+    helpers.invalidar_cache_json()
+
+
+class TestCompilacao:
+    """Testes de ida e volta do formato colunar."""
+
+    def test_questoes_reconstruidas(self, data_dir, questoes_teste):
+        """Cada questão deve voltar idêntica à original."""
+        banco = carregar_banco()
+
+        assert len(banco) == len(questoes_teste["questoes"])
+        for i, original in enumerate(questoes_teste["questoes"]):
+            assert banco.questao(i) == original
+
+    def test_arquivos_gerados(self, data_dir):
+        carregar_banco()
+
+        assert (data_dir / "questoes.colunas.npz").exists()
+        assert len(list(data_dir.glob("questoes.textos.*.bin"))) == 1
+
+    def test_campos_ausentes_e_tipos(self, data_dir):
+        """Campos ausentes não aparecem; ids numéricos mantêm o tipo."""
+        helpers.salvar_questoes({"questoes": [
+            {"id": 7, "enunciado": "Sem tema", "alternativas": [], "gabarito": "A"},
+            {"id": 8, "tema": "Asma", "enunciado": "Com tema", "extra": {"ano": 2024}}
+        ]})
+        banco = carregar_banco()
+
+        assert banco.questao(0) == {"id": 7, "enunciado": "Sem tema", "alternativas": [], "gabarito": "A"}
+        assert banco.questao(1)["extra"] == {"ano": 2024}
+        assert banco.opcoes("tema", "Não classificado") == ["Asma", "Não classificado"]
+        assert list(banco.filtrar(id=[8])) == [1]
+
+    def test_banco_vazio(self, data_dir):
+        helpers.salvar_questoes({"questoes": []})
+        banco = carregar_banco()
+
+        assert len(banco) == 0
+        assert banco.opcoes("tema") == []
+        assert len(banco.filtrar(tema="Asma")) == 0
+
+
+class TestFiltros:
+    """Testes de filtros e agregações sobre os códigos."""
+
+    def test_filtrar_por_valor_e_lista(self, data_dir, questoes_teste):
+        banco = carregar_banco()
+        todas = questoes_teste["questoes"]
+
+        por_area = banco.filtrar(grande_area="Clinica Medica")
+        assert [banco.metadados(i)["id"] for i in por_area] == [
+            q["id"] for q in todas if q["grande_area"] == "Clinica Medica"
+        ]
+
+        temas = ["Tuberculose", "Pré-natal"]
+        assert [banco.questao(i) for i in banco.filtrar(tema=temas)] == [
+            q for q in todas if q["tema"] in temas
+        ]
+
+    def test_filtrar_subconjunto_e_valor_inexistente(self, data_dir):
+        banco = carregar_banco()
+        subconjunto = banco.filtrar(grande_area="Clinica Medica")
+
+        assert len(banco.filtrar(subconjunto, tema="Pré-natal")) == 0
+        assert len(banco.filtrar(tema="Tema inexistente")) == 0
+        assert len(banco.filtrar(tema=None)) == len(banco)
+
+    def test_contagem(self, data_dir, questoes_teste):
+        banco = carregar_banco()
+        esperado = {}
+        for q in questoes_teste["questoes"]:
+            esperado[q["grande_area"]] = esperado.get(q["grande_area"], 0) + 1
+
+        assert banco.contagem("grande_area") == esperado
+
+
+class TestIndiceQuestoes:
+    """Testes dos bitsets por tema, área e banca."""
+
+    def test_mesmo_resultado_que_filtrar(self, data_dir, questoes_teste):
+        banco = carregar_banco()
+        indice = banco.indice()
+        combinacoes = [
+            {},
+            {"grande_area": "Clinica Medica"},
+            {"tema": ["Tuberculose", "Pré-natal"], "banca": None},
+            {"grande_area": "Clinica Medica", "tema": "Pré-natal"},
+            {"tema": "Tema inexistente"}
+        ]
+
+        for criterios in combinacoes:
+            esperado = banco.filtrar(**criterios)
+            assert indice.indices(**criterios).tolist() == esperado.tolist()
+            assert indice.contar(**criterios) == len(esperado)
+
+    def test_padrao_seleciona_questoes_sem_o_campo(self, data_dir):
+        helpers.salvar_questoes({"questoes": [
+            {"id": "A", "tema": "Asma", "banca": "X"},
+            {"id": "B", "banca": "X"},
+            {"id": "C"}
+        ]})
+        indice = carregar_banco().indice()
+
+        assert indice.indices(tema=banco_colunar.PADROES["tema"]).tolist() == [1, 2]
+        assert indice.contar(tema=["Asma", banco_colunar.PADROES["tema"]], banca="X") == 2
+        assert indice.contar(banca=[]) == 0
+
+    def test_montado_uma_vez_por_banco(self, data_dir):
+        banco = carregar_banco()
+
+        assert banco.indice() is banco.indice()
+
+
+class TestAtualizacao:
+    """Testes de recompilação."""
+
+    def test_recompila_quando_json_muda(self, data_dir):
+        """Uma edição externa do questoes.json deve invalidar o banco."""
+        carregar_banco()
+        caminho = data_dir / "questoes.json"
+        caminho.write_text(json.dumps({"questoes": [{"id": "N1", "tema": "Asma"}]}), encoding="utf-8")
+        os.utime(caminho, ns=(1, 1))
+
+        banco = carregar_banco()
+
+        assert len(banco) == 1
+        assert banco.questao(0) == {"id": "N1", "tema": "Asma"}
+        assert len(list(data_dir.glob("questoes.textos.*.bin"))) == 1
+
+    def test_reutiliza_banco_aberto(self, data_dir):
+        assert carregar_banco() is carregar_banco()
@@ -0,0 +1,92 @@
+"""
+Testes para o Cache de JSON
+
+Valida que carregar_json parseia cada arquivo uma única vez por versão,
+detecta alterações em disco e é invalidado por salvar_json.
+"""
+
+import pytest
+import sys
+import json
+import os
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+
+
+@pytest.fixture
+def data_dir_temp(tmp_path, monkeypatch):
+    """Diretório de dados temporário com cache e contadores limpos."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    helpers.zerar_estatisticas_cache_json()
+    yield tmp_path
+    helpers.invalidar_cache_json()
+
+
+class TestCacheJson:
+    """Testes para o cache em processo de carregar_json."""
+
+    def test_segunda_leitura_e_hit(self, data_dir_temp):
+        """A segunda leitura do mesmo arquivo não deve parsear de novo."""
+        (data_dir_temp / "a.json").write_text('{"x": 1}', encoding="utf-8")
+
+        assert helpers.carregar_json("a.json") == {"x": 1}
+        assert helpers.carregar_json("a.json") == {"x": 1}
+
+        stats = helpers.obter_estatisticas_cache_json()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_copia_nao_contamina_cache(self, data_dir_temp):
+        """Alterar uma cópia (copiar=True) não deve afetar leituras seguintes."""
+        (data_dir_temp / "a.json").write_text('{"lista": [1, 2]}', encoding="utf-8")
+
+        dados = helpers.carregar_json("a.json", copiar=True)
+        dados["lista"].append(3)
+        dados["novo"] = {}
+
+        assert helpers.carregar_json("a.json") == {"lista": [1, 2]}
+
+    def test_padrao_compartilhado_e_somente_leitura(self, data_dir_temp):
+        """Sem copiar, leituras retornam o mesmo objeto, que recusa alterações."""
+        (data_dir_temp / "a.json").write_text('{"x": 1, "lista": [1]}', encoding="utf-8")
+
+        a = helpers.carregar_json("a.json")
+        assert helpers.carregar_json("a.json") is a
+        with pytest.raises(TypeError):
+            a["x"] = 2
+        with pytest.raises(TypeError):
+            a["lista"].append(2)
+        assert isinstance(a["lista"], list)
+
+    def test_alteracao_externa_invalida(self, data_dir_temp):
+        """Mudança no arquivo (mtime/tamanho) deve forçar nova leitura."""
+        caminho = data_dir_temp / "a.json"
+        caminho.write_text('{"x": 1}', encoding="utf-8")
+        helpers.carregar_json("a.json")
+
+        caminho.write_text('{"x": 22}', encoding="utf-8")
+        st = caminho.stat()
+        os.utime(caminho, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert helpers.carregar_json("a.json") == {"x": 22}
+        assert helpers.obter_estatisticas_cache_json()["misses"] == 2
+
+    def test_salvar_json_invalida(self, data_dir_temp):
+        """salvar_json deve descartar a entrada do cache."""
+        (data_dir_temp / "a.json").write_text('{"x": 1}', encoding="utf-8")
+        helpers.carregar_json("a.json")
+
+        helpers.salvar_json("a.json", {"x": 2})
+
+        assert helpers.obter_estatisticas_cache_json()["invalidacoes"] == 1
+        assert helpers.carregar_json("a.json") == {"x": 2}
+
+    def test_arquivo_inexistente(self, data_dir_temp):
+        """Arquivo inexistente retorna dicionário vazio sem entrar no cache."""
+        assert helpers.carregar_json("nao_existe.json") == {}
+        assert helpers.obter_estatisticas_cache_json()["entradas"] == 0
@@ -0,0 +1,116 @@
+"""
+Testes para o Cache das Páginas
+
+Valida a versão dos arquivos de dados e que os motores em cache só são
+recalculados quando um salvar_* grava um arquivo de que dependem.
+"""
+
+import pytest
+import sys
+import json
+from pathlib import Path
+
+import streamlit as st
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from utils import eventos_estudo as eventos
+from core import cache_paginas
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, config_teste, pesos_teste, temas_teste, estudo_com_dados, calendario_teste):
+    """Diretório de dados temporário com caches do Streamlit limpos."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    for nome, dados in (
+        ("config.json", config_teste),
+        ("pesos_enamed.json", pesos_teste),
+        ("temas.json", temas_teste),
+        ("estudo.json", estudo_com_dados),
+        ("calendario.json", calendario_teste)
+    ):
+        (tmp_path / nome).write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    yield tmp_path
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    helpers.configurar_escrita_adiada(None)
+    helpers.invalidar_cache_json()
+
+
+class TestVersaoArquivos:
+    """Testes da versão usada como chave dos caches."""
+
+    def test_muda_a_cada_escrita(self, data_dir):
+        versao = helpers.versao_arquivos("estudo.json", "temas.json")
+        assert helpers.versao_arquivos("estudo.json", "temas.json") == versao
+
+        helpers.salvar_json("estudo.json", {"registro_temas": {}}, imediato=True)
+
+        nova = helpers.versao_arquivos("estudo.json", "temas.json")
+        assert nova != versao
+        assert nova[2] == versao[2]
+
+    def test_escrita_adiada_e_eventos(self, data_dir):
+        helpers.configurar_escrita_adiada(60)
+        versao = helpers.versao_arquivos("config.json", eventos.ARQUIVO_EVENTOS)
+
+        helpers.salvar_json("config.json", {"x": 1})
+        assert helpers.versao_arquivos("config.json", eventos.ARQUIVO_EVENTOS)[1] != versao[1]
+
+        eventos.anexar_eventos([("questao_marcada", {"questao_id": "Q1", "marcada": True})])
+        assert helpers.versao_arquivos("config.json", eventos.ARQUIVO_EVENTOS)[2] != versao[2]
+        helpers.configurar_escrita_adiada(0)
+
+
+class TestMotoresEmCache:
+    """Testes dos resultados dos motores em cache."""
+
+    def test_recalcula_so_quando_os_dados_mudam(self, data_dir, mocker):
+        from core.priorizador_enamed import PriorizadorENAMED
+        espiao = mocker.spy(PriorizadorENAMED, "calcular_cobertura_high_yield")
+
+        primeira = cache_paginas.cobertura_high_yield()
+        assert cache_paginas.cobertura_high_yield() == primeira
+        assert espiao.call_count == 1
+
+        estudo = helpers.carregar_estudo()
+        eventos.registrar_evento(
+            estudo, "revisao_registrada", tema="Diabetes", grande_area="Clinica Medica",
+            revisao="r1", data="2026-02-10", questoes=20, acertos=15
+        )
+
+        segunda = cache_paginas.cobertura_high_yield()
+        assert espiao.call_count == 2
+        assert segunda != primeira
+
+    def test_estudo_em_cache_e_uma_copia(self, data_dir):
+        contexto = cache_paginas.contexto_pagina()
+        contexto.estudo["registro_temas"].clear()
+
+        assert cache_paginas.contexto_pagina().estudo["registro_temas"]
+
+    def test_referencia_compartilhada(self, data_dir):
+        temas = cache_paginas.carregar_referencia("temas.json")
+
+        assert cache_paginas.carregar_referencia("temas.json") is temas
+        assert cache_paginas.contexto_pagina().temas is temas
+
+    def test_opcoes_do_banco_recalculadas_quando_o_banco_muda(self, data_dir, questoes_teste):
+        caminho = data_dir / "questoes.json"
+        caminho.write_text(json.dumps(questoes_teste, ensure_ascii=False), encoding="utf-8")
+
+        opcoes = cache_paginas.opcoes_banco()
+        assert opcoes["temas"] == cache_paginas.carregar_banco_compartilhado().opcoes("tema", "Não classificado")
+
+        novas = dict(questoes_teste, questoes=questoes_teste["questoes"] + [
+            {"id": "QNOVA", "tema": "Tema Novo", "grande_area": "Pediatria", "banca": "Banca Nova"}
+        ])
+        helpers.salvar_json("questoes.json", novas, imediato=True)
+
+        assert "Tema Novo" in cache_paginas.opcoes_banco()["temas"]
+        assert "Banca Nova" in cache_paginas.opcoes_banco()["bancas"]
@@ -233,3 +233,64 @@ class TestRelatorioPendencias:
         # Próximas deve ser subset de todas
         assert len(proximas) <= len(todas)
 
+
+
+class TestCalculoEmLote:
+    """Testes do cálculo vetorizado (deve coincidir com o cálculo por tema)."""
+    
+    @pytest.fixture
+    def calc(self, config_teste, pesos_teste):
+        from core.calculadora_revisoes import CalculadoraRevisoes
+        from core.contexto import ContextoDados
+        return CalculadoraRevisoes(ContextoDados(
+            config=config_teste,
+            pesos=pesos_teste,
+            agora=datetime(2026, 3, 1, 15, 30)
+        ))
+    
+    def test_cronogramas_iguais_ao_calculo_por_tema(self, calc):
+        """Datas ao longo de dois anos, incluindo perto da prova (R3 ajustada)."""
+        from core.calculadora_revisoes import converter_datas
+        datas = [datetime(2026, 1, 1) + timedelta(days=d) for d in range(0, 700, 3)]
+        
+        lote = calc.calcular_cronogramas_lote(converter_datas([d.strftime("%Y-%m-%d") for d in datas]))
+        
+        assert lote["r3_ajustado"].any()
+        for i, data in enumerate(datas):
+            cronograma = calc.calcular_cronograma_tema(data)
+            for rev in ("r1", "r2", "r3"):
+                assert str(lote[rev][i]) == cronograma["revisoes"][rev]["data_sugerida"]
+            assert lote["fator_proximidade"][i] == calc.calcular_fator_proximidade(data)
+    
+    def test_status_conta_dias_a_partir_do_instante_atual(self, calc):
+        """Como timedelta.days: a data de hoje, às 15h30, está a -1 dia."""
+        import numpy as np
+        datas = np.array(["2026-03-01", "2026-03-09", "2026-03-10", "2026-02-22", "2026-02-21"], dtype="datetime64[D]")
+        
+        status, dias = calc.verificar_status_lote(datas)
+        
+        assert dias.tolist() == [-1, 7, 8, -8, -9]
+        for data, s in zip(datas, status):
+            assert s == calc.verificar_status_revisao(str(data))["status"]
+    
+    def test_proximas_acoes_iguais_ao_calculo_por_tema(self, calc, estudo_com_dados):
+        registros = list(estudo_com_dados["registro_temas"].values()) + [
+            {},
+            {"data_teoria": "2026-01-05", "r1": {"data": "2026-01-20"}, "r2": {}},
+            {"data_teoria": "2025-12-01", "r1": {"data": "x"}, "r2": {"data": "x"}, "r3": {"data": "x"}},
+        ]
+        
+        lote = calc.calcular_proximas_acoes_lote(registros)
+        
+        for i, registro in enumerate(registros):
+            proxima = calc.calcular_proxima_acao(registro)
+            if lote["revisao"][i]:
+                assert proxima["acao"] == f"fazer_r{lote['revisao'][i]}"
+                assert proxima["data_sugerida"] == str(lote["data_sugerida"][i])
+                assert proxima["status"] == lote["status"][i]
+            else:
+                assert proxima["acao"] == ("aguardar_revisao_final" if lote["teoria"][i] else "ver_teoria")
+    
+    def test_data_invalida(self, calc):
+        with pytest.raises(ValueError):
+            calc.calcular_proximas_acoes_lote([{"data_teoria": "31/12/2026"}])
@@ -0,0 +1,115 @@
+"""
+Testes para o Catálogo de Temas
+
+Valida os IDs estáveis, a resolução por nome exato, normalizado e por
+apelido, e o uso do catálogo pelo plano semanal e pelo relatório de
+prioridades.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+from datetime import datetime
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import catalogo_temas
+from core.catalogo_temas import CatalogoTemas, obter_catalogo_temas
+from utils.helpers import congelar
+from core.contexto import ContextoDados
+
+
+@pytest.fixture
+def temas():
+    return {
+        "grandes_areas": {
+            "Clinica Medica": {"temas": [
+                {"nome": "Diabetes", "high_yield": True},
+                {"nome": "Tuberculose", "high_yield": True, "aliases": ["Tísica"]}
+            ]},
+            "Ginecologia e Obstetricia": {"temas": [
+                {"nome": "Diabetes na Gestação", "high_yield": True},
+                {"nome": "Infecções", "high_yield": False}
+            ]},
+            "Pediatria": {"temas": [
+                {"nome": "Infecções", "high_yield": False, "id": 40}
+            ]}
+        }
+    }
+
+
+class TestResolucao:
+    """Testes dos mapas do catálogo."""
+
+    def test_ids_sequenciais_e_preservados(self, temas):
+        catalogo = CatalogoTemas(temas)
+
+        assert [t["id"] for t in catalogo] == [41, 42, 43, 44, 40]
+        assert catalogo.obter(40)["grande_area"] == "Pediatria"
+        assert [t["nome"] for t in catalogo.por_area("Clinica Medica")] == ["Diabetes", "Tuberculose"]
+
+    def test_nome_exato_normalizado_e_apelido(self, temas):
+        catalogo = CatalogoTemas(temas, aliases={"Tuberculose": ["TB"], "Inexistente": ["X"]})
+
+        assert catalogo.resolver("Diabetes")["grande_area"] == "Clinica Medica"
+        assert catalogo.resolver("  diabetes NA gestacao ")["nome"] == "Diabetes na Gestação"
+        assert catalogo.resolver("tb")["nome"] == "Tuberculose"
+        assert catalogo.resolver("Tísica")["nome"] == "Tuberculose"
+        assert catalogo.resolver("X") is None
+
+    def test_sem_correspondencia_por_substring(self, temas):
+        catalogo = CatalogoTemas(temas, aliases={})
+
+        assert catalogo.resolver("Gestação") is None
+        assert catalogo.resolver("Tuberculose Pulmonar") is None
+        assert catalogo.resolver("") is None
+
+    def test_mesmo_nome_em_areas_diferentes(self, temas):
+        catalogo = CatalogoTemas(temas)
+
+        assert catalogo.resolver("Infecções")["grande_area"] == "Ginecologia e Obstetricia"
+        assert catalogo.resolver("Infecções", "Pediatria")["id"] == 40
+        assert catalogo.resolver("Infecções", "Saude Mental")["grande_area"] == "Ginecologia e Obstetricia"
+
+    def test_catalogo_reaproveitado_ate_o_arquivo_mudar(self, temas):
+        catalogo = obter_catalogo_temas(temas)
+        assert obter_catalogo_temas({**temas}) is catalogo
+
+        temas["grandes_areas"]["Pediatria"]["temas"].append({"nome": "Imunizações"})
+        assert obter_catalogo_temas(temas) is not catalogo
+
+    def test_temas_congelado_sem_serializar(self, temas, mocker):
+        """O temas de carregar_json é reconhecido pela identidade."""
+        congelado = congelar(temas)
+        catalogo = obter_catalogo_temas(congelado)
+        dumps = mocker.spy(catalogo_temas.json, "dumps")
+
+        assert obter_catalogo_temas(congelado) is catalogo
+        assert dumps.call_count == 0
+
+
+class TestUsoPelosMotores:
+    """Testes dos motores que resolvem temas pelo catálogo."""
+
+    def test_plano_nao_confunde_temas_por_substring(self, config_teste, pesos_teste, temas):
+        from core.algoritmo_sugestao import AlgoritmoSugestao
+
+        estudo = {"registro_temas": {"Diabetes": {"data_teoria": "2026-02-20"}}}
+        alg = AlgoritmoSugestao(ContextoDados(
+            config=config_teste, pesos=pesos_teste, temas=temas, estudo=estudo,
+            calendario={}, agora=datetime(2026, 3, 1)
+        ))
+
+        plano = alg.gerar_plano_semanal(apenas_proximas=False)
+
+        assert [(t["tema"], t["grande_area"]) for t in plano["temas"]] == [("Diabetes", "Clinica Medica")]
+
+    def test_relatorio_de_prioridades_traz_ids(self, pesos_teste, temas):
+        from core.priorizador_enamed import PriorizadorENAMED
+
+        relatorio = PriorizadorENAMED(ContextoDados(pesos=pesos_teste, temas=temas, estudo={})).gerar_relatorio_prioridades()
+
+        ids = [t["id"] for area in relatorio["areas"].values() for grupo in area["temas"].values() for t in grupo]
+        assert sorted(ids) == [40, 41, 42, 43, 44]
+        assert relatorio["resumo"]["total_temas"] == 5
@@ -0,0 +1,95 @@
+"""
+Testes para o Classificador High-Yield / Low-Yield
+
+Valida a classificação por substring normalizada, o cache por versão
+dos pesos e a consistência entre os motores que o compartilham.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import classificador_yield
+from utils.helpers import congelar
+from core.classificador_yield import (
+    ClassificadorYield, obter_classificador, HIGH_YIELD, NORMAL, LOW_YIELD
+)
+from core.contexto import ContextoDados
+
+
+class TestClassificacao:
+    """Testes das regras de classificação."""
+
+    @pytest.fixture
+    def classificador(self, pesos_teste):
+        return ClassificadorYield(pesos_teste)
+
+    @pytest.mark.parametrize("tema, area, esperado", [
+        ("Tuberculose", "Clinica Medica", HIGH_YIELD),
+        ("Tuberculose Pulmonar", "Clinica Medica", HIGH_YIELD),   # contém o HY
+        ("HIV", "Clinica Medica", HIGH_YIELD),                    # contido no HY
+        ("Tuberculose", "Pediatria", NORMAL),                     # HY de outra área
+        ("Tumores Ortopédicos em Crianças", "Cirurgia Geral", LOW_YIELD),
+        ("Tema Normal", "Clinica Medica", NORMAL),
+    ])
+    def test_regras(self, classificador, tema, area, esperado):
+        assert classificador.classificar(tema, area)[0] == esperado
+
+    def test_ignora_acentos_e_caixa(self, classificador):
+        assert classificador.classificar("PRE-NATAL de baixo risco", "Ginecologia e Obstetricia")[0] == HIGH_YIELD
+        assert classificador.classificar("hipertensao  arterial", "Clinica Medica")[0] == HIGH_YIELD
+        assert classificador.classificar("medicina fetal", "Pediatria")[0] == LOW_YIELD
+
+    def test_high_yield_prevalece_sobre_low_yield(self, pesos_teste):
+        pesos = {**pesos_teste, "temas_low_yield": ["Tuberculose"]}
+
+        assert ClassificadorYield(pesos).classificar("Tuberculose", "Clinica Medica")[0] == HIGH_YIELD
+
+    def test_multiplicadores_dos_pesos_com_padrao(self, pesos_teste):
+        padrao = ClassificadorYield(pesos_teste)
+        personalizado = ClassificadorYield({**pesos_teste, "multiplicadores": {"high_yield": 2.0}})
+
+        assert padrao.classificar("Tuberculose", "Clinica Medica")[1] == 1.5
+        assert personalizado.classificar("Tuberculose", "Clinica Medica")[1] == 2.0
+        assert personalizado.classificar("Medicina Fetal", "Pediatria")[1] == 0.5
+
+
+class TestCompartilhamento:
+    """Testes do cache de classificadores e do uso pelos motores."""
+
+    def test_um_classificador_por_versao_dos_pesos(self, pesos_teste):
+        copia = {**pesos_teste, "temas_high_yield": dict(pesos_teste["temas_high_yield"])}
+
+        assert obter_classificador(pesos_teste) is obter_classificador(copia)
+
+        copia["temas_high_yield"]["Saude Mental"] = ["Suicídio"]
+        assert obter_classificador(copia) is not obter_classificador(pesos_teste)
+
+    def test_pesos_congelados_sem_serializar(self, pesos_teste, mocker):
+        """Os pesos de carregar_json são reconhecidos pela identidade."""
+        congelados = congelar(pesos_teste)
+        classificador = obter_classificador(congelados)
+        versao = mocker.spy(classificador_yield, "_versao_pesos")
+
+        assert obter_classificador(congelados) is classificador
+        assert obter_classificador(pesos_teste) is classificador
+        assert versao.call_count == 1
+
+    def test_motores_concordam(self, config_teste, pesos_teste, temas_teste, estudo_vazio, calendario_teste):
+        from core.algoritmo_sugestao import AlgoritmoSugestao
+        from core.priorizador_enamed import PriorizadorENAMED
+        contexto = ContextoDados(
+            config=config_teste, pesos=pesos_teste, temas=temas_teste,
+            estudo=estudo_vazio, calendario=calendario_teste
+        )
+        alg = AlgoritmoSugestao(contexto)
+        prio = PriorizadorENAMED(contexto)
+
+        for area, dados in temas_teste["grandes_areas"].items():
+            for tema in dados["temas"]:
+                classificacao = prio.classificar_tema(tema["nome"], area)
+                assert classificacao["multiplicador"] == alg.obter_multiplicador_yield(tema["nome"], area)
+                assert classificacao["icone"]
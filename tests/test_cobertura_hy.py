@@ -0,0 +1,122 @@
+"""
+Testes para a Cobertura de Temas High-Yield
+
+Valida o índice invertido registro -> temas High-Yield, sua atualização
+incremental (inclusive pelas gravações de eventos) e o resumo
+compartilhado usado pelas páginas.
+"""
+
+import pytest
+import sys
+import json
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.classificador_yield import ClassificadorYield
+from core.cobertura_hy import IndiceCoberturaHY, obter_cobertura_hy
+from core.contexto import ContextoDados
+from utils import helpers
+from utils.eventos_estudo import registrar_evento
+
+
+REVISAO = {"data": "2026-02-01", "questoes": 10, "acertos": 8}
+
+
+class TestIndiceCobertura:
+    """Testes do índice invertido."""
+
+    @pytest.fixture
+    def indice(self, pesos_teste):
+        return IndiceCoberturaHY(ClassificadorYield(pesos_teste))
+
+    def test_tema_revisado_cobre_hy_contido(self, indice, pesos_teste):
+        indice.sincronizar({
+            "Tuberculose Pulmonar": {"r1": REVISAO},
+            "Diabetes": {"data_teoria": "2026-01-01"},   # sem revisão
+        })
+
+        assert indice.coberto("Clinica Medica", "Tuberculose")
+        assert not indice.coberto("Clinica Medica", "Diabetes")
+        cobertura = indice.cobertura(pesos_teste)
+        assert cobertura["por_area"]["Clinica Medica"] == {"total": 4, "revisados": 1, "percentual": 25.0}
+        assert cobertura["total"]["high_yield_revisados"] == 1
+
+    def test_atualizacao_incremental(self, indice, pesos_teste):
+        registro = {"Pré-natal": {}}
+        indice.sincronizar(registro)
+        antes = indice.cobertura(pesos_teste)
+
+        registro["Pré-natal"] = {"r1": REVISAO}
+        indice.sincronizar(registro)
+        depois = indice.cobertura(pesos_teste)
+
+        assert depois is not antes
+        assert ("Ginecologia e Obstetricia", "Pré-natal") in depois["revisados"]
+        # Sem mudanças o mesmo resumo é reaproveitado
+        indice.sincronizar(registro)
+        assert indice.cobertura(pesos_teste) is depois
+
+    def test_tema_removido_do_registro(self, indice):
+        indice.sincronizar({"HIV e AIDS": {"r2": REVISAO}})
+        indice.sincronizar({})
+
+        assert not indice.coberto("Clinica Medica", "HIV e AIDS")
+        assert "HIV e AIDS" not in indice._hy_da_chave
+
+    def test_pendentes_ordenados_por_peso(self, indice, pesos_teste):
+        indice.sincronizar({"Tuberculose": {"r1": REVISAO}})
+        pendentes = indice.cobertura(pesos_teste)["pendentes"]
+
+        assert "Tuberculose" not in [p["tema"] for p in pendentes]
+        pesos = [p["peso_area"] for p in pendentes]
+        assert pesos == sorted(pesos, reverse=True)
+
+
+class TestPriorizador:
+    """Testes da cobertura exposta pelo PriorizadorENAMED."""
+
+    def test_cobertura_e_pendentes_consistentes(self, pesos_teste, temas_teste, estudo_com_dados):
+        from core.priorizador_enamed import PriorizadorENAMED
+        prio = PriorizadorENAMED(ContextoDados(pesos=pesos_teste, temas=temas_teste, estudo=estudo_com_dados))
+
+        cobertura = prio.calcular_cobertura_high_yield()
+        pendentes = prio.obter_high_yield_pendentes()
+
+        total = cobertura["total"]
+        assert total["high_yield_total"] - total["high_yield_revisados"] == len(pendentes)
+        assert prio.calcular_cobertura_high_yield() is cobertura
+
+    def test_mesmo_resumo_para_estudos_diferentes(self, pesos_teste):
+        revisado = obter_cobertura_hy(pesos_teste, {"registro_temas": {"Diabetes": {"r1": REVISAO}}})
+        assert revisado["total"]["high_yield_revisados"] == 1
+
+        vazio = obter_cobertura_hy(pesos_teste, {"registro_temas": {}})
+        assert vazio["total"]["high_yield_revisados"] == 0
+
+
+class TestGravacoes:
+    """Testes do índice mantido pelas gravações do estudo."""
+
+    def test_evento_atualiza_sem_percorrer_registro(self, tmp_path, monkeypatch, pesos_teste, mocker):
+        monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+        helpers.invalidar_cache_json()
+        (tmp_path / "config.json").write_text("{}", encoding="utf-8")
+        (tmp_path / "estudo.json").write_text(
+            json.dumps({"registro_temas": {"Diabetes": {"data_teoria": "2026-01-01"}}}), encoding="utf-8"
+        )
+        estudo = helpers.carregar_estudo()
+        registrar_evento(estudo, "teoria_registrada", tema="Asma", grande_area="Clinica Medica", data="2026-01-02")
+        assert obter_cobertura_hy(pesos_teste, estudo)["total"]["high_yield_revisados"] == 0
+
+        varredura = mocker.spy(IndiceCoberturaHY, "sincronizar")
+        registrar_evento(
+            estudo, "revisao_registrada", tema="Diabetes", revisao="r1",
+            data="2026-02-01", questoes=10, acertos=8
+        )
+        cobertura = obter_cobertura_hy(pesos_teste, estudo)
+
+        varredura.assert_not_called()
+        assert ("Clinica Medica", "Diabetes") in cobertura["revisados"]
+        helpers.invalidar_cache_json()
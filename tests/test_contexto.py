@@ -0,0 +1,120 @@
+"""
+Testes para o Contexto de Dados
+
+Valida que os motores compartilham uma única carga de dados e
+um único instante de referência quando recebem o mesmo contexto.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+from datetime import datetime
+from unittest.mock import patch
+from freezegun import freeze_time
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.contexto import ContextoDados
+
+
+class TestContextoDados:
+    """Testes para a classe ContextoDados."""
+
+    def test_carrega_cada_arquivo_uma_vez(self, config_teste, estudo_com_dados):
+        """Acessos repetidos não devem recarregar os dados."""
+        with patch('utils.helpers.carregar_config', return_value=config_teste) as m_config, \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_com_dados) as m_estudo:
+            contexto = ContextoDados()
+
+            for _ in range(3):
+                contexto.config
+                contexto.estudo
+
+            assert m_config.call_count == 1
+            assert m_estudo.call_count == 1
+
+    def test_dados_injetados_nao_sao_recarregados(self, config_teste):
+        """Dados passados no construtor devem ser usados diretamente."""
+        with patch('utils.helpers.carregar_config') as m_config:
+            contexto = ContextoDados(config=config_teste)
+
+            assert contexto.config is config_teste
+            m_config.assert_not_called()
+
+    def test_agora_fixado_no_primeiro_acesso(self):
+        """O instante de referência não deve mudar depois de lido."""
+        contexto = ContextoDados()
+
+        with freeze_time("2026-02-10"):
+            primeiro = contexto.agora
+        with freeze_time("2026-05-01"):
+            segundo = contexto.agora
+
+        assert primeiro == segundo == datetime(2026, 2, 10)
+
+    def test_data_prova_da_configuracao(self, config_teste):
+        """data_prova deve vir de usuario.data_prova_estimada."""
+        contexto = ContextoDados(config=config_teste)
+        assert contexto.data_prova == "2027-11-15"
+
+
+class TestMotoresCompartilhados:
+    """Testes de motores construídos sobre o mesmo contexto."""
+
+    @pytest.fixture
+    def contexto(self, config_teste, pesos_teste, temas_teste, estudo_com_dados, calendario_teste):
+        return ContextoDados(
+            config=config_teste,
+            pesos=pesos_teste,
+            temas=temas_teste,
+            estudo=estudo_com_dados,
+            calendario=calendario_teste,
+            agora=datetime(2026, 2, 15)
+        )
+
+    def test_motores_compartilham_dados(self, contexto):
+        """Todos os motores devem referenciar os mesmos objetos."""
+        from core.algoritmo_sugestao import AlgoritmoSugestao
+        from core.priorizador_enamed import PriorizadorENAMED
+        from core.calculadora_revisoes import CalculadoraRevisoes
+
+        alg = AlgoritmoSugestao(contexto)
+        prio = PriorizadorENAMED(contexto)
+        calc = CalculadoraRevisoes(contexto)
+
+        assert alg.estudo is prio.estudo is contexto.estudo
+        assert alg.pesos is prio.pesos is calc.pesos
+
+    def test_relogio_do_contexto(self, contexto):
+        """Status de revisão deve usar o 'agora' do contexto, não o relógio real."""
+        from core.calculadora_revisoes import CalculadoraRevisoes
+
+        calc = CalculadoraRevisoes(contexto)
+        status = calc.verificar_status_revisao("2026-02-15")
+
+        assert status["status"] == "disponivel"
+        assert status["dias_restantes"] == 0
+
+    def test_plano_semanal_usa_contexto(self, contexto):
+        """O plano semanal deve ser rotulado com a semana do contexto."""
+        from core.algoritmo_sugestao import obter_plano_semanal
+
+        plano = obter_plano_semanal(contexto)
+
+        assert plano["semana"] == datetime(2026, 2, 15).strftime("%Y-W%W")
+
+    def test_motores_sem_contexto_vinculam_registro(self, config_teste, pesos_teste, temas_teste,
+                                                    estudo_com_dados, calendario_teste):
+        """Sem contexto, o estudo passa pelo mesmo carregamento (com IDs) do contexto."""
+        from core.algoritmo_sugestao import AlgoritmoSugestao
+        from core.priorizador_enamed import PriorizadorENAMED
+        from core.metricas import SistemaMetricas
+
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste), \
+             patch('utils.helpers.carregar_temas', return_value=temas_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_com_dados), \
+             patch('utils.helpers.carregar_calendario', return_value=calendario_teste):
+            for motor in (AlgoritmoSugestao(), PriorizadorENAMED(), SistemaMetricas()):
+                assert motor.estudo["registro_temas"]["Tuberculose"].get("tema_id") is not None
@@ -0,0 +1,136 @@
+"""
+Testes para a Correspondência de Temas
+
+Valida a similaridade por trigramas, a troca pelo nome canônico, a fila
+de revisão dos rótulos de baixa confiança e o mapeamento em lote.
+"""
+
+import pytest
+import sys
+import json
+import time
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from core.catalogo_temas import CatalogoTemas
+from core.correspondencia_temas import (
+    IndiceTrigramas, CorrespondenciaTemas, trigramas, rotulo_normalizado,
+    carregar_revisao, decidir_tema, obter_correspondencia, LIMIAR_CONFIANCA
+)
+
+
+@pytest.fixture
+def catalogo(temas_teste):
+    temas_teste["grandes_areas"]["Clinica Medica"]["temas"].append(
+        {"nome": "Infecção do Trato Urinário", "high_yield": True}
+    )
+    return CatalogoTemas(temas_teste, aliases={"Tuberculose": ["TB"]})
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, temas_teste, questoes_teste):
+    """Diretório de dados temporário com o catálogo e o banco de teste."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    for nome, dados in (
+        ("config.json", {}),
+        ("temas.json", temas_teste),
+        ("questoes.json", questoes_teste)
+    ):
+        (tmp_path / nome).write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+    yield tmp_path
+    helpers.invalidar_cache_json()
+
+
+class TestSimilaridade:
+    """Testes do índice de trigramas."""
+
+    def test_normalizacao_ignora_acentos_e_pontuacao(self):
+        assert rotulo_normalizado(" Pré-Natal: 1º trimestre ") == "pre natal 1o trimestre"
+        assert trigramas("Pré-natal") == trigramas("pre natal")
+
+    def test_melhor_candidato(self, catalogo):
+        indice = IndiceTrigramas(catalogo)
+
+        tema_id, similaridade = indice.candidatos("Infecção urinária")[0]
+
+        assert catalogo.obter(tema_id)["nome"] == "Infecção do Trato Urinário"
+        assert 0.3 < similaridade < 1
+        assert indice.candidatos("Tuberculose")[0][1] == 1.0
+
+    def test_area_desempata_candidatos(self, catalogo):
+        indice = IndiceTrigramas(catalogo)
+
+        cirurgia = indice.candidatos("Trauma e hérnias", "Cirurgia Geral", limite=2)
+
+        assert {catalogo.obter(i)["grande_area"] for i, _ in cirurgia} == {"Cirurgia Geral"}
+
+
+class TestCorrespondencia:
+    """Testes da aplicação às questões e da fila de revisão."""
+
+    def test_rotulo_confiavel_recebe_nome_canonico(self, catalogo):
+        correspondencia = CorrespondenciaTemas(catalogo)
+        questoes = [{"tema": "TB"}, {"tema": "Tuberculose"}, {"tema": "Diabete"}]
+
+        for q in questoes:
+            correspondencia(q)
+
+        assert [q["tema"] for q in questoes] == ["Tuberculose", "Tuberculose", "Diabetes"]
+        assert questoes[0]["tema_original"] == "TB"
+        assert "tema_original" not in questoes[1]
+        assert len({q["tema_id"] for q in questoes[:2]}) == 1
+        assert correspondencia.aplicadas == 3
+        assert not correspondencia.pendentes
+
+    def test_baixa_confianca_vai_para_revisao(self, catalogo):
+        correspondencia = CorrespondenciaTemas(catalogo)
+        questoes = [{"tema": "Infecção urinária"}, {"tema": "infeccao URINARIA"}, {"tema": "Dengue"}]
+
+        for q in questoes:
+            correspondencia(q)
+
+        assert all("tema_id" not in q for q in questoes)
+        assert questoes[0]["tema"] == "Infecção urinária"
+        pendente = correspondencia.pendentes["infeccao urinaria"]
+        assert pendente["questoes"] == 2
+        assert pendente["confianca"] < LIMIAR_CONFIANCA
+        assert catalogo.obter(pendente["candidatos"][0][0])["nome"] == "Infecção do Trato Urinário"
+        assert correspondencia.pendentes["dengue"]["candidatos"] == []
+
+    def test_decisao_vale_para_importadas_e_proximas(self, data_dir):
+        questoes = helpers.carregar_questoes(copiar=True)
+        questoes["questoes"].append({"id": "Q9", "tema": "Pré natal de baixo risco", "grande_area": "Ginecologia e Obstetricia"})
+        helpers.salvar_questoes(questoes)
+
+        correspondencia = obter_correspondencia()
+        correspondencia({"tema": "Pré natal de baixo risco"})
+        assert correspondencia.salvar_revisao() == 1
+
+        catalogo = correspondencia.catalogo
+        pre_natal = catalogo.resolver("Pré-natal")["id"]
+        assert decidir_tema("pre-natal de baixo risco", pre_natal) == 1
+
+        revisao = carregar_revisao()
+        assert revisao["pendentes"] == {}
+        questao = helpers.carregar_questoes()["questoes"][-1]
+        assert (questao["tema"], questao["tema_id"]) == ("Pré-natal", pre_natal)
+
+        nova = {"tema": "Pré natal de baixo risco"}
+        obter_correspondencia()(nova)
+        assert nova["tema_id"] == pre_natal
+
+    def test_cem_mil_questoes_em_lote(self, catalogo):
+        correspondencia = CorrespondenciaTemas(catalogo)
+        rotulos = ["TB", "Infecção urinária", "Diabetes"] + [f"Assunto {i}" for i in range(997)]
+        questoes = [{"tema": rotulos[i % len(rotulos)]} for i in range(100_000)]
+
+        inicio = time.perf_counter()
+        for q in questoes:
+            correspondencia(q)
+
+        assert time.perf_counter() - inicio < 5
+        assert correspondencia.aplicadas == 200
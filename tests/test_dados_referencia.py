@@ -0,0 +1,87 @@
+"""
+Testes para os Dados de Referência
+
+Valida o congelamento (imutável, strings internadas), o
+compartilhamento no processo com recarga quando o arquivo muda e o
+relatório de memória da sessão.
+"""
+
+import pytest
+import sys
+import json
+import pickle
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from utils.dados_referencia import (
+    congelar, carregar_referencia, relatorio_memoria, DicionarioCongelado, ListaCongelada
+)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, temas_teste):
+    """Diretório de dados temporário com temas.json."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    (tmp_path / "temas.json").write_text(json.dumps(temas_teste, ensure_ascii=False), encoding="utf-8")
+    yield tmp_path
+    helpers.invalidar_cache_json()
+
+
+class TestCongelar:
+    """Testes da estrutura congelada."""
+
+    def test_imutavel(self, temas_teste):
+        temas = congelar(temas_teste)
+
+        assert isinstance(temas, DicionarioCongelado)
+        assert json.loads(json.dumps(temas)) == temas_teste
+        with pytest.raises(TypeError):
+            temas["novo"] = 1
+        with pytest.raises(TypeError):
+            temas.update({"novo": 1})
+        lista = congelar({"a": [1, [2, 3]]})["a"]
+        assert isinstance(lista, ListaCongelada) and lista == [1, [2, 3]]
+        with pytest.raises(TypeError):
+            lista[1].append(4)
+
+    def test_strings_internadas(self):
+        dados = congelar({"a": "".join(["Clínica", " Médica"]), "b": "".join(["Clínica", " Médica"])})
+
+        assert dados["a"] is dados["b"]
+
+    def test_json_e_pickle(self, temas_teste):
+        temas = congelar(temas_teste)
+
+        assert json.loads(json.dumps(temas, ensure_ascii=False)) == temas_teste
+        copia = pickle.loads(pickle.dumps(temas))
+        assert type(copia) is dict
+        copia["novo"] = 1
+
+
+class TestCompartilhamento:
+    """Testes da carga por processo."""
+
+    def test_mesma_instancia_ate_o_arquivo_mudar(self, data_dir):
+        temas = carregar_referencia("temas.json")
+        assert carregar_referencia("temas.json") is temas
+
+        helpers.salvar_json("temas.json", {"temas": {}}, imediato=True)
+
+        novos = carregar_referencia("temas.json")
+        assert novos is not temas
+        assert novos == {"temas": {}}
+
+    def test_relatorio_nao_conta_referencia_na_sessao(self, data_dir):
+        temas = carregar_referencia("temas.json")
+        estado = {"temas": temas, "respostas": {0: "A", 1: "C"}}
+
+        relatorio = relatorio_memoria(estado)
+
+        assert relatorio["sessao"]["temas"] == 0
+        assert relatorio["sessao"]["respostas"] > 0
+        assert relatorio["compartilhado"]["temas.json"] > 0
+        assert relatorio["total_sessao"] == relatorio["sessao"]["respostas"]
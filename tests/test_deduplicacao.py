@@ -0,0 +1,143 @@
+"""
+Testes para o Índice de Duplicatas
+
+Valida o hash de conteúdo normalizado, a classificação nova/duplicada/
+conflitante, a persistência do índice e seu uso na importação.
+"""
+
+import pytest
+import sys
+import io
+import json
+import os
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from utils import deduplicacao
+from utils.deduplicacao import (
+    IndiceDuplicatas, hash_questao, carregar_indice, NOVA, DUPLICADA, CONFLITANTE
+)
+from utils.importador_questoes import analisar_importacao, importar_questoes
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, questoes_teste):
+    """Diretório de dados temporário com o banco de questões de teste."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    (tmp_path / "questoes.json").write_text(
+        json.dumps(questoes_teste, ensure_ascii=False), encoding="utf-8"
+    )
+    yield tmp_path
+    helpers.invalidar_cache_json()
+
+
+def _arquivo(questoes):
+    return io.BytesIO(json.dumps({"questoes": questoes}, ensure_ascii=False).encode("utf-8"))
+
+
+class TestHash:
+    """Testes da normalização do conteúdo."""
+
+    def test_ignora_acentos_caixa_pontuacao_e_marcadores(self):
+        a = {"enunciado": "Qual a conduta na Pré-eclâmpsia?", "alternativas": ["(A) Sulfato", "(B) Parto"]}
+        b = {"enunciado": "qual a conduta na pre eclampsia", "alternativas": ["a) sulfato", "b. PARTO"]}
+
+        assert hash_questao(a) == hash_questao(b)
+
+    def test_ordem_das_alternativas_importa(self):
+        a = {"enunciado": "X", "alternativas": ["um", "dois"]}
+        b = {"enunciado": "X", "alternativas": ["dois", "um"]}
+
+        assert hash_questao(a) != hash_questao(b)
+
+    def test_classificacao(self, questoes_teste):
+        indice = IndiceDuplicatas.construir(questoes_teste["questoes"])
+        original = questoes_teste["questoes"][0]
+
+        assert indice.classificar(original) == (DUPLICADA, ["A", "T001"])
+        assert indice.classificar({**original, "gabarito": "B"})[0] == CONFLITANTE
+        assert indice.classificar({**original, "enunciado": "Outra"}) == (NOVA, None)
+
+
+class TestPersistencia:
+    """Testes do arquivo questoes.hashes.json."""
+
+    def test_construido_e_salvo(self, data_dir, questoes_teste):
+        indice = carregar_indice()
+
+        assert len(indice) == len(questoes_teste["questoes"])
+        salvo = json.loads((data_dir / "questoes.hashes.json").read_text(encoding="utf-8"))
+        assert len(salvo["hashes"]) == len(indice)
+
+    def test_reconstruido_quando_banco_muda(self, data_dir):
+        carregar_indice()
+        caminho = data_dir / "questoes.json"
+        caminho.write_text(json.dumps({"questoes": []}), encoding="utf-8")
+        os.utime(caminho, ns=(1, 1))
+
+        assert len(carregar_indice()) == 0
+
+
+class TestImportacaoDeduplicada:
+    """Testes do relatório e da importação com o índice."""
+
+    def test_relatorio(self, data_dir, questoes_teste):
+        existente = questoes_teste["questoes"][0]
+        nova = {**existente, "id": "N1", "enunciado": "Questão inédita"}
+        arquivo = _arquivo([
+            {**existente, "id": "X1", "banca": "Outra banca"},   # duplicada do banco
+            {**existente, "id": "X2", "gabarito": "D"},           # conflitante
+            nova,
+            {**nova, "id": "N1-copia"},                           # duplicada no próprio arquivo
+        ])
+
+        relatorio = analisar_importacao(arquivo)
+
+        assert (relatorio["novas"], relatorio["duplicadas"], relatorio["conflitantes"]) == (1, 2, 1)
+        assert [(r["id"], r["id_existente"]) for r in relatorio["repetidas"]] == [
+            ("X1", "T001"), ("X2", "T001"), ("N1-copia", "N1")
+        ]
+        assert arquivo.tell() == 0
+        # A análise não altera o banco
+        assert json.loads((data_dir / "questoes.json").read_text(encoding="utf-8")) == questoes_teste
+
+    def test_importacao_ignora_duplicadas_e_conflitos(self, data_dir, questoes_teste):
+        existente = questoes_teste["questoes"][0]
+        questoes = [
+            {**existente, "id": "X1"},
+            {**existente, "id": "X2", "gabarito": "D"},
+            {**existente, "id": "N1", "enunciado": "Questão inédita"}
+        ]
+
+        resultado = importar_questoes(_arquivo(questoes))
+
+        assert resultado["importadas"] == 1
+        assert resultado["total"] == len(questoes_teste["questoes"]) + 1
+
+        # O índice já inclui a questão importada
+        repetido = analisar_importacao(_arquivo(questoes))
+        assert repetido["novas"] == 0
+
+    def test_incluir_conflitantes(self, data_dir, questoes_teste):
+        existente = questoes_teste["questoes"][0]
+
+        resultado = importar_questoes(
+            _arquivo([{**existente, "id": "X2", "gabarito": "D"}]),
+            incluir_conflitantes=True
+        )
+
+        assert resultado["importadas"] == 1
+        assert resultado["conflitantes"] == 1
+
+    def test_substituir_considera_apenas_o_arquivo(self, data_dir, questoes_teste):
+        existente = questoes_teste["questoes"][0]
+
+        resultado = importar_questoes(_arquivo([existente, {**existente, "id": "X1"}]), substituir=True)
+
+        assert resultado["importadas"] == 1
+        assert resultado["duplicadas"] == 1
+        assert len(carregar_indice()) == 1
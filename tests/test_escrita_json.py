@@ -0,0 +1,118 @@
+"""
+Testes para a Gravação de JSON
+
+Valida a escrita atômica de salvar_json e o buffer de escrita adiada
+(agrupamento de salvamentos, visibilidade dos pendentes e contadores).
+"""
+
+import pytest
+import sys
+import json
+import os
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Diretório de dados temporário com cache e contadores limpos."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    helpers.zerar_estatisticas_escrita()
+    yield tmp_path
+    helpers.configurar_escrita_adiada(0)
+    helpers.configurar_escrita_adiada(None)
+    helpers.invalidar_cache_json()
+
+
+class TestEscritaAtomica:
+    """Testes da gravação via arquivo temporário + rename."""
+
+    def test_grava_sem_deixar_temporarios(self, data_dir):
+        helpers.salvar_json("dados.json", {"a": 1})
+
+        assert json.loads((data_dir / "dados.json").read_text(encoding="utf-8")) == {"a": 1}
+        assert [p.name for p in data_dir.iterdir()] == ["dados.json"]
+
+    def test_falha_preserva_original(self, data_dir):
+        """Um erro durante a serialização não deve truncar o arquivo."""
+        helpers.salvar_json("dados.json", {"a": 1})
+
+        with pytest.raises(TypeError):
+            helpers.salvar_json("dados.json", {"a": object()})
+
+        assert helpers.carregar_json("dados.json") == {"a": 1}
+        assert [p.name for p in data_dir.iterdir()] == ["dados.json"]
+
+    def test_preserva_permissoes(self, data_dir):
+        """O rename não deve trocar as permissões do arquivo pelas do temporário."""
+        caminho = data_dir / "dados.json"
+        helpers.salvar_json("dados.json", {"a": 1})
+        assert caminho.stat().st_mode & 0o777 == 0o666 & ~helpers._UMASK
+
+        os.chmod(caminho, 0o640)
+        helpers.salvar_json("dados.json", {"a": 2})
+
+        assert caminho.stat().st_mode & 0o777 == 0o640
+
+    def test_janela_padrao_do_config(self, data_dir):
+        """Sem configuração a gravação é imediata."""
+        helpers.salvar_json("dados.json", {"a": 1})
+
+        assert helpers.obter_estatisticas_escrita()["gravacoes"] == 1
+        assert helpers.obter_estatisticas_escrita()["adiadas"] == 0
+
+
+class TestEscritaAdiada:
+    """Testes do buffer de escrita adiada."""
+
+    def test_salvamentos_agrupados(self, data_dir):
+        """Vários salvamentos na janela viram uma única gravação."""
+        helpers.configurar_escrita_adiada(60)
+
+        for i in range(5):
+            helpers.salvar_json("dados.json", {"versao": i})
+
+        assert not (data_dir / "dados.json").exists()
+        assert helpers.carregar_json("dados.json") == {"versao": 4}
+
+        assert helpers.descarregar_escritas() == 1
+        stats = helpers.obter_estatisticas_escrita()
+        assert stats["gravacoes"] == 1
+        assert stats["evitadas"] == 4
+        assert stats["pendentes"] == 0
+        assert json.loads((data_dir / "dados.json").read_text(encoding="utf-8")) == {"versao": 4}
+
+    def test_pendente_isolado_do_chamador(self, data_dir):
+        """Alterar o dicionário depois de salvar não deve mudar o pendente."""
+        helpers.configurar_escrita_adiada(60)
+        dados = {"lista": [1]}
+
+        helpers.salvar_json("dados.json", dados)
+        dados["lista"].append(2)
+
+        assert helpers.carregar_json("dados.json") == {"lista": [1]}
+
+    def test_desativar_descarrega(self, data_dir):
+        """Desativar a janela grava o que estiver pendente."""
+        helpers.configurar_escrita_adiada(60)
+        helpers.salvar_json("dados.json", {"a": 1})
+
+        helpers.configurar_escrita_adiada(0)
+
+        assert (data_dir / "dados.json").exists()
+        assert helpers.obter_estatisticas_escrita()["pendentes"] == 0
+
+    def test_janela_do_config(self, data_dir):
+        """armazenamento.janela_escrita_segundos ativa o buffer."""
+        (data_dir / "config.json").write_text(
+            json.dumps({"armazenamento": {"janela_escrita_segundos": 60}}), encoding="utf-8"
+        )
+
+        helpers.salvar_json("dados.json", {"a": 1})
+
+        assert helpers.obter_estatisticas_escrita()["pendentes"] == 1
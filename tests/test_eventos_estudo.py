@@ -0,0 +1,210 @@
+"""
+Testes para o Log de Eventos do Estudo
+
+Valida a aplicação de eventos, o replay a partir do snapshot,
+a compactação periódica e os agregados derivados do histórico.
+"""
+
+import pytest
+import sys
+import json
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from utils import eventos_estudo as eventos
+from utils import armazenamento_sqlite as db
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, estudo_com_dados):
+    """Diretório de dados temporário com o backend JSON."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    (tmp_path / "config.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "estudo.json").write_text(
+        json.dumps(estudo_com_dados, ensure_ascii=False), encoding="utf-8"
+    )
+    yield tmp_path
+    helpers.invalidar_cache_json()
+
+
+def _revisao(tema="Tuberculose", revisao="r2", data="2026-02-10", questoes=20, acertos=15):
+    return ("revisao_registrada", {
+        "tema": tema, "revisao": revisao, "data": data,
+        "questoes": questoes, "acertos": acertos
+    })
+
+
+class TestRegistroEventos:
+    """Testes de gravação e replay."""
+
+    def test_evento_aplicado_sem_reescrever_snapshot(self, data_dir):
+        """Registrar deve apenas anexar ao log; o load reaplica o evento."""
+        snapshot = (data_dir / "estudo.json").read_bytes()
+        estudo = helpers.carregar_estudo()
+
+        eventos.registrar_eventos(estudo, [_revisao()])
+
+        assert (data_dir / "estudo.json").read_bytes() == snapshot
+        recarregado = helpers.carregar_estudo()
+        assert recarregado["registro_temas"]["Tuberculose"]["r2"]["acertos"] == 15
+        assert recarregado["registro_temas"] == estudo["registro_temas"]
+        assert recarregado["estatisticas_gerais"] == estudo["estatisticas_gerais"]
+
+    def test_estatisticas_e_extras(self, data_dir, estudo_com_dados):
+        """Revisões extras vão para a lista e somam às estatísticas."""
+        estudo = helpers.carregar_estudo()
+        total = estudo_com_dados["estatisticas_gerais"]["total_questoes_feitas"]
+
+        eventos.registrar_eventos(estudo, [
+            _revisao(revisao="extra", questoes=10, acertos=8),
+            _revisao(revisao="extra", questoes=5, acertos=5)
+        ])
+
+        recarregado = helpers.carregar_estudo()
+        assert len(recarregado["registro_temas"]["Tuberculose"]["extras"]) == 2
+        assert recarregado["estatisticas_gerais"]["total_questoes_feitas"] == total + 15
+
+    def test_tema_id_do_evento_gravado_no_registro(self, data_dir):
+        estudo = helpers.carregar_estudo()
+
+        eventos.registrar_eventos(estudo, [
+            ("teoria_registrada", {"tema": "Asma", "grande_area": "Pediatria", "tema_id": 12, "data": "2026-02-01"}),
+            _revisao(tema="Asma", revisao="r1")
+        ])
+
+        assert helpers.carregar_estudo()["registro_temas"]["Asma"]["tema_id"] == 12
+
+    def test_questao_marcada(self, data_dir):
+        """Marcar e desmarcar geram eventos reaplicáveis."""
+        estudo = helpers.carregar_estudo()
+
+        eventos.registrar_evento(estudo, "questao_marcada", questao_id="T002", marcada=True)
+        eventos.registrar_evento(estudo, "questao_marcada", questao_id="T001", marcada=False)
+
+        assert helpers.carregar_estudo()["questoes_marcadas_importantes"] == ["T003", "T002"]
+
+    def test_tipo_desconhecido(self, data_dir):
+        """Tipos fora de TIPOS_EVENTO não devem ser gravados."""
+        with pytest.raises(ValueError):
+            eventos.registrar_evento({}, "tema_apagado", tema="X")
+        assert not eventos.caminho_eventos().exists()
+
+    def test_linha_incompleta_ignorada(self, data_dir):
+        """Uma escrita interrompida no fim do log não deve quebrar o load."""
+        estudo = helpers.carregar_estudo()
+        eventos.registrar_eventos(estudo, [_revisao()])
+        with open(eventos.caminho_eventos(), "a", encoding="utf-8") as f:
+            f.write('{"seq": 2, "tipo": "revisao_reg')
+
+        recarregado = helpers.carregar_estudo()
+        assert recarregado["seq_eventos"] == 1
+
+        # O próximo evento descarta o trecho incompleto
+        eventos._ESTADO_LOG.clear()
+        eventos.registrar_eventos(recarregado, [_revisao(revisao="r3")])
+        assert [e["seq"] for e, _ in eventos.ler_eventos()] == [1, 2]
+
+
+class TestCompactacao:
+    """Testes do snapshot e da compactação."""
+
+    def test_compactacao_periodica(self, data_dir, monkeypatch):
+        """Após LIMITE_COMPACTACAO eventos o snapshot deve ser regravado."""
+        monkeypatch.setattr(eventos, "LIMITE_COMPACTACAO", 3)
+        estudo = helpers.carregar_estudo()
+
+        for i in range(3):
+            eventos.registrar_eventos(estudo, [_revisao(revisao="extra", questoes=i)])
+
+        salvo = json.loads((data_dir / "estudo.json").read_text(encoding="utf-8"))
+        assert salvo["seq_eventos"] == 3
+        assert salvo["offset_eventos"] == eventos.caminho_eventos().stat().st_size
+        assert len(salvo["registro_temas"]["Tuberculose"]["extras"]) == 3
+        # O histórico não é truncado
+        assert len(list(eventos.ler_eventos())) == 3
+
+    def test_snapshot_nao_reaplica_eventos(self, data_dir, estudo_com_dados):
+        """Um load após compactar não deve contar eventos duas vezes."""
+        estudo = helpers.carregar_estudo()
+        eventos.registrar_eventos(estudo, [_revisao(revisao="extra")])
+        eventos.compactar()
+        helpers.invalidar_cache_json()
+
+        recarregado = helpers.carregar_estudo()
+        total = estudo_com_dados["estatisticas_gerais"]["total_questoes_feitas"]
+        assert recarregado["estatisticas_gerais"]["total_questoes_feitas"] == total + 20
+        assert len(recarregado["registro_temas"]["Tuberculose"]["extras"]) == 1
+
+    def test_salvar_estudo_novo_marca_snapshot(self, data_dir):
+        """Um estudo gravado do zero não recebe o histórico antigo."""
+        eventos.registrar_eventos(helpers.carregar_estudo(), [_revisao()])
+
+        helpers.salvar_estudo({"registro_temas": {}, "estatisticas_gerais": {}})
+
+        assert helpers.carregar_estudo()["registro_temas"] == {}
+
+
+class TestAgregados:
+    """Testes dos agregados derivados do log."""
+
+    def test_agregar_por_semana_e_mes(self, data_dir):
+        estudo = helpers.carregar_estudo()
+        eventos.registrar_eventos(estudo, [
+            ("teoria_registrada", {"tema": "Asma", "grande_area": "Clinica Medica", "data": "2026-02-09"}),
+            _revisao(data="2026-02-10", questoes=20, acertos=15),
+            _revisao(tema="Asma", revisao="r1", data="2026-02-12", questoes=10, acertos=6),
+            _revisao(revisao="r3", data="2026-03-02", questoes=30, acertos=25)
+        ])
+
+        por_semana = eventos.agregar_eventos("semana")
+        assert por_semana["2026-W07"]["questoes"] == 30
+        assert por_semana["2026-W07"]["teorias"] == 1
+        assert por_semana["2026-W10"]["revisoes"] == 1
+
+        por_mes = eventos.agregar_eventos("mes")
+        assert por_mes["2026-02"]["acertos"] == 21
+        assert por_mes["2026-03"]["questoes"] == 30
+
+    def test_le_apenas_eventos_novos(self, data_dir, mocker):
+        """Chamadas seguintes partem do offset já somado."""
+        estudo = helpers.carregar_estudo()
+        eventos.registrar_eventos(estudo, [_revisao(data="2026-02-10", questoes=20, acertos=15)])
+        assert eventos.agregar_eventos("dia")["2026-02-10"]["questoes"] == 20
+
+        tamanho = eventos.caminho_eventos().stat().st_size
+        eventos.registrar_eventos(estudo, [_revisao(data="2026-02-10", questoes=5, acertos=5)])
+        leitura = mocker.spy(eventos, "ler_eventos")
+
+        assert eventos.agregar_eventos("dia")["2026-02-10"]["questoes"] == 25
+        assert eventos.agregar_eventos("mes")["2026-02"]["revisoes"] == 2
+        assert leitura.call_args_list[0].args == (tamanho,)
+
+    def test_periodo_invalido(self, data_dir):
+        with pytest.raises(ValueError):
+            eventos.agregar_eventos("ano")
+
+
+class TestEventosSqlite:
+    """No SQLite o log é histórico e o banco recebe as linhas afetadas."""
+
+    def test_evento_persistido_no_banco(self, data_dir):
+        (data_dir / "config.json").write_text(
+            json.dumps({"armazenamento": {"estudo": "sqlite"}}), encoding="utf-8"
+        )
+        helpers.invalidar_cache_json()
+        try:
+            estudo = helpers.carregar_estudo()
+            eventos.registrar_eventos(estudo, [
+                ("teoria_registrada", {"tema": "Asma", "grande_area": "Clinica Medica", "data": "2026-02-09"}),
+                _revisao(tema="Asma", revisao="r1", questoes=10, acertos=7)
+            ])
+
+            recarregado = db.carregar_estudo_sqlite()
+            assert recarregado["registro_temas"]["Asma"]["r1"]["acertos"] == 7
+            assert len(list(eventos.ler_eventos())) == 2
+        finally:
+            db.fechar_conexoes()
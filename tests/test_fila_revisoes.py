@@ -0,0 +1,165 @@
+"""
+Testes para a Fila de Revisões Pendentes
+
+Valida a ordem do heap, a atualização incremental por tema (inclusive
+pelas gravações de eventos), as consultas top-k e "vence em até N dias"
+e a equivalência com o relatório de pendências.
+"""
+
+import pytest
+import sys
+import json
+from pathlib import Path
+from datetime import datetime
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.contexto import ContextoDados
+from core.calculadora_revisoes import CalculadoraRevisoes
+from core.fila_revisoes import FilaRevisoes
+from utils import helpers
+from utils.eventos_estudo import registrar_evento
+
+
+@pytest.fixture
+def calc(config_teste, pesos_teste):
+    return CalculadoraRevisoes(ContextoDados(
+        config=config_teste, pesos=pesos_teste, agora=datetime(2026, 3, 1, 15, 0)
+    ))
+
+
+@pytest.fixture
+def registro():
+    return {
+        "Diabetes": {"data_teoria": "2026-02-01"},
+        "Hipertensão": {"data_teoria": "2026-01-10", "r1": {"data": "2026-02-10"}},
+        "Asma": {"data_teoria": "2026-02-20"},
+        "Sem teoria": {},
+        "Completo": {
+            "data_teoria": "2025-10-01",
+            "r1": {"data": "2025-11-01"},
+            "r2": {"data": "2025-12-01"},
+            "r3": {"data": "2026-01-01"}
+        }
+    }
+
+
+class TestFila:
+    """Testes da estrutura do heap."""
+
+    def test_ordem_e_desempate(self):
+        fila = FilaRevisoes(datetime(2027, 11, 15))
+        fila.atualizar("b", 1, 20)
+        fila.atualizar("a", 2, 10)
+        fila.atualizar("c", 1, 20)
+
+        assert list(fila.menores()) == [("a", 2, 10), ("b", 1, 20), ("c", 1, 20)]
+        assert list(fila.menores(limite=2)) == [("a", 2, 10), ("b", 1, 20)]
+        assert list(fila.menores(ate_dia=19)) == [("a", 2, 10)]
+
+    def test_entradas_substituidas_ignoradas(self):
+        fila = FilaRevisoes(datetime(2027, 11, 15))
+        for dia in range(200):
+            fila.atualizar("tema", 1, 500 - dia)
+        fila.atualizar("outro", 3, 400)
+        fila.atualizar("sai", 1, 1)
+        fila.atualizar("sai", 0, 0)
+
+        assert len(fila) == 2
+        assert list(fila.menores()) == [("tema", 1, 301), ("outro", 3, 400)]
+        assert len(fila._heap) < 200   # compactado
+
+
+class TestSincronizacao:
+    """Testes da fila alimentada pelo registro de estudo."""
+
+    def test_apenas_temas_alterados_recalculados(self, calc, registro, mocker):
+        fila = FilaRevisoes(calc.data_prova)
+        fila.sincronizar(calc, registro)
+        assert [c for c, _, _ in fila.menores()] == ["Diabetes", "Hipertensão", "Asma"]
+
+        espiao = mocker.spy(calc, "calcular_proximas_acoes_lote")
+        fila.sincronizar(calc, registro)
+        espiao.assert_not_called()
+
+        registro["Diabetes"] = {**registro["Diabetes"], "r1": {"data": "2026-03-01"}}
+        del registro["Asma"]
+        fila.sincronizar(calc, registro)
+
+        assert [args[0] for args, _ in espiao.call_args_list] == [[registro["Diabetes"]]]
+        assert [(c, r) for c, r, _ in fila.menores()] == [("Hipertensão", 2), ("Diabetes", 2)]
+
+    def test_equivale_ao_relatorio_completo(self, calc, registro):
+        estudo = {"registro_temas": registro}
+        completo = calc.gerar_relatorio_pendencias(estudo)
+
+        assert [p["tema"] for p in completo] == ["Diabetes", "Hipertensão", "Asma"]
+        assert calc.gerar_relatorio_pendencias(estudo, limite=2) == completo[:2]
+        assert calc.gerar_relatorio_pendencias(estudo, apenas_proximas=True) == [
+            p for p in completo if p["status"] != "pendente"
+        ]
+
+    def test_vence_em_ate_n_dias(self, calc, registro):
+        estudo = {"registro_temas": registro}
+        completo = calc.gerar_relatorio_pendencias(estudo)
+        hoje = calc.contexto.agora
+
+        for dias in (0, 7, 30, 60):
+            esperado = [
+                p for p in completo
+                if (datetime.strptime(p["data_sugerida"], "%Y-%m-%d") - hoje).days <= dias
+            ]
+            assert calc.gerar_relatorio_pendencias(estudo, dentro_de_dias=dias) == esperado
+
+    def test_mudanca_na_data_da_prova_refaz_a_fila(self, calc, registro, config_teste):
+        estudo = {"registro_temas": registro}
+        antes = calc.gerar_relatorio_pendencias(estudo)
+
+        config = {**config_teste, "usuario": {**config_teste["usuario"], "data_prova_estimada": "2026-05-01"}}
+        outra = CalculadoraRevisoes(ContextoDados(config=config, pesos=calc.pesos, agora=calc.contexto.agora))
+        depois = outra.gerar_relatorio_pendencias(estudo)
+
+        assert [p["data_sugerida"] for p in depois] != [p["data_sugerida"] for p in antes]
+        assert calc.gerar_relatorio_pendencias(estudo) == antes
+
+
+class TestGravacoes:
+    """Testes da fila mantida pelas gravações do estudo."""
+
+    @pytest.fixture
+    def data_dir(self, tmp_path, monkeypatch, registro):
+        monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+        helpers.invalidar_cache_json()
+        (tmp_path / "config.json").write_text("{}", encoding="utf-8")
+        (tmp_path / "estudo.json").write_text(
+            json.dumps({"registro_temas": registro}, ensure_ascii=False), encoding="utf-8"
+        )
+        yield tmp_path
+        helpers.invalidar_cache_json()
+
+    def test_evento_atualiza_sem_percorrer_registro(self, calc, data_dir, mocker):
+        estudo = helpers.carregar_estudo()
+        registrar_evento(estudo, "teoria_registrada", tema="Novo", grande_area="Pediatria", data="2026-01-05")
+        assert calc.gerar_relatorio_pendencias(estudo)[0]["tema"] == "Novo"
+
+        varredura = mocker.spy(FilaRevisoes, "sincronizar")
+        registrar_evento(
+            estudo, "revisao_registrada", tema="Novo", revisao="r1",
+            data="2026-02-28", questoes=10, acertos=8
+        )
+        pendencias = calc.gerar_relatorio_pendencias(estudo)
+
+        varredura.assert_not_called()
+        assert pendencias == calc.gerar_relatorio_pendencias({"registro_temas": estudo["registro_temas"]})
+        assert [p["acao"] for p in pendencias if p["tema"] == "Novo"] == ["fazer_r2"]
+
+    def test_estudo_regravado_refaz_a_fila(self, calc, data_dir):
+        estudo = helpers.carregar_estudo()
+        registrar_evento(estudo, "teoria_registrada", tema="Novo", grande_area="Pediatria", data="2026-01-05")
+        calc.gerar_relatorio_pendencias(estudo)
+
+        del estudo["registro_temas"]["Novo"]
+        helpers.salvar_estudo(estudo)
+
+        assert "Novo" not in [p["tema"] for p in calc.gerar_relatorio_pendencias(estudo)]
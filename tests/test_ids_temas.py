@@ -0,0 +1,124 @@
+"""
+Testes para os IDs de Temas
+
+Valida a gravação dos IDs em temas.json, a associação do estudo, das
+questões e dos pesos aos IDs e a migração dos dados existentes.
+"""
+
+import pytest
+import sys
+import json
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from core.catalogo_temas import CatalogoTemas
+from core.classificador_yield import ClassificadorYield
+from core.ids_temas import (
+    atribuir_ids_temas, vincular_registro, vincular_questoes,
+    MapaPesos, migrar_ids_temas
+)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, temas_teste, estudo_com_dados, questoes_teste):
+    """Diretório de dados temporário, ainda sem IDs de temas."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    for nome, dados in (
+        ("config.json", {}),
+        ("temas.json", temas_teste),
+        ("estudo.json", estudo_com_dados),
+        ("questoes.json", questoes_teste)
+    ):
+        (tmp_path / nome).write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+    yield tmp_path
+    helpers.invalidar_cache_json()
+
+
+class TestAssociacao:
+    """Testes da associação das fontes de dados aos IDs."""
+
+    def test_ids_gravados_em_temas(self, temas_teste):
+        temas_teste["grandes_areas"]["Pediatria"]["temas"][0]["id"] = 50
+
+        assert atribuir_ids_temas(temas_teste) == 8
+        ids = [t["id"] for a in temas_teste["grandes_areas"].values() for t in a["temas"]]
+        assert ids == [51, 52, 53, 54, 55, 50, 56, 57, 58]
+        assert atribuir_ids_temas(temas_teste) == 0
+
+    def test_vincular_registro(self, temas_teste):
+        catalogo = CatalogoTemas(temas_teste)
+        registro = {
+            "Tuberculose": {"r1": {}},
+            "hérnias": {"grande_area": "Cirurgia Geral"},
+            "Tema livre": {"tema_id": 999},
+            "Diabetes": {"tema_id": catalogo.resolver("HIV e AIDS")["id"]}
+        }
+
+        assert vincular_registro(registro, catalogo) == 3
+        assert catalogo.obter(registro["Tuberculose"]["tema_id"])["nome"] == "Tuberculose"
+        assert catalogo.obter(registro["hérnias"]["tema_id"])["nome"] == "Hérnias"
+        assert "tema_id" not in registro["Tema livre"]
+        # ID válido já gravado é mantido
+        assert catalogo.obter(registro["Diabetes"]["tema_id"])["nome"] == "HIV e AIDS"
+        assert vincular_registro(registro, catalogo) == 0
+
+    def test_vincular_questoes(self, temas_teste, questoes_teste):
+        catalogo = CatalogoTemas(temas_teste)
+        questoes = questoes_teste["questoes"] + [{"id": "X", "tema": "Sem catálogo"}, {"id": "Y"}]
+
+        assert vincular_questoes(questoes, catalogo) == 5
+
+        assert [catalogo.obter(q["tema_id"])["nome"] for q in questoes[:5]] == [q["tema"] for q in questoes[:5]]
+        assert "tema_id" not in questoes[5] and "tema_id" not in questoes[6]
+
+    def test_mapa_de_pesos(self, temas_teste, pesos_teste):
+        catalogo = CatalogoTemas(temas_teste)
+        classificador = ClassificadorYield(pesos_teste)
+        mapa = MapaPesos(catalogo, classificador)
+
+        for tema in catalogo:
+            assert mapa.classificacao[tema["id"]] == classificador.classificar(tema["nome"], tema["grande_area"])
+
+        relacionados = mapa.ids_relacionados(["Tuberculose Pulmonar", "hiv"])
+        assert {catalogo.obter(i)["nome"] for i in relacionados} == {"Tuberculose", "HIV e AIDS"}
+
+
+class TestMigracao:
+    """Testes da migração dos arquivos existentes."""
+
+    def test_migra_uma_vez(self, data_dir, estudo_com_dados):
+        resultado = migrar_ids_temas()
+
+        assert resultado["temas"] == 9
+        assert resultado["estudo"] > 0
+        temas = json.loads((data_dir / "temas.json").read_text(encoding="utf-8"))
+        assert all("id" in t for a in temas["grandes_areas"].values() for t in a["temas"])
+        registro = helpers.carregar_estudo()["registro_temas"]
+        assert registro.keys() == estudo_com_dados["registro_temas"].keys()
+        assert "tema_id" in registro["Tuberculose"]
+
+        assert migrar_ids_temas() == {"temas": 0, "estudo": 0, "questoes": 0}
+
+    def test_migracao_marcada_em_config(self, data_dir, mocker):
+        from core import ids_temas
+
+        migrar_ids_temas()
+        config = json.loads((data_dir / "config.json").read_text(encoding="utf-8"))
+        assert config["migracoes"] == {"ids_temas": True}
+
+        # Outro processo: a marca dispensa reler os dados
+        ids_temas._MIGRADOS.clear()
+        carga = mocker.spy(helpers, "carregar_estudo")
+        assert migrar_ids_temas() == {"temas": 0, "estudo": 0, "questoes": 0}
+        carga.assert_not_called()
+
+    def test_contexto_vincula_estudo_ao_carregar(self, data_dir):
+        from core.contexto import ContextoDados
+
+        registro = ContextoDados().estudo["registro_temas"]
+
+        assert "tema_id" in registro["Tuberculose"]
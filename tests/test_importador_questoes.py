@@ -0,0 +1,176 @@
+"""
+Testes para o Importador de Questões
+
+Valida a leitura em streaming do array de questões, a normalização de
+registros e a importação com erros por registro.
+"""
+
+import pytest
+import sys
+import io
+import json
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from utils import importador_questoes as importador
+from utils.banco_colunar import carregar_banco
+
+
+def _questao(id_, gabarito="A", **extra):
+    return {
+        "id": id_,
+        "enunciado": f"Enunciado {id_}",
+        "alternativas": ["(A) um", "(B) dois", "(C) três"],
+        "gabarito": gabarito,
+        "tema": "Asma",
+        **extra
+    }
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch, questoes_teste):
+    """Diretório de dados temporário com o banco de questões de teste."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    (tmp_path / "questoes.json").write_text(
+        json.dumps(questoes_teste, ensure_ascii=False), encoding="utf-8"
+    )
+    yield tmp_path
+    helpers.invalidar_cache_json()
+
+
+class TestLeituraStreaming:
+    """Testes do leitor incremental."""
+
+    def test_equivale_ao_json_load_com_blocos_pequenos(self):
+        """Registros cortados entre blocos devem ser remontados."""
+        dados = {
+            "versao": 3,
+            "meta": {"fonte": "curso [x]", "lista": [1, 2]},
+            "questoes": [
+                {"id": 12345, "enunciado": "Aspas \" e {chaves} ]", "nota": 1.25e3},
+                {"id": "Q2", "alternativas": ["ção", "ü"], "ok": True, "nulo": None},
+                987654321
+            ],
+            "total": 3
+        }
+        texto = json.dumps(dados, ensure_ascii=False, indent=2)
+
+        for bloco in (1, 3, 7, 64):
+            itens = list(importador.iterar_questoes(io.StringIO(texto), tamanho_bloco=bloco))
+            assert itens == dados["questoes"]
+
+    def test_array_na_raiz_e_vazio(self):
+        assert list(importador.iterar_questoes(io.StringIO('[{"id": 1}]'))) == [{"id": 1}]
+        assert list(importador.iterar_questoes(io.StringIO('{"questoes": []}'))) == []
+
+    def test_campo_ausente(self):
+        with pytest.raises(ValueError, match="questoes"):
+            list(importador.iterar_questoes(io.StringIO('{"itens": [1, 2]}')))
+
+    def test_json_truncado(self):
+        with pytest.raises(ValueError, match="JSON inválido"):
+            list(importador.iterar_questoes(io.StringIO('{"questoes": [{"id": 1}, {"id"')))
+
+
+class TestNormalizacao:
+    """Testes de validação e normalização de um registro."""
+
+    def test_normaliza_textos_e_gabarito(self):
+        q = importador.normalizar_questao({
+            "id": " Q1 ",
+            "enunciado": "  Paciente...  ",
+            "alternativas": [" A) x", "B) y "],
+            "gabarito": "(b)",
+            "tema": " Asma ",
+            "banca": "  "
+        })
+
+        assert q == {
+            "id": "Q1",
+            "enunciado": "Paciente...",
+            "alternativas": ["A) x", "B) y"],
+            "gabarito": "B",
+            "tema": "Asma"
+        }
+
+    @pytest.mark.parametrize("registro, motivo", [
+        ("texto", "objeto"),
+        ({"enunciado": "", "alternativas": ["a", "b"], "gabarito": "A"}, "enunciado"),
+        ({"enunciado": "x", "alternativas": "a, b", "gabarito": "A"}, "lista"),
+        ({"enunciado": "x", "alternativas": ["a"], "gabarito": "A"}, "duas alternativas"),
+        ({"enunciado": "x", "alternativas": ["a", "b"], "gabarito": "C"}, "fora das alternativas"),
+        ({"enunciado": "x", "alternativas": ["a", "b"], "gabarito": "AB"}, "gabarito"),
+        ({"id": "", "enunciado": "x", "alternativas": ["a", "b"], "gabarito": "A"}, "id"),
+    ])
+    def test_registros_invalidos(self, registro, motivo):
+        with pytest.raises(ValueError, match=motivo):
+            importador.normalizar_questao(registro)
+
+
+class TestImportacao:
+    """Testes da importação para o questoes.json."""
+
+    def _arquivo(self, questoes):
+        return io.BytesIO(json.dumps({"questoes": questoes}, ensure_ascii=False).encode("utf-8"))
+
+    def test_adicionar_preserva_existentes(self, data_dir, questoes_teste):
+        existentes = len(questoes_teste["questoes"])
+
+        resultado = importador.importar_questoes(self._arquivo([_questao("N1"), _questao("N2")]))
+
+        assert resultado["existentes"] == existentes
+        assert resultado["importadas"] == 2
+        salvo = json.loads((data_dir / "questoes.json").read_text(encoding="utf-8"))
+        assert salvo["total"] == existentes + 2
+        assert salvo["questoes"][:existentes] == questoes_teste["questoes"]
+        assert len(carregar_banco()) == existentes + 2
+
+    def test_substituir_e_erros_por_registro(self, data_dir):
+        """Registros inválidos são reportados sem interromper a importação."""
+        resultado = importador.importar_questoes(
+            self._arquivo([_questao("N1"), _questao("N2", gabarito="Z"), "lixo", _questao("N3")]),
+            substituir=True
+        )
+
+        assert resultado["importadas"] == 2
+        assert resultado["total_erros"] == 2
+        assert [(e["indice"], e["id"]) for e in resultado["erros"]] == [(1, "N2"), (2, None)]
+        banco = carregar_banco()
+        assert [banco.metadados(i)["id"] for i in range(len(banco))] == ["N1", "N3"]
+
+    def test_erro_de_sintaxe_preserva_banco(self, data_dir):
+        original = (data_dir / "questoes.json").read_bytes()
+
+        with pytest.raises(ValueError):
+            importador.importar_questoes(io.BytesIO(b'{"questoes": [{"id": 1,'), substituir=True)
+
+        assert (data_dir / "questoes.json").read_bytes() == original
+        assert [p.name for p in data_dir.iterdir()] == ["questoes.json"]
+
+    def test_vincular_tema_em_todas_as_questoes(self, data_dir, questoes_teste):
+        vistos = []
+
+        def vincular(q):
+            q["tema_id"] = 7
+            vistos.append(q["id"])
+
+        importador.importar_questoes(self._arquivo([_questao("N1")]), vincular_tema=vincular)
+
+        salvo = json.loads((data_dir / "questoes.json").read_text(encoding="utf-8"))
+        assert vistos == [q["id"] for q in questoes_teste["questoes"]] + ["N1"]
+        assert all(q["tema_id"] == 7 for q in salvo["questoes"])
+
+    def test_progresso(self, data_dir, monkeypatch):
+        monkeypatch.setattr(importador, "INTERVALO_PROGRESSO", 1)
+        chamadas = []
+        arquivo = self._arquivo([_questao(f"N{i}") for i in range(5)])
+
+        importador.importar_questoes(arquivo, progresso=lambda lidos, total: chamadas.append((lidos, total)))
+
+        total = len(arquivo.getvalue())
+        assert chamadas[-1] == (total, total)
+        assert all(lidos <= total for lidos, _ in chamadas)
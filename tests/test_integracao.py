@@ -313,9 +313,9 @@ class TestFluxoRegistroQuestoes:
             }
         }
         
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_atualizado):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_atualizado):
             
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
@@ -21,9 +21,9 @@ class TestSistemaMetricas:
     
     def test_nota_estimada_sem_dados(self, config_teste, estudo_vazio, pesos_teste, temas_teste):
         """Nota estimada deve usar diagnóstico inicial quando não há dados."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_vazio), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_vazio), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -35,9 +35,9 @@ class TestSistemaMetricas:
     
     def test_nota_estimada_com_dados(self, config_teste, estudo_com_dados, pesos_teste, temas_teste):
         """Nota estimada deve ser calculada corretamente com dados."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_com_dados), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_com_dados), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -47,15 +47,52 @@ class TestSistemaMetricas:
             assert 0 <= resultado["nota_estimada"] <= 100
             assert "confianca" in resultado
 
+    def test_area_do_tema_vem_do_catalogo(self, config_teste, pesos_teste, temas_teste):
+        """Temas do catálogo usam a área de temas.json; os demais, palavras-chave."""
+        from core.contexto import ContextoDados
+        from core.metricas import SistemaMetricas
+        metricas = SistemaMetricas(ContextoDados(
+            config=config_teste, pesos=pesos_teste, temas=temas_teste, estudo={}
+        ))
+        
+        # "Sala de Parto" contém a palavra-chave "parto" (Ginecologia)
+        assert metricas._identificar_area("Sala de Parto") == "Pediatria"
+        assert metricas._identificar_area("Parto Cesáreo") == "Ginecologia e Obstetricia"
+
+    def test_nota_por_area_usa_metadados_do_registro(self, config_teste, pesos_teste, temas_teste):
+        """tema_id e grande_area do registro valem antes das palavras-chave."""
+        from core.contexto import ContextoDados
+        from core.catalogo_temas import obter_catalogo_temas
+        from core.metricas import SistemaMetricas
+        sala_de_parto = obter_catalogo_temas(temas_teste).resolver("Sala de Parto")["id"]
+        revisao = {"r1": {"questoes": 10, "acertos": 8}}
+        registro = {
+            "Atendimento ao RN": {"tema_id": sala_de_parto, **revisao},
+            "Violência obstétrica": {"grande_area": "Saude Coletiva", **revisao},
+            "Trauma raquimedular": dict(revisao)
+        }
+        metricas = SistemaMetricas(ContextoDados(
+            config=config_teste, pesos=pesos_teste, temas=temas_teste,
+            estudo={"registro_temas": registro}
+        ))
+        
+        assert metricas.mapear_areas(registro) == {
+            "Atendimento ao RN": "Pediatria",
+            "Violência obstétrica": "Saude Coletiva",
+            "Trauma raquimedular": "Cirurgia Geral"
+        }
+        detalhes = metricas.calcular_nota_estimada()["detalhes"]
+        assert set(detalhes) == {"Pediatria", "Saude Coletiva", "Cirurgia Geral"}
+
 
 class TestTaxaAcerto:
     """Testes para cálculo de taxa de acerto via estatísticas."""
     
     def test_taxa_acerto_geral_via_estatisticas(self, config_teste, estudo_com_dados, pesos_teste, temas_teste):
         """Taxa de acerto geral via gerar_estatisticas_completas."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_com_dados), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_com_dados), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -80,9 +117,9 @@ class TestTaxaAcerto:
             }
         }
         
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_sem_stats), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_sem_stats), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -98,9 +135,9 @@ class TestEstatisticasCompletas:
     @freeze_time("2026-03-15")
     def test_estatisticas_completas_estrutura(self, config_teste, estudo_com_dados, pesos_teste, temas_teste):
         """Estatísticas completas devem ter estrutura correta."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_com_dados), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_com_dados), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -114,9 +151,9 @@ class TestEstatisticasCompletas:
     @freeze_time("2026-03-15")
     def test_questoes_total(self, config_teste, estudo_com_dados, pesos_teste, temas_teste):
         """Total de questões deve corresponder aos dados de estatisticas_gerais."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_com_dados), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_com_dados), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -132,9 +169,9 @@ class TestMediaSemanal:
     @freeze_time("2026-03-15")
     def test_media_semanal_calculo(self, config_teste, estudo_com_dados, pesos_teste, temas_teste):
         """Média semanal deve ser calculada corretamente."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_com_dados), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_com_dados), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -149,9 +186,9 @@ class TestMediaSemanal:
     @freeze_time("2027-11-01")  # Próximo da prova
     def test_media_semanal_proximo_prova(self, config_teste, estudo_vazio, pesos_teste, temas_teste):
         """Próximo da prova com poucas questões, média necessária deve ser alta."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_vazio), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_vazio), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -166,9 +203,9 @@ class TestSetinha:
     
     def test_setinha_acima_meta(self, config_teste, pesos_teste, temas_teste, estudo_vazio):
         """Setinha deve indicar 'acima' quando performance supera meta."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_vazio), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_vazio), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -180,9 +217,9 @@ class TestSetinha:
     
     def test_setinha_abaixo_meta(self, config_teste, pesos_teste, temas_teste, estudo_vazio):
         """Setinha deve indicar 'abaixo' quando performance está abaixo da meta."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_vazio), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_vazio), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -194,9 +231,9 @@ class TestSetinha:
     
     def test_setinha_estrutura(self, config_teste, pesos_teste, temas_teste, estudo_vazio):
         """Setinha deve retornar estrutura completa."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_vazio), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_vazio), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
@@ -214,9 +251,9 @@ class TestCorPerformance:
     
     def test_cor_performance_baixa(self, config_teste, pesos_teste, temas_teste, estudo_vazio):
         """Performance baixa deve ter cor de índice baixo."""
-        with patch('core.metricas.carregar_config', return_value=config_teste), \
-             patch('core.metricas.carregar_estudo', return_value=estudo_vazio), \
-             patch('core.metricas.carregar_pesos', return_value=pesos_teste):
+        with patch('utils.helpers.carregar_config', return_value=config_teste), \
+             patch('utils.helpers.carregar_estudo', return_value=estudo_vazio), \
+             patch('utils.helpers.carregar_pesos', return_value=pesos_teste):
             from core.metricas import SistemaMetricas
             metricas = SistemaMetricas()
             
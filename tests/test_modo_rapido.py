@@ -0,0 +1,77 @@
+"""
+Testes para o Modo Rápido
+
+Valida o lote enviado ao componente e a aplicação dos envios em lote
+(correção refeita no servidor, envios repetidos sem efeito).
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.modo_rapido import (
+    letra_alternativa, preparar_lote, mesclar_respostas, PASTA_COMPONENTE
+)
+
+
+@pytest.fixture
+def lote(questoes_teste):
+    """Lote das três primeiras questões de teste."""
+    return preparar_lote(questoes_teste["questoes"][:3])
+
+
+class TestLote:
+    """Testes do lote enviado ao componente."""
+
+    def test_letras_das_alternativas(self):
+        assert letra_alternativa("(A) Opção") == "A"
+        assert letra_alternativa("b) opção") == "B"
+        assert letra_alternativa("C. Opção") == "C"
+        assert letra_alternativa("") == ""
+
+    def test_campos_do_lote(self, lote, questoes_teste):
+        primeira = questoes_teste["questoes"][0]
+
+        assert lote[0]["id"] == primeira["id"]
+        assert lote[0]["gabarito"] == primeira["gabarito"].upper()
+        assert [a["letra"] for a in lote[0]["alternativas"]] == ["A", "B", "C", "D"]
+        assert "grande_area" not in lote[0]
+
+    def test_componente_estatico_presente(self):
+        assert (PASTA_COMPONENTE / "index.html").exists()
+
+
+class TestMesclarRespostas:
+    """Testes da aplicação dos envios do componente."""
+
+    def test_corrige_no_servidor(self, lote):
+        respostas = {}
+        gabarito = lote[1]["gabarito"]
+        errada = next(a["letra"] for a in lote[1]["alternativas"] if a["letra"] != gabarito)
+
+        alteradas = mesclar_respostas(respostas, {"0": lote[0]["gabarito"].lower(), "1": errada}, lote)
+
+        assert alteradas == 2
+        assert respostas == {
+            0: {"resposta": lote[0]["gabarito"], "correta": True},
+            1: {"resposta": errada, "correta": False}
+        }
+
+    def test_envio_repetido_nao_altera(self, lote):
+        respostas = {}
+        envio = {"0": "A", "2": "B"}
+        mesclar_respostas(respostas, envio, lote)
+
+        assert mesclar_respostas(respostas, envio, lote) == 0
+        assert len(respostas) == 2
+
+    def test_ignora_posicoes_e_letras_invalidas(self, lote):
+        respostas = {}
+
+        alteradas = mesclar_respostas(respostas, {"9": "A", "x": "A", "0": "Z", "-1": "A"}, lote)
+
+        assert alteradas == 0
+        assert respostas == {}
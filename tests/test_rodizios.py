@@ -0,0 +1,107 @@
+"""
+Testes para o Índice de Rodízios
+
+Valida as buscas por dia, intervalo e semana, o suporte a qualquer
+número de anos e o reaproveitamento do índice entre chamadas.
+"""
+
+import pytest
+import sys
+from pathlib import Path
+from datetime import date, datetime
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import rodizios
+from utils.helpers import congelar, obter_rodizio_atual
+from utils.rodizios import IndiceRodizios, obter_indice_rodizios
+
+
+def _rodizio(nome, inicio, fim):
+    return {"rodizio": nome, "inicio": inicio, "fim": fim, "grande_area_principal": "Clinica Medica"}
+
+
+@pytest.fixture
+def calendario():
+    """Calendário de três anos, fora de ordem cronológica no arquivo."""
+    return {
+        "ano_2": {"2027": [_rodizio("Pediatria", "2027-02-01", "2027-03-28")]},
+        "ano_1": {"2026": [
+            _rodizio("Infectologia", "2026-02-09", "2026-03-29"),
+            _rodizio("Saúde Coletiva", "2026-03-30", "2026-05-17"),
+            _rodizio("Tocoginecologia", "2026-07-20", "2026-09-06"),
+        ]},
+        "ano_3": {"2028": [_rodizio("Internato Rural", "2028-01-10", "2028-02-20")]},
+    }
+
+
+class TestBuscas:
+    """Testes das consultas do índice."""
+
+    def test_no_dia(self, calendario):
+        indice = IndiceRodizios(calendario)
+
+        assert len(indice) == 5
+        assert indice.no_dia(date(2026, 2, 9))["rodizio"] == "Infectologia"
+        assert indice.no_dia(date(2026, 3, 29))["rodizio"] == "Infectologia"
+        assert indice.no_dia(date(2026, 3, 30))["rodizio"] == "Saúde Coletiva"
+        assert indice.no_dia(date(2026, 6, 1)) is None   # férias
+        assert indice.no_dia(date(2027, 3, 1))["rodizio"] == "Pediatria"
+        assert indice.no_dia(date(2028, 2, 1))["rodizio"] == "Internato Rural"
+
+    def test_sobrepostos(self, calendario):
+        indice = IndiceRodizios(calendario)
+
+        nomes = [r["rodizio"] for r in indice.sobrepostos(date(2026, 3, 1), date(2026, 7, 20))]
+        assert nomes == ["Infectologia", "Saúde Coletiva", "Tocoginecologia"]
+        assert indice.sobrepostos(date(2026, 5, 18), date(2026, 7, 19)) == []
+
+    def test_por_semana_considera_transicoes(self, calendario):
+        indice = IndiceRodizios(calendario)
+
+        semanas = indice.por_semana(date(2026, 3, 23), 3)
+
+        assert [r["rodizio"] for r in semanas] == ["Infectologia", "Saúde Coletiva", "Saúde Coletiva"]
+        # A semana de 14/07 começa nas férias e termina já no rodízio seguinte
+        assert indice.por_semana(date(2026, 7, 14), 1)[0]["rodizio"] == "Tocoginecologia"
+        assert indice.por_semana(date(2026, 6, 1), 1) == [None]
+
+    def test_sobreposicao_vale_ordem_do_calendario(self):
+        indice = IndiceRodizios({"ano_1": {"2026": [
+            _rodizio("Primeiro", "2026-03-01", "2026-03-31"),
+            _rodizio("Segundo", "2026-02-01", "2026-04-30"),
+        ]}})
+
+        assert indice.no_dia(date(2026, 3, 15))["rodizio"] == "Primeiro"
+        assert indice.no_dia(date(2026, 2, 15))["rodizio"] == "Segundo"
+
+    def test_datas_invalidas_ignoradas(self):
+        indice = IndiceRodizios({"ano_1": {"2026": [_rodizio("Sem data", "", "2026-01-01")]}})
+
+        assert len(indice) == 0
+
+
+class TestCache:
+    """Testes do índice compartilhado."""
+
+    def test_reaproveitado_ate_o_calendario_mudar(self, calendario):
+        indice = obter_indice_rodizios(calendario)
+
+        assert obter_indice_rodizios({**calendario}) is indice
+
+        calendario["ano_2"]["2027"].append(_rodizio("Cirurgia", "2027-04-01", "2027-05-01"))
+        assert obter_indice_rodizios(calendario) is not indice
+
+    def test_calendario_congelado_sem_serializar(self, calendario, mocker):
+        """O calendário de carregar_json é reconhecido pela identidade."""
+        congelado = congelar(calendario)
+        indice = obter_indice_rodizios(congelado)
+        dumps = mocker.spy(rodizios.json, "dumps")
+
+        assert obter_indice_rodizios(congelado) is indice
+        assert dumps.call_count == 0
+
+    def test_obter_rodizio_atual(self, calendario):
+        assert obter_rodizio_atual(calendario, datetime(2027, 2, 15, 18, 30))["rodizio"] == "Pediatria"
+        assert obter_rodizio_atual(calendario, datetime(2029, 1, 1)) is None
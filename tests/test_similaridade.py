@@ -0,0 +1,139 @@
+"""
+Testes para o Índice de Similaridade
+
+Valida as assinaturas MinHash, o agrupamento de quase duplicatas por
+LSH, a persistência do índice e a seleção de uma questão por grupo.
+"""
+
+import pytest
+import sys
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Adicionar path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import helpers
+from utils.similaridade import (
+    calcular_assinaturas, agrupar, carregar_indice_similaridade,
+    construir_indice_similaridade, ARQUIVO_INDICE
+)
+
+
+BASE = (
+    "Paciente de 34 anos, gestante de 32 semanas, chega ao pronto atendimento "
+    "com pressão arterial de 170 por 110 mmHg, cefaleia intensa e escotomas. "
+    "Qual a conduta inicial mais adequada neste momento?"
+)
+ALTERNATIVAS = [
+    "(A) Sulfato de magnésio e anti-hipertensivo",
+    "(B) Parto cesáreo imediato",
+    "(C) Observação e repouso",
+    "(D) Corticoide e alta"
+]
+
+
+def _questoes():
+    return [
+        {"id": "Q1", "enunciado": BASE, "alternativas": ALTERNATIVAS, "gabarito": "A"},
+        # Mesma questão de outra fonte: uma palavra trocada e alternativas reordenadas
+        {
+            "id": "Q2",
+            "enunciado": BASE.replace("intensa", "forte"),
+            "alternativas": ["a) Parto cesáreo imediato", "b) Sulfato de magnesio e anti-hipertensivo",
+                             "c) Observação e repouso", "d) Corticoide e alta"],
+            "gabarito": "B"
+        },
+        {
+            "id": "Q3",
+            "enunciado": "Criança de 4 anos com febre há cinco dias, conjuntivite não exsudativa, "
+                         "língua em framboesa e descamação periungueal. Qual o diagnóstico provável?",
+            "alternativas": ["(A) Doença de Kawasaki", "(B) Escarlatina", "(C) Sarampo"],
+            "gabarito": "A"
+        },
+        {"id": "Q4", "enunciado": "", "alternativas": [], "gabarito": "A"},
+    ]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Diretório de dados temporário com um banco de quase duplicatas."""
+    monkeypatch.setattr(helpers, "DATA_DIR", tmp_path)
+    helpers.invalidar_cache_json()
+    (tmp_path / "questoes.json").write_text(
+        json.dumps({"questoes": _questoes()}, ensure_ascii=False), encoding="utf-8"
+    )
+    yield tmp_path
+    helpers.invalidar_cache_json()
+
+
+class TestAgrupamento:
+    """Testes das assinaturas e dos grupos."""
+
+    def test_assinaturas_deterministicas(self):
+        a = calcular_assinaturas(_questoes())
+        b = calcular_assinaturas(_questoes())
+
+        assert a.shape == (4, 64)
+        assert a.dtype == np.uint32
+        assert np.array_equal(a, b)
+
+    def test_quase_duplicatas_no_mesmo_grupo(self):
+        grupos = agrupar(calcular_assinaturas(_questoes()))
+
+        assert grupos[0] == grupos[1]
+        assert grupos[2] != grupos[0]
+        # Questão sem texto fica isolada
+        assert len(set(grupos.tolist())) == 3
+
+    def test_lotes_nao_alteram_resultado(self, monkeypatch):
+        from utils import similaridade
+        inteiro = calcular_assinaturas(_questoes())
+        monkeypatch.setattr(similaridade, "TAMANHO_LOTE", 1)
+
+        assert np.array_equal(calcular_assinaturas(_questoes()), inteiro)
+
+    def test_muitas_questoes_distintas(self):
+        questoes = [
+            {"enunciado": f"Questão número {i} sobre o assunto {i * 7} com detalhe {i * 13}",
+             "alternativas": [f"opção {i}", f"outra {i}"]}
+            for i in range(500)
+        ]
+
+        grupos = agrupar(calcular_assinaturas(questoes))
+
+        assert len(set(grupos.tolist())) == 500
+
+
+class TestIndice:
+    """Testes do índice persistido e das consultas."""
+
+    def test_similares(self, data_dir):
+        indice = carregar_indice_similaridade()
+
+        similares = indice.similares(0)
+        assert [j for j, _ in similares] == [1]
+        assert 0.7 <= similares[0][1] < 1
+        assert indice.similares(3) == []
+        assert indice.num_grupos == 3
+        assert indice.grupo(1).tolist() == [0, 1]
+
+    def test_persistido_e_reconstruido_quando_banco_muda(self, data_dir):
+        carregar_indice_similaridade()
+        assert (data_dir / ARQUIVO_INDICE).exists()
+
+        caminho = data_dir / "questoes.json"
+        caminho.write_text(json.dumps({"questoes": _questoes()[2:]}), encoding="utf-8")
+        os.utime(caminho, ns=(1, 1))
+
+        assert len(carregar_indice_similaridade()) == 2
+
+    def test_um_por_grupo(self, data_dir):
+        indice = construir_indice_similaridade()
+
+        assert indice.um_por_grupo([1, 0, 2, 3]).tolist() == [1, 2, 3]
+        sorteados = indice.um_por_grupo([0, 1, 2], rng=np.random.default_rng(0))
+        assert sorted(sorteados.tolist()) in ([0, 2], [1, 2])
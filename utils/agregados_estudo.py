@@ -0,0 +1,163 @@
+"""
+Agregados materializados do registro de estudos.
+
+O bloco estudo["agregados"] guarda os totais que os painéis exibem, sem
+que precisem percorrer registro_temas e as revisões a cada execução:
+
+- temas:    por tema, grande área, questões, acertos e taxa (r1 a r3) e
+            quais revisões já foram feitas;
+- areas:    por grande área do registro, temas, questões, acertos e taxa;
+- revisoes: por revisão (r1, r2, r3), temas que a fizeram, questões,
+            acertos e taxa.
+
+Temas sem grande_area no registro entram em SEM_AREA. Revisões extras
+não entram nos totais, como nos painéis.
+
+aplicar_evento mantém o bloco em O(1): a contribuição antiga do tema
+alterado é subtraída e a nova somada. O bloco é gravado no snapshot do
+estudo.json e, no SQLite, junto com cada tema gravado (ver
+armazenamento_sqlite); só snapshots e bancos anteriores ao bloco são
+reconstruídos ao carregar. verificar_agregados compara o bloco com uma
+reconstrução.
+"""
+
+from typing import Any, Dict, List, Optional
+
+VERSAO_AGREGADOS = 1
+
+REVISOES = ("r1", "r2", "r3")
+
+SEM_AREA = "Sem área"
+
+
+def _total_vazio() -> Dict[str, Any]:
+    return {"temas": 0, "questoes": 0, "acertos": 0, "taxa": 0.0}
+
+
+def _contribuicao(dados: Dict[str, Any]) -> Dict[str, Any]:
+    """Totais de um tema do registro (mesmas regras dos painéis)."""
+    questoes = acertos = 0
+    por_revisao = {}
+    for rev in REVISOES:
+        rev_dados = dados.get(rev)
+        if not rev_dados:
+            continue
+        q = rev_dados.get("questoes") or 0
+        a = rev_dados.get("acertos", 0) if q else 0
+        por_revisao[rev] = [q, a]
+        questoes += q
+        acertos += a
+
+    return {
+        "grande_area": dados.get("grande_area") or SEM_AREA,
+        "questoes": questoes,
+        "acertos": acertos,
+        "taxa": acertos / questoes * 100 if questoes else 0.0,
+        "revisoes": por_revisao
+    }
+
+
+def _somar(item: Dict[str, Any], questoes: int, acertos: int, sinal: int) -> None:
+    item["temas"] += sinal
+    item["questoes"] += sinal * questoes
+    item["acertos"] += sinal * acertos
+    item["taxa"] = item["acertos"] / item["questoes"] * 100 if item["questoes"] else 0.0
+
+
+def _aplicar(agregados: Dict[str, Any], tema: Dict[str, Any], sinal: int) -> None:
+    """Soma (sinal 1) ou subtrai (sinal -1) a contribuição de um tema."""
+    areas = agregados["areas"]
+    area = areas.setdefault(tema["grande_area"], _total_vazio())
+    _somar(area, tema["questoes"], tema["acertos"], sinal)
+    if area["temas"] == 0:
+        del areas[tema["grande_area"]]
+
+    for rev, (questoes, acertos) in tema["revisoes"].items():
+        _somar(agregados["revisoes"][rev], questoes, acertos, sinal)
+
+
+def _novos_agregados() -> Dict[str, Any]:
+    return {
+        "versao": VERSAO_AGREGADOS,
+        "temas": {},
+        "areas": {},
+        "revisoes": {rev: _total_vazio() for rev in REVISOES}
+    }
+
+
+def calcular_agregados(estudo: Dict[str, Any]) -> Dict[str, Any]:
+    """Calcula o bloco de agregados percorrendo todo o registro."""
+    agregados = _novos_agregados()
+    for nome, dados in estudo.get("registro_temas", {}).items():
+        tema = agregados["temas"][nome] = _contribuicao(dados)
+        _aplicar(agregados, tema, 1)
+    return agregados
+
+
+def _valido(agregados: Any) -> bool:
+    return isinstance(agregados, dict) and agregados.get("versao") == VERSAO_AGREGADOS
+
+
+def reconstruir_agregados(estudo: Dict[str, Any]) -> Dict[str, Any]:
+    """Recalcula e grava no estudo (em memória) o bloco de agregados."""
+    estudo["agregados"] = calcular_agregados(estudo)
+    return estudo["agregados"]
+
+
+def garantir_agregados(estudo: Dict[str, Any]) -> Dict[str, Any]:
+    """Reconstrói o bloco apenas se ele não existir ou for de outra versão."""
+    if not _valido(estudo.get("agregados")):
+        return reconstruir_agregados(estudo)
+    return estudo["agregados"]
+
+
+def obter_agregados(estudo: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Agregados do estudo para leitura.
+
+    Estudos sem o bloco (ex.: montados em memória) são calculados na
+    hora, sem alterar o dicionário.
+    """
+    agregados = estudo.get("agregados")
+    return agregados if _valido(agregados) else calcular_agregados(estudo)
+
+
+def atualizar_agregados_tema(estudo: Dict[str, Any], nome: str) -> None:
+    """
+    Atualiza o bloco após uma alteração no registro de um tema, em O(1).
+
+    Sem bloco no estudo não faz nada: ele será montado inteiro ao
+    carregar.
+    """
+    agregados = estudo.get("agregados")
+    if not _valido(agregados):
+        return
+
+    anterior = agregados["temas"].pop(nome, None)
+    if anterior is not None:
+        _aplicar(agregados, anterior, -1)
+
+    dados = estudo.get("registro_temas", {}).get(nome)
+    if dados is not None:
+        tema = agregados["temas"][nome] = _contribuicao(dados)
+        _aplicar(agregados, tema, 1)
+
+
+def verificar_agregados(estudo: Dict[str, Any]) -> List[str]:
+    """
+    Compara o bloco gravado com uma reconstrução a partir do registro.
+
+    Retorna as entradas divergentes (ex.: "temas/Tuberculose",
+    "areas/Pediatria", "revisoes/r2"); lista vazia se estiver íntegro.
+    """
+    agregados: Optional[Dict[str, Any]] = estudo.get("agregados")
+    if not _valido(agregados):
+        return ["agregados"]
+
+    esperado = calcular_agregados(estudo)
+    divergencias = []
+    for secao in ("temas", "areas", "revisoes"):
+        for chave in sorted(agregados[secao].keys() | esperado[secao].keys()):
+            if agregados[secao].get(chave) != esperado[secao].get(chave):
+                divergencias.append(f"{secao}/{chave}")
+    return divergencias
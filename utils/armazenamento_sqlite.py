@@ -0,0 +1,399 @@
+"""
+Armazenamento do registro de estudos em SQLite.
+
+Backend opcional para os dados de estudo.json. Mantém o mesmo formato de
+dicionário retornado por carregar_estudo, mas persiste cada tema, revisão
+e questão marcada em sua própria linha, de modo que registrar uma revisão
+é um único upsert em vez de reescrever o arquivo inteiro.
+
+O bloco de agregados (ver agregados_estudo) também é persistido: a
+contribuição de cada tema em agregados_temas e os totais por área e por
+revisão em meta, gravados na mesma transação do tema alterado.
+
+Ativado com {"armazenamento": {"estudo": "sqlite"}} em config.json.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import helpers
+from .agregados_estudo import VERSAO_AGREGADOS, reconstruir_agregados
+
+ARQUIVO_DB = "estudo.db"
+
+# Revisões com posição fixa no registro de cada tema
+REVISOES_FIXAS = ("r1", "r2", "r3")
+
+# Campos do registro de tema que possuem coluna própria
+CAMPOS_TEMA = ("grande_area", "data_teoria", *REVISOES_FIXAS, "extras")
+
+# Campos de uma revisão que possuem coluna própria
+CAMPOS_REVISAO = ("data", "questoes", "acertos")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS temas (
+    nome TEXT PRIMARY KEY,
+    grande_area TEXT,
+    data_teoria TEXT,
+    outros TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_temas_area ON temas(grande_area);
+
+CREATE TABLE IF NOT EXISTS revisoes (
+    tema TEXT NOT NULL REFERENCES temas(nome) ON DELETE CASCADE,
+    revisao TEXT NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    data TEXT,
+    questoes INTEGER,
+    acertos INTEGER,
+    outros TEXT,
+    PRIMARY KEY (tema, revisao, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_revisoes_data ON revisoes(data);
+
+CREATE TABLE IF NOT EXISTS questoes_marcadas (
+    id PRIMARY KEY,
+    ordem INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS estatisticas (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS agregados_temas (
+    nome TEXT PRIMARY KEY REFERENCES temas(nome) ON DELETE CASCADE,
+    dados TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Uma única conexão por arquivo, compartilhada pelas threads do Streamlit
+# (cada sessão e cada rerun rodam em threads próprias; conexões por thread
+# nunca eram fechadas e se acumulavam). O acesso é serializado por _LOCK.
+_CONEXOES: Dict[Path, sqlite3.Connection] = {}
+_LOCK = threading.RLock()
+
+
+def caminho_db() -> Path:
+    """Caminho do banco SQLite no diretório de dados."""
+    return helpers.DATA_DIR / ARQUIVO_DB
+
+
+@contextmanager
+def conexao() -> Iterator[sqlite3.Connection]:
+    """
+    Conexão compartilhada do banco, de uso exclusivo dentro do bloco.
+
+    Criada (com o schema) no primeiro uso de cada arquivo.
+    """
+    with _LOCK:
+        caminho = caminho_db()
+        conn = _CONEXOES.get(caminho)
+        if conn is None:
+            conn = sqlite3.connect(caminho, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(SCHEMA)
+            _CONEXOES[caminho] = conn
+        yield conn
+
+
+def fechar_conexoes() -> None:
+    """Fecha as conexões abertas (também chamada ao encerrar o processo)."""
+    with _LOCK:
+        for conn in _CONEXOES.values():
+            conn.close()
+        _CONEXOES.clear()
+
+
+atexit.register(fechar_conexoes)
+
+
+def _json_ou_none(dados: Dict[str, Any]) -> Optional[str]:
+    return json.dumps(dados, ensure_ascii=False) if dados else None
+
+
+def _upsert_revisao(
+    conn: sqlite3.Connection,
+    tema: str,
+    revisao: str,
+    seq: int,
+    dados: Dict[str, Any]
+) -> None:
+    outros = {k: v for k, v in dados.items() if k not in CAMPOS_REVISAO}
+    conn.execute(
+        """
+        INSERT INTO revisoes (tema, revisao, seq, data, questoes, acertos, outros)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (tema, revisao, seq) DO UPDATE SET
+            data = excluded.data,
+            questoes = excluded.questoes,
+            acertos = excluded.acertos,
+            outros = excluded.outros
+        """,
+        (tema, revisao, seq, dados.get("data"), dados.get("questoes"),
+         dados.get("acertos"), _json_ou_none(outros))
+    )
+
+
+def _gravar_tema(conn: sqlite3.Connection, nome: str, registro: Dict[str, Any]) -> None:
+    """Grava um tema e todas as suas revisões (sem commit)."""
+    outros = {k: v for k, v in registro.items() if k not in CAMPOS_TEMA}
+    conn.execute(
+        """
+        INSERT INTO temas (nome, grande_area, data_teoria, outros)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (nome) DO UPDATE SET
+            grande_area = excluded.grande_area,
+            data_teoria = excluded.data_teoria,
+            outros = excluded.outros
+        """,
+        (nome, registro.get("grande_area"), registro.get("data_teoria"), _json_ou_none(outros))
+    )
+
+    for rev in REVISOES_FIXAS:
+        dados = registro.get(rev)
+        if dados:
+            _upsert_revisao(conn, nome, rev, 0, dados)
+        else:
+            conn.execute("DELETE FROM revisoes WHERE tema = ? AND revisao = ?", (nome, rev))
+
+    extras = registro.get("extras") or []
+    for seq, dados in enumerate(extras):
+        _upsert_revisao(conn, nome, "extra", seq, dados)
+    conn.execute(
+        "DELETE FROM revisoes WHERE tema = ? AND revisao = 'extra' AND seq >= ?",
+        (nome, len(extras))
+    )
+
+
+def _gravar_estatisticas(conn: sqlite3.Connection, stats: Dict[str, Any]) -> None:
+    conn.executemany(
+        """
+        INSERT INTO estatisticas (chave, valor) VALUES (?, ?)
+        ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor
+        """,
+        [(k, json.dumps(v, ensure_ascii=False)) for k, v in stats.items()]
+    )
+
+
+def _gravar_meta(conn: sqlite3.Connection, chave: str, valor: Optional[str]) -> None:
+    conn.execute(
+        """
+        INSERT INTO meta (chave, valor) VALUES (?, ?)
+        ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor
+        """,
+        (chave, valor)
+    )
+
+
+def _gravar_agregados(conn: sqlite3.Connection, estudo: Dict[str, Any], temas: List[str]) -> None:
+    """
+    Grava a contribuição dos temas informados e os totais do bloco.
+
+    Sem bloco válido no estudo, os totais gravados são descartados e o
+    bloco é reconstruído no próximo carregamento.
+    """
+    agregados = estudo.get("agregados")
+    if not isinstance(agregados, dict) or agregados.get("versao") != VERSAO_AGREGADOS:
+        conn.execute("DELETE FROM meta WHERE chave = 'agregados'")
+        return
+
+    for nome in temas:
+        tema = agregados["temas"].get(nome)
+        if tema is None:
+            conn.execute("DELETE FROM agregados_temas WHERE nome = ?", (nome,))
+            continue
+        conn.execute(
+            """
+            INSERT INTO agregados_temas (nome, dados) VALUES (?, ?)
+            ON CONFLICT (nome) DO UPDATE SET dados = excluded.dados
+            """,
+            (nome, json.dumps(tema, ensure_ascii=False))
+        )
+    _gravar_meta(conn, "agregados", json.dumps({
+        "versao": agregados["versao"],
+        "areas": agregados["areas"],
+        "revisoes": agregados["revisoes"]
+    }, ensure_ascii=False))
+
+
+def _ler_agregados(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+    totais = _ler_meta(conn, "agregados")
+    if totais is None:
+        return None
+    agregados = json.loads(totais)
+    if agregados.get("versao") != VERSAO_AGREGADOS:
+        return None
+    agregados["temas"] = {
+        nome: json.loads(dados)
+        for nome, dados in conn.execute("SELECT nome, dados FROM agregados_temas")
+    }
+    return agregados
+
+
+def _gravar_cabecalho(conn: sqlite3.Connection, estudo: Dict[str, Any]) -> None:
+    """Estatísticas gerais, última atualização e posição no log de eventos."""
+    _gravar_estatisticas(conn, estudo.get("estatisticas_gerais", {}))
+    _gravar_meta(conn, "ultima_atualizacao", estudo.get("ultima_atualizacao"))
+    if "seq_eventos" in estudo:
+        _gravar_meta(conn, "seq_eventos", str(estudo["seq_eventos"]))
+
+
+def _ler_meta(conn: sqlite3.Connection, chave: str) -> Optional[str]:
+    linha = conn.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+    return linha[0] if linha else None
+
+
+def carregar_estudo_sqlite() -> Dict[str, Any]:
+    """Monta o dicionário de estudo (mesmo formato de estudo.json) a partir do banco."""
+    with conexao() as conn:
+        registro: Dict[str, Dict[str, Any]] = {}
+        for nome, area, data_teoria, outros in conn.execute(
+            "SELECT nome, grande_area, data_teoria, outros FROM temas ORDER BY rowid"
+        ):
+            tema: Dict[str, Any] = {}
+            if data_teoria is not None:
+                tema["data_teoria"] = data_teoria
+            if area is not None:
+                tema["grande_area"] = area
+            if outros:
+                tema.update(json.loads(outros))
+            registro[nome] = tema
+
+        for nome, revisao, seq, data, questoes, acertos, outros in conn.execute(
+            "SELECT tema, revisao, seq, data, questoes, acertos, outros "
+            "FROM revisoes ORDER BY tema, revisao, seq"
+        ):
+            dados = {
+                campo: valor
+                for campo, valor in zip(CAMPOS_REVISAO, (data, questoes, acertos))
+                if valor is not None
+            }
+            if outros:
+                dados.update(json.loads(outros))
+            if revisao == "extra":
+                registro[nome].setdefault("extras", []).append(dados)
+            else:
+                registro[nome][revisao] = dados
+
+        marcadas = [
+            linha[0] for linha in
+            conn.execute("SELECT id FROM questoes_marcadas ORDER BY ordem")
+        ]
+
+        estatisticas = {
+            chave: json.loads(valor)
+            for chave, valor in conn.execute("SELECT chave, valor FROM estatisticas")
+        }
+
+        estudo = {
+            "registro_temas": registro,
+            "estatisticas_gerais": estatisticas,
+            "questoes_marcadas_importantes": marcadas,
+            "ultima_atualizacao": _ler_meta(conn, "ultima_atualizacao")
+        }
+        seq = _ler_meta(conn, "seq_eventos")
+        if seq is not None:
+            estudo["seq_eventos"] = int(seq)
+
+        agregados = _ler_agregados(conn)
+        if agregados is None:
+            # Banco anterior aos agregados: monta uma vez e grava
+            reconstruir_agregados(estudo)
+            with conn:
+                _gravar_agregados(conn, estudo, list(registro))
+        else:
+            estudo["agregados"] = agregados
+        return estudo
+
+
+def salvar_estudo_sqlite(estudo: Dict[str, Any]) -> None:
+    """
+    Sincroniza o banco com o dicionário de estudo completo.
+
+    Usado por salvar_estudo; para gravações pontuais prefira
+    salvar_tema_sqlite e marcar_questao_sqlite.
+    """
+    registro = estudo.get("registro_temas", {})
+
+    with conexao() as conn, conn:
+        existentes = {linha[0] for linha in conn.execute("SELECT nome FROM temas")}
+        removidos = existentes - set(registro)
+        conn.executemany("DELETE FROM temas WHERE nome = ?", [(n,) for n in removidos])
+
+        for nome, dados in registro.items():
+            _gravar_tema(conn, nome, dados)
+        # Gravação completa: o registro pode ter sido editado fora dos eventos
+        reconstruir_agregados(estudo)
+        _gravar_agregados(conn, estudo, list(registro))
+
+        marcadas = estudo.get("questoes_marcadas_importantes", [])
+        conn.execute("DELETE FROM questoes_marcadas")
+        conn.executemany(
+            "INSERT OR IGNORE INTO questoes_marcadas (id, ordem) VALUES (?, ?)",
+            [(qid, i) for i, qid in enumerate(marcadas)]
+        )
+
+        _gravar_cabecalho(conn, estudo)
+
+
+def salvar_tema_sqlite(estudo: Dict[str, Any], tema: str) -> None:
+    """Grava apenas um tema (com seus agregados e as estatísticas gerais) em uma transação."""
+    with conexao() as conn, conn:
+        _gravar_tema(conn, tema, estudo["registro_temas"][tema])
+        _gravar_agregados(conn, estudo, [tema])
+        _gravar_cabecalho(conn, estudo)
+
+
+def marcar_questao_sqlite(questao_id: Any, marcada: bool) -> None:
+    """Insere ou remove uma única questão marcada como importante."""
+    with conexao() as conn, conn:
+        if marcada:
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO questoes_marcadas (id, ordem)
+                VALUES (?, (SELECT COALESCE(MAX(ordem), -1) + 1 FROM questoes_marcadas))
+                """,
+                (questao_id,)
+            )
+        else:
+            conn.execute("DELETE FROM questoes_marcadas WHERE id = ?", (questao_id,))
+
+
+def sqlite_migrado() -> bool:
+    """Indica se o estudo.json já foi importado para o banco."""
+    with conexao() as conn:
+        return _ler_meta(conn, "migrado_de_json") is not None
+
+
+def migrar_json_para_sqlite(forcar: bool = False) -> bool:
+    """
+    Importa o estudo.json existente para o banco (uma única vez).
+
+    O arquivo JSON é mantido como cópia de segurança. Retorna True se a
+    migração foi executada.
+    """
+    if sqlite_migrado() and not forcar:
+        return False
+
+    from .eventos_estudo import reaplicar_eventos
+    estudo = reaplicar_eventos(helpers.carregar_json("estudo.json", copiar=True))
+    if estudo:
+        salvar_estudo_sqlite(estudo)
+
+    with conexao() as conn, conn:
+        _gravar_meta(conn, "migrado_de_json", datetime.now().isoformat())
+    return True
@@ -0,0 +1,336 @@
+"""
+Banco de questões em formato colunar.
+
+O questoes.json é compilado em dois arquivos no diretório de dados:
+
+- questoes.colunas.npz: id, tema, grande_area, banca e gabarito como
+  arrays de códigos (int32) com um dicionário de valores por coluna, e os
+  offsets de cada questão no arquivo de textos;
+- questoes.textos.<versão>.bin: enunciado, alternativas e demais campos
+  de cada questão (JSON UTF-8), lido via mmap.
+
+Filtros e listas de opções usam apenas os códigos; o texto é lido só
+para as questões efetivamente exibidas. Para tema, grande_area e banca,
+IndiceQuestoes guarda um bitset por valor, e qualquer combinação de
+filtros (e a sua contagem) sai de AND/OR entre bitsets. A compilação é feita ao importar
+questões (salvar_questoes) e, se o questoes.json mudar por fora, no
+primeiro carregar_banco seguinte.
+"""
+
+import json
+import mmap
+import os
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from . import helpers
+
+ARQUIVO_ORIGEM = "questoes.json"
+ARQUIVO_COLUNAS = "questoes.colunas.npz"
+PREFIXO_TEXTOS = "questoes.textos."
+
+# Colunas de metadados codificadas por dicionário
+COLUNAS = ("id", "tema", "grande_area", "banca", "gabarito")
+
+# Código de campo ausente na questão
+AUSENTE = -1
+
+# Colunas com bitsets em IndiceQuestoes e o valor que, nas listas de
+# seleção, representa as questões sem o campo
+PADROES = {
+    "tema": "Não classificado",
+    "grande_area": "Não classificada",
+    "banca": "Não informada"
+}
+
+# Número de bits 1 em cada byte (popcount dos bitsets)
+_BITS_POR_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+_LOCK = threading.Lock()
+
+# Banco aberto por caminho do .npz
+_BANCOS: Dict[Path, "BancoColunar"] = {}
+
+
+def _assinatura_origem() -> Tuple[int, int]:
+    """(mtime_ns, tamanho) do questoes.json; (0, 0) se não existir."""
+    try:
+        st = (helpers.DATA_DIR / ARQUIVO_ORIGEM).stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _chave(valor: Any) -> str:
+    """Valor do dicionário de uma coluna (JSON, para preservar o tipo)."""
+    return json.dumps(valor, ensure_ascii=False)
+
+
+def compilar_banco(questoes: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+    """
+    Gera os arquivos colunares a partir das questões.
+
+    Se questoes não for informado, o questoes.json é lido em streaming,
+    questão a questão. O arquivo de textos recebe um nome novo a cada
+    compilação e o .npz (que aponta para ele) é gravado por último, de
+    forma que leitores nunca veem os dois arquivos fora de sincronia.
+    """
+    origem = _assinatura_origem()
+    if questoes is None:
+        from .importador_questoes import iterar_arquivo_questoes
+        questoes = iterar_arquivo_questoes(helpers.DATA_DIR / ARQUIVO_ORIGEM)
+
+    dicionarios: Dict[str, Dict[str, int]] = {c: {} for c in COLUNAS}
+    codigos = {c: array("i") for c in COLUNAS}
+    offsets = array("q", [0])
+
+    def escrever_textos(f) -> None:
+        posicao = 0
+        for q in questoes:
+            for coluna in COLUNAS:
+                if coluna in q:
+                    dicionario = dicionarios[coluna]
+                    codigos[coluna].append(dicionario.setdefault(_chave(q[coluna]), len(dicionario)))
+                else:
+                    codigos[coluna].append(AUSENTE)
+            texto = json.dumps(
+                {k: v for k, v in q.items() if k not in COLUNAS}, ensure_ascii=False
+            ).encode("utf-8")
+            f.write(texto)
+            posicao += len(texto)
+            offsets.append(posicao)
+
+    nome_textos = f"{PREFIXO_TEXTOS}{os.urandom(6).hex()}.bin"
+    helpers.gravar_atomico(helpers.DATA_DIR / nome_textos, escrever_textos, binario=True)
+
+    colunas: Dict[str, np.ndarray] = {}
+    for coluna in COLUNAS:
+        colunas[f"codigos_{coluna}"] = np.array(codigos[coluna], dtype=np.int32)
+        colunas[f"valores_{coluna}"] = np.array(list(dicionarios[coluna]), dtype=str)
+
+    helpers.gravar_atomico(
+        helpers.DATA_DIR / ARQUIVO_COLUNAS,
+        lambda f: np.savez(
+            f,
+            origem=np.array(origem, dtype=np.int64),
+            textos=np.array(nome_textos),
+            offsets=np.array(offsets, dtype=np.int64),
+            **colunas
+        ),
+        binario=True
+    )
+
+    # Textos de compilações anteriores (mmaps já abertos continuam válidos)
+    for antigo in helpers.DATA_DIR.glob(f"{PREFIXO_TEXTOS}*.bin"):
+        if antigo.name != nome_textos:
+            try:
+                antigo.unlink()
+            except OSError:
+                pass
+
+
+class BancoColunar:
+    """
+    Banco de questões compilado, somente leitura.
+
+    Questões são referenciadas pelo índice (posição no questoes.json).
+    """
+
+    def __init__(self, caminho: Path):
+        with np.load(caminho, allow_pickle=False) as npz:
+            self.origem = tuple(int(x) for x in npz["origem"])
+            self._codigos = {c: npz[f"codigos_{c}"] for c in COLUNAS}
+            self._dicionarios = {c: npz[f"valores_{c}"] for c in COLUNAS}
+            self._offsets = npz["offsets"]
+            caminho_textos = caminho.parent / str(npz["textos"])
+
+        self._textos: Any = b""
+        if self._offsets[-1] > 0:
+            with open(caminho_textos, "rb") as f:
+                self._textos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._valores: Dict[str, List[Any]] = {}
+        self._posicoes: Dict[str, Dict[str, int]] = {}
+        self._indice: Optional["IndiceQuestoes"] = None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def codigos(self, coluna: str) -> np.ndarray:
+        """Array de códigos da coluna (AUSENTE onde o campo não existe)."""
+        return self._codigos[coluna]
+
+    def valores(self, coluna: str) -> List[Any]:
+        """Dicionário da coluna: valores[codigo] é o valor original."""
+        if coluna not in self._valores:
+            self._valores[coluna] = [json.loads(v) for v in self._dicionarios[coluna]]
+        return self._valores[coluna]
+
+    def _codigo(self, coluna: str, valor: Any) -> Optional[int]:
+        if coluna not in self._posicoes:
+            self._posicoes[coluna] = {
+                str(v): i for i, v in enumerate(self._dicionarios[coluna])
+            }
+        return self._posicoes[coluna].get(_chave(valor))
+
+    def opcoes(self, coluna: str, padrao: Any = None) -> List[Any]:
+        """
+        Valores distintos da coluna, ordenados (para listas de seleção).
+
+        Questões sem o campo entram como padrao, se informado.
+        """
+        opcoes = set(self.valores(coluna))
+        if padrao is not None and (self._codigos[coluna] == AUSENTE).any():
+            opcoes.add(padrao)
+        return sorted(opcoes)
+
+    def contagem(self, coluna: str, padrao: Any = None) -> Dict[Any, int]:
+        """Número de questões por valor da coluna."""
+        codigos = self._codigos[coluna]
+        valores = self.valores(coluna)
+        contagem = np.bincount(codigos[codigos != AUSENTE], minlength=len(valores))
+        resultado = {v: int(c) for v, c in zip(valores, contagem) if c}
+        ausentes = int((codigos == AUSENTE).sum())
+        if ausentes:
+            resultado[padrao] = resultado.get(padrao, 0) + ausentes
+        return resultado
+
+    def filtrar(self, indices: Optional[np.ndarray] = None, **criterios: Any) -> np.ndarray:
+        """
+        Índices das questões que atendem a todos os critérios.
+
+        Cada critério é coluna=valor ou coluna=[valores]; critérios None são
+        ignorados. Com indices, o filtro é aplicado apenas a esse subconjunto
+        (a ordem é preservada).
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=np.int64)
+        for coluna, valor in criterios.items():
+            if valor is None:
+                continue
+            alvos = valor if isinstance(valor, (list, tuple, set)) else [valor]
+            codigos = [c for c in (self._codigo(coluna, v) for v in alvos) if c is not None]
+            indices = indices[np.isin(self._codigos[coluna][indices], codigos)]
+        return indices
+
+    def metadados(self, indice: int) -> Dict[str, Any]:
+        """Campos de metadados de uma questão (sem ler o texto)."""
+        dados = {}
+        for coluna in COLUNAS:
+            codigo = self._codigos[coluna][indice]
+            if codigo != AUSENTE:
+                dados[coluna] = self.valores(coluna)[codigo]
+        return dados
+
+    def questao(self, indice: int) -> Dict[str, Any]:
+        """Questão completa, no mesmo formato do questoes.json."""
+        inicio, fim = self._offsets[indice], self._offsets[indice + 1]
+        return {**self.metadados(indice), **json.loads(self._textos[inicio:fim])}
+
+    def questoes(self, indices: Iterable[int]) -> List[Dict[str, Any]]:
+        """Questões completas para uma lista de índices."""
+        return [self.questao(int(i)) for i in indices]
+
+    def indice(self) -> "IndiceQuestoes":
+        """Bitsets de tema, grande_area e banca (montados na primeira chamada)."""
+        if self._indice is None:
+            self._indice = IndiceQuestoes(self)
+        return self._indice
+
+
+class IndiceQuestoes:
+    """
+    Bitsets por valor das colunas de PADROES.
+
+    Para cada coluna há uma matriz de bits (valores + 1 linhas, uma coluna
+    de bit por questão); a última linha marca as questões sem o campo, que
+    as listas de seleção mostram como PADROES[coluna]. Um filtro é o AND
+    entre colunas do OR das linhas escolhidas, e a contagem é o popcount
+    do resultado. Montado uma vez por banco (isto é, por versão do
+    questoes.json).
+    """
+
+    def __init__(self, banco: BancoColunar):
+        self._total = len(banco)
+        self._bits: Dict[str, np.ndarray] = {}
+        self._linhas: Dict[str, Dict[str, int]] = {}
+
+        # Byte e bit (ordem de np.packbits) de cada questão
+        posicoes = np.arange(self._total)
+        bytes_ = posicoes >> 3
+        bits = (0x80 >> (posicoes & 7)).astype(np.uint8)
+        for coluna in PADROES:
+            codigos = banco.codigos(coluna)
+            valores = banco.valores(coluna)
+            linhas = np.where(codigos == AUSENTE, len(valores), codigos)
+            # Cada questão acende um bit da sua linha, direto na matriz compactada
+            compactada = np.zeros((len(valores) + 1, (self._total + 7) // 8), dtype=np.uint8)
+            np.bitwise_or.at(compactada, (linhas, bytes_), bits)
+            self._bits[coluna] = compactada
+            self._linhas[coluna] = {_chave(v): i for i, v in enumerate(valores)}
+
+        self._todas = np.packbits(np.ones(self._total, dtype=bool))
+
+    def _linhas_de(self, coluna: str, alvos: Iterable[Any]) -> List[int]:
+        linhas = []
+        for valor in alvos:
+            linha = self._linhas[coluna].get(_chave(valor))
+            if linha is not None:
+                linhas.append(linha)
+            if valor == PADROES[coluna]:
+                linhas.append(len(self._linhas[coluna]))
+        return linhas
+
+    def mascara(self, **criterios: Any) -> np.ndarray:
+        """
+        Bitset (np.packbits) das questões que atendem a todos os critérios.
+
+        Cada critério é coluna=valor ou coluna=[valores]; critérios None são
+        ignorados.
+        """
+        resultado = self._todas.copy()
+        for coluna, valor in criterios.items():
+            if valor is None:
+                continue
+            alvos = valor if isinstance(valor, (list, tuple, set)) else [valor]
+            linhas = self._linhas_de(coluna, alvos)
+            if not linhas:
+                resultado[:] = 0
+                continue
+            np.bitwise_and(resultado, np.bitwise_or.reduce(self._bits[coluna][linhas], axis=0), out=resultado)
+        return resultado
+
+    def contar(self, **criterios: Any) -> int:
+        """Número de questões que atendem aos critérios."""
+        return int(_BITS_POR_BYTE[self.mascara(**criterios)].sum())
+
+    def indices(self, **criterios: Any) -> np.ndarray:
+        """Índices (crescentes) das questões que atendem aos critérios."""
+        return np.flatnonzero(np.unpackbits(self.mascara(**criterios), count=self._total))
+
+
+def carregar_banco() -> BancoColunar:
+    """
+    Retorna o banco colunar, compilando-o se estiver ausente ou desatualizado.
+
+    O banco aberto é mantido em memória enquanto o questoes.json não mudar.
+    """
+    caminho = helpers.DATA_DIR / ARQUIVO_COLUNAS
+    origem = _assinatura_origem()
+
+    with _LOCK:
+        banco = _BANCOS.get(caminho)
+        if banco is not None and banco.origem == origem:
+            return banco
+
+        if caminho.exists():
+            banco = BancoColunar(caminho)
+        if banco is None or banco.origem != origem:
+            compilar_banco()
+            banco = BancoColunar(caminho)
+
+        _BANCOS[caminho] = banco
+        return banco
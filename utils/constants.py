@@ -99,3 +99,28 @@ FATOR_MARGEM = {
     "rigoroso": 1.2
 }
 
+
+# Apelidos de temas (nome canônico em temas.json -> outros nomes usados)
+ALIASES_TEMAS = {
+    "Tuberculose": ["TB", "Tuberculose Pulmonar"],
+    "HIV e AIDS": ["HIV", "AIDS"],
+    "Diabetes": ["DM", "Diabetes Mellitus"],
+    "Hipertensão Arterial Sistêmica": ["HAS", "Hipertensão", "Hipertensão Arterial"],
+    "Insuficiência Cardíaca": ["IC", "ICC"],
+    "Embolia Pulmonar": ["TEP", "Tromboembolismo Pulmonar"],
+    "Síndrome Coronariana": ["SCA", "Síndrome Coronariana Aguda", "IAM"],
+    "AVC": ["Acidente Vascular Cerebral"],
+    "Sepse e Choque": ["Sepse"],
+    "Pneumonias e Síndromes Gripais": ["Pneumonia", "PAC"],
+    "Distúrbios Obstrutivos": ["DPOC", "Asma"],
+    "Doenças Inflamatórias Intestinais": ["DII"],
+    "ABCDE do Trauma": ["ATLS"],
+    "TCE": ["Traumatismo Cranioencefálico"],
+    "Doença Inflamatória Pélvica e Violência Sexual": ["DIP"],
+    "Amenorreia e SOP": ["SOP", "Síndrome dos Ovários Policísticos"],
+    "Síndromes Hipertensivas na Gestação": ["Pré-eclâmpsia", "Eclâmpsia", "DHEG"],
+    "RPMO e Infecção Ovular": ["RPMO", "Rotura Prematura de Membranas"],
+    "Infecção do Trato Urinário": ["ITU"],
+    "Princípios e Diretrizes do SUS": ["SUS"],
+    "Declaração de Óbito": ["DO"]
+}
@@ -0,0 +1,91 @@
+"""
+Dados de referência compartilhados e memória das sessões.
+
+temas.json, pesos_enamed.json e calendario.json são somente leitura para
+as páginas. helpers.carregar_json já devolve, para cada versão do
+arquivo, uma única estrutura congelada (helpers.congelar) compartilhada
+por todas as sessões do Streamlit:
+
+- objetos viram DicionarioCongelado e listas viram ListaCongelada
+  (dict/list que recusam alterações, serializáveis em JSON e via
+  pickle, em que viram dict/list comuns);
+- strings são internadas (sys.intern), então nomes de temas e áreas
+  repetidos em vários lugares ocupam memória uma única vez.
+
+carregar_referencia registra essas estruturas para que relatorio_memoria
+meça quanto cada sessão ocupa além delas.
+"""
+
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Set
+
+from . import helpers
+from .helpers import DicionarioCongelado, ListaCongelada, congelar
+
+_LOCK = threading.Lock()
+
+# Dados de referência já entregues, por caminho
+_REFERENCIAS: Dict[str, Any] = {}
+
+
+def carregar_referencia(nome_arquivo: str) -> Any:
+    """
+    Conteúdo congelado de um arquivo de dados, compartilhado no processo.
+
+    É o mesmo objeto enquanto o arquivo não muda (helpers.carregar_json).
+    """
+    dados = helpers.carregar_json(nome_arquivo)
+    with _LOCK:
+        _REFERENCIAS[str(helpers.DATA_DIR / nome_arquivo)] = dados
+    return dados
+
+
+def tamanho_profundo(obj: Any, vistos: Optional[Set[int]] = None) -> int:
+    """
+    Bytes ocupados pelo objeto e por tudo o que ele referencia.
+
+    Objetos já contados (em vistos) não são somados de novo, então dados
+    compartilhados aparecem uma única vez.
+    """
+    if vistos is None:
+        vistos = set()
+    if id(obj) in vistos:
+        return 0
+    vistos.add(id(obj))
+
+    tamanho = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        tamanho += sum(tamanho_profundo(k, vistos) + tamanho_profundo(v, vistos) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        tamanho += sum(tamanho_profundo(v, vistos) for v in obj)
+    return tamanho
+
+
+def relatorio_memoria(estado: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Memória de uma sessão (ex.: st.session_state), chave a chave.
+
+    Estruturas que a sessão apenas referencia nos dados de referência
+    compartilhados não entram no total da sessão; o tamanho desses dados
+    é informado à parte, em "compartilhado".
+    """
+    with _LOCK:
+        referencias = dict(_REFERENCIAS)
+
+    compartilhado = {}
+    vistos: Set[int] = set()
+    for chave, dados in referencias.items():
+        compartilhado[Path(chave).name] = tamanho_profundo(dados, vistos)
+
+    por_chave = {}
+    for chave in list(estado.keys()):
+        por_chave[str(chave)] = tamanho_profundo(estado[chave], vistos)
+
+    return {
+        "sessao": dict(sorted(por_chave.items(), key=lambda item: -item[1])),
+        "total_sessao": sum(por_chave.values()),
+        "compartilhado": compartilhado,
+        "total_compartilhado": sum(compartilhado.values())
+    }
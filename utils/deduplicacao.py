@@ -0,0 +1,125 @@
+"""
+Índice de duplicatas do banco de questões.
+
+Cada questão é identificada por um hash do conteúdo normalizado
+(enunciado + alternativas, sem acentos, caixa, pontuação e marcadores
+de alternativa). O índice hash -> (gabarito, id) fica em
+questoes.hashes.json, ao lado do questoes.json, e permite classificar
+cada questão importada em O(1) como:
+
+- nova: conteúdo ainda não existe no banco;
+- duplicada: mesmo conteúdo e mesmo gabarito;
+- conflitante: mesmo conteúdo com gabarito diferente.
+
+O índice guarda a assinatura do questoes.json de que foi gerado e é
+reconstruído (em streaming) se o banco mudar por outro caminho.
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import helpers
+
+ARQUIVO_INDICE = "questoes.hashes.json"
+
+NOVA = "nova"
+DUPLICADA = "duplicada"
+CONFLITANTE = "conflitante"
+
+_MARCADOR_ALTERNATIVA = re.compile(r"^\(?[a-z]\)?[.):\-]?\s+")
+_NAO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sem acentos e com pontuação/espaços reduzidos a um espaço."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return _NAO_ALFANUMERICO.sub(" ", texto).strip()
+
+
+def normalizar_alternativa(alternativa: str) -> str:
+    """normalizar_texto sem o marcador inicial ("(A)", "b)", "C." ...)."""
+    return normalizar_texto(_MARCADOR_ALTERNATIVA.sub("", str(alternativa).strip().lower()))
+
+
+def hash_questao(questao: Dict[str, Any]) -> str:
+    """Hash (64 bits, hex) do enunciado e das alternativas normalizados."""
+    alternativas = [normalizar_alternativa(a) for a in questao.get("alternativas", [])]
+    conteudo = "\x1f".join([normalizar_texto(str(questao.get("enunciado", "")))] + alternativas)
+    return hashlib.blake2b(conteudo.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _gabarito(questao: Dict[str, Any]) -> str:
+    return str(questao.get("gabarito", "")).strip().upper()
+
+
+class IndiceDuplicatas:
+    """Mapa hash do conteúdo -> [gabarito, id] das questões do banco."""
+
+    def __init__(self, hashes: Optional[Dict[str, List[Any]]] = None):
+        self.hashes: Dict[str, List[Any]] = hashes if hashes is not None else {}
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def classificar(self, questao: Dict[str, Any]) -> Tuple[str, Optional[List[Any]]]:
+        """
+        Classifica a questão em NOVA, DUPLICADA ou CONFLITANTE.
+
+        Retorna também o registro existente ([gabarito, id]), se houver.
+        """
+        existente = self.hashes.get(hash_questao(questao))
+        if existente is None:
+            return NOVA, None
+        if existente[0] == _gabarito(questao):
+            return DUPLICADA, existente
+        return CONFLITANTE, existente
+
+    def adicionar(self, questao: Dict[str, Any]) -> None:
+        """Registra a questão (a primeira ocorrência de um conteúdo prevalece)."""
+        self.hashes.setdefault(hash_questao(questao), [_gabarito(questao), questao.get("id")])
+
+    @classmethod
+    def construir(cls, questoes: Iterable[Dict[str, Any]]) -> "IndiceDuplicatas":
+        indice = cls()
+        for q in questoes:
+            if isinstance(q, dict):
+                indice.adicionar(q)
+        return indice
+
+
+def _assinatura_banco() -> List[int]:
+    try:
+        st = (helpers.DATA_DIR / "questoes.json").stat()
+    except FileNotFoundError:
+        return [0, 0]
+    return [st.st_mtime_ns, st.st_size]
+
+
+def salvar_indice(indice: IndiceDuplicatas) -> None:
+    """Grava o índice associado à versão atual do questoes.json."""
+    helpers.salvar_json(
+        ARQUIVO_INDICE,
+        {"origem": _assinatura_banco(), "hashes": indice.hashes},
+        imediato=True
+    )
+
+
+def carregar_indice() -> IndiceDuplicatas:
+    """
+    Carrega o índice do banco atual, reconstruindo-o se estiver desatualizado.
+
+    Retorna uma cópia que pode ser alterada livremente.
+    """
+    dados = helpers.carregar_json(ARQUIVO_INDICE)
+    if dados.get("origem") == _assinatura_banco():
+        return IndiceDuplicatas(dict(dados["hashes"]))
+
+    from .importador_questoes import iterar_arquivo_questoes
+    indice = IndiceDuplicatas.construir(
+        iterar_arquivo_questoes(helpers.DATA_DIR / "questoes.json")
+    )
+    salvar_indice(indice)
+    return indice
@@ -0,0 +1,425 @@
+"""
+Log de eventos do registro de estudos.
+
+Toda alteração no estudo é gravada como uma linha em estudo_eventos.jsonl
+(append-only). O estudo.json passa a ser um snapshot: guarda até qual
+evento (seq_eventos) e até qual byte do log (offset_eventos) já foi
+aplicado, e ao carregar apenas os eventos posteriores são reaplicados.
+A cada LIMITE_COMPACTACAO eventos o snapshot é regravado.
+
+Tipos de evento:
+- teoria_registrada:  tema, grande_area, data[, tema_id]
+- revisao_registrada: tema, revisao (r1/r2/r3/extra), data, questoes, acertos[, tema_id]
+- questao_respondida: questao_id, tema, tema_id, grande_area, resposta, correta
+- questao_marcada:    questao_id, marcada
+
+No backend SQLite o log é mantido apenas como histórico; cada evento é
+persistido diretamente nas linhas afetadas do banco.
+
+Os eventos de tema também atualizam o bloco de agregados do estudo
+(ver agregados_estudo). Estruturas derivadas do registro mantidas em
+outros módulos (fila de revisões, cobertura High-Yield) acompanham as
+gravações registrando-se em ao_alterar_estudo.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import helpers
+from .agregados_estudo import atualizar_agregados_tema
+
+ARQUIVO_EVENTOS = "estudo_eventos.jsonl"
+
+# Eventos aplicados desde o último snapshot que disparam uma compactação
+LIMITE_COMPACTACAO = 50
+
+TIPOS_EVENTO = (
+    "teoria_registrada",
+    "revisao_registrada",
+    "questao_respondida",
+    "questao_marcada"
+)
+
+# Eventos que alteram o registro de um tema
+TIPOS_TEMA = ("teoria_registrada", "revisao_registrada")
+
+_LOCK = threading.Lock()
+
+# Último estado conhecido do log: caminho -> (tamanho em bytes, último seq)
+_ESTADO_LOG: Dict[Path, Tuple[int, int]] = {}
+
+# Totais por dia já lidos do log: caminho -> ((st_dev, st_ino), offset, totais)
+# Funções avisadas a cada alteração do estudo (ver ao_alterar_estudo)
+Ouvinte = Callable[[Dict[str, Any], Optional[Dict[str, Any]]], None]
+_OUVINTES: List[Ouvinte] = []
+
+# Posição de um estudo no log: (diretório de dados, último seq aplicado)
+Posicao = Tuple[Path, int]
+
+_TOTAIS_DIA: Dict[Path, Tuple[Tuple[int, int], int, Dict[str, Dict[str, int]]]] = {}
+_LOCK_TOTAIS = threading.Lock()
+
+
+def caminho_eventos() -> Path:
+    """Caminho do log de eventos no diretório de dados."""
+    return helpers.DATA_DIR / ARQUIVO_EVENTOS
+
+
+def _ler_ultimo_seq(caminho: Path) -> int:
+    """
+    Lê o seq do último evento completo do log.
+
+    Uma escrita incompleta no fim do arquivo é descartada, para que o
+    próximo evento não seja anexado à mesma linha.
+    """
+    with open(caminho, "r+b") as f:
+        f.seek(0, os.SEEK_END)
+        tamanho = f.tell()
+        bloco = min(tamanho, 64 * 1024)
+        f.seek(tamanho - bloco)
+        linhas = f.read(bloco).split(b"\n")
+        if linhas[-1]:
+            f.truncate(tamanho - len(linhas[-1]))
+    for linha in reversed(linhas[:-1]):
+        if linha.strip():
+            return json.loads(linha)["seq"]
+    return 0
+
+
+def _ultimo_seq(caminho: Path) -> int:
+    try:
+        tamanho = caminho.stat().st_size
+    except FileNotFoundError:
+        return 0
+    estado = _ESTADO_LOG.get(caminho)
+    if estado is not None and estado[0] == tamanho:
+        return estado[1]
+    seq = _ler_ultimo_seq(caminho) if tamanho else 0
+    _ESTADO_LOG[caminho] = (caminho.stat().st_size, seq)
+    return seq
+
+
+def anexar_eventos(eventos: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Acrescenta eventos ao log e retorna-os com seq e timestamp atribuídos.
+
+    Todos os eventos da lista são gravados com uma única escrita.
+    """
+    caminho = caminho_eventos()
+    agora = datetime.now().isoformat()
+
+    with _LOCK:
+        seq = _ultimo_seq(caminho)
+        gravados = []
+        for tipo, dados in eventos:
+            if tipo not in TIPOS_EVENTO:
+                raise ValueError(f"Tipo de evento desconhecido: {tipo}")
+            seq += 1
+            gravados.append({"seq": seq, "ts": agora, "tipo": tipo, **dados})
+
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in gravados))
+            f.flush()
+            _ESTADO_LOG[caminho] = (f.tell(), seq)
+        helpers.registrar_escrita(caminho)
+
+    return gravados
+
+
+def ao_alterar_estudo(ouvinte: Ouvinte) -> Ouvinte:
+    """
+    Registra uma função avisada a cada alteração do estudo.
+
+    Ela recebe (estudo, evento) depois de cada evento aplicado por
+    aplicar_evento, inclusive na reaplicação ao carregar, e (estudo, None)
+    quando o estudo é regravado sem evento (salvar_estudo,
+    salvar_registro_tema). Pode ser usada como decorador.
+    """
+    _OUVINTES.append(ouvinte)
+    return ouvinte
+
+
+def notificar_alteracao(estudo: Dict[str, Any], evento: Optional[Dict[str, Any]] = None) -> None:
+    """Avisa os ouvintes de ao_alterar_estudo."""
+    for ouvinte in _OUVINTES:
+        ouvinte(estudo, evento)
+
+
+def posicao_estudo(estudo: Dict[str, Any]) -> Optional[Posicao]:
+    """
+    Posição do estudo no log, ou None se ele não veio do armazenamento.
+
+    Índices derivados guardam a posição que refletem: um estudo à frente
+    dela traz eventos que o índice não viu.
+    """
+    if "seq_eventos" not in estudo:
+        return None
+    return (helpers.DATA_DIR, estudo["seq_eventos"])
+
+
+def indice_atrasado(posicao_indice: Optional[Posicao], posicao: Optional[Posicao]) -> bool:
+    """
+    Indica se um índice derivado precisa percorrer o registro do estudo.
+
+    Sim se um dos dois não tem posição, se são de diretórios diferentes
+    ou se o estudo está à frente do índice.
+    """
+    if posicao is None or posicao_indice is None:
+        return True
+    return posicao_indice[0] != posicao[0] or posicao[1] > posicao_indice[1]
+
+
+def seguir_evento(posicao: Optional[Posicao], evento: Dict[str, Any]) -> Optional[Posicao]:
+    """
+    Posição de um índice depois de um evento avisado.
+
+    Retorna None se o evento não continua a posição (outro diretório de
+    dados ou eventos intermediários não vistos): o índice precisa então
+    ser sincronizado com o registro.
+    """
+    if posicao is None or posicao[0] != helpers.DATA_DIR or evento["seq"] > posicao[1] + 1:
+        return None
+    return (posicao[0], max(posicao[1], evento["seq"]))
+
+
+def aplicar_evento(estudo: Dict[str, Any], evento: Dict[str, Any]) -> None:
+    """Aplica um evento ao dicionário de estudo (em memória)."""
+    tipo = evento["tipo"]
+    registro = estudo.setdefault("registro_temas", {})
+
+    if tipo == "teoria_registrada":
+        tema = registro.setdefault(evento["tema"], {})
+        tema["data_teoria"] = evento["data"]
+        tema["grande_area"] = evento["grande_area"]
+        if evento.get("tema_id") is not None:
+            tema["tema_id"] = evento["tema_id"]
+
+    elif tipo == "revisao_registrada":
+        tema = registro.setdefault(evento["tema"], {})
+        if evento.get("grande_area") and "grande_area" not in tema:
+            tema["grande_area"] = evento["grande_area"]
+        if evento.get("tema_id") is not None and "tema_id" not in tema:
+            tema["tema_id"] = evento["tema_id"]
+
+        sessao = {
+            "data": evento["data"],
+            "questoes": evento["questoes"],
+            "acertos": evento["acertos"]
+        }
+        if evento["revisao"] == "extra":
+            tema.setdefault("extras", []).append(sessao)
+        else:
+            tema[evento["revisao"]] = sessao
+
+        stats = estudo.setdefault("estatisticas_gerais", {})
+        stats["total_questoes_feitas"] = stats.get("total_questoes_feitas", 0) + evento["questoes"]
+        stats["total_acertos"] = stats.get("total_acertos", 0) + evento["acertos"]
+
+    elif tipo == "questao_marcada":
+        marcadas = estudo.setdefault("questoes_marcadas_importantes", [])
+        qid = evento["questao_id"]
+        if evento["marcada"] and qid not in marcadas:
+            marcadas.append(qid)
+        elif not evento["marcada"] and qid in marcadas:
+            marcadas.remove(qid)
+
+    # questao_respondida não altera o snapshot: o total da sessão entra
+    # pela revisao_registrada correspondente.
+
+    if tipo in TIPOS_TEMA:
+        atualizar_agregados_tema(estudo, evento["tema"])
+
+    estudo["seq_eventos"] = evento["seq"]
+    estudo["ultima_atualizacao"] = evento["ts"]
+    notificar_alteracao(estudo, evento)
+
+
+def ler_eventos(offset: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """
+    Percorre o log a partir de um offset em bytes.
+
+    Produz (evento, offset_apos_evento). Uma última linha incompleta
+    (escrita interrompida) é ignorada.
+    """
+    caminho = caminho_eventos()
+    if not caminho.exists():
+        return
+    with open(caminho, "rb") as f:
+        f.seek(offset)
+        for linha in f:
+            if not linha.endswith(b"\n"):
+                break
+            offset += len(linha)
+            if linha.strip():
+                yield json.loads(linha), offset
+
+
+def reaplicar_eventos(estudo: Dict[str, Any]) -> Dict[str, Any]:
+    """Aplica ao snapshot todos os eventos do log ainda não incorporados."""
+    caminho = caminho_eventos()
+    offset = estudo.get("offset_eventos", 0)
+    try:
+        if offset > caminho.stat().st_size:
+            offset = 0  # log substituído: confiar apenas no seq
+    except FileNotFoundError:
+        return estudo
+
+    seq = estudo.get("seq_eventos", 0)
+    for evento, offset in ler_eventos(offset):
+        if evento["seq"] > seq:
+            aplicar_evento(estudo, evento)
+    estudo["offset_eventos"] = offset
+    return estudo
+
+
+def marcar_snapshot(estudo: Dict[str, Any]) -> None:
+    """
+    Marca um estudo sem posição no log como já contendo todos os eventos.
+
+    Usado ao gravar um estudo completo que não veio de carregar_estudo
+    (ex.: um registro novo), para que o histórico não seja reaplicado
+    sobre ele.
+    """
+    if "seq_eventos" in estudo:
+        estudo["snapshot_seq"] = estudo["seq_eventos"]
+        return
+    caminho = caminho_eventos()
+    with _LOCK:
+        estudo["seq_eventos"] = _ultimo_seq(caminho)
+        estudo["offset_eventos"] = caminho.stat().st_size if caminho.exists() else 0
+    estudo["snapshot_seq"] = estudo["seq_eventos"]
+
+
+def compactar() -> None:
+    """Regrava o estudo.json com todos os eventos já incorporados."""
+    estudo = reaplicar_eventos(helpers.carregar_json("estudo.json", copiar=True))
+    estudo["snapshot_seq"] = estudo.get("seq_eventos", 0)
+    helpers.salvar_json("estudo.json", estudo)
+
+
+def registrar_eventos(
+    estudo: Dict[str, Any],
+    eventos: List[Tuple[str, Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """
+    Registra eventos, atualiza o estudo em memória e persiste.
+
+    Escritas são O(1): no backend JSON apenas uma linha por evento é
+    acrescentada ao log (o snapshot é regravado a cada LIMITE_COMPACTACAO
+    eventos); no SQLite apenas as linhas afetadas são gravadas.
+    """
+    gravados = anexar_eventos(eventos)
+
+    if helpers.obter_backend_estudo() == "sqlite":
+        from .armazenamento_sqlite import marcar_questao_sqlite, salvar_tema_sqlite
+        for evento in gravados:
+            aplicar_evento(estudo, evento)
+        for evento in gravados:
+            if evento["tipo"] == "questao_marcada":
+                marcar_questao_sqlite(evento["questao_id"], evento["marcada"])
+        alterados = [e["tema"] for e in gravados if e["tipo"] in TIPOS_TEMA]
+        for tema in dict.fromkeys(alterados):
+            salvar_tema_sqlite(estudo, tema)
+        return gravados
+
+    # Incorpora também eventos de outras sessões gravados antes dos nossos
+    reaplicar_eventos(estudo)
+    if estudo.get("seq_eventos", 0) - estudo.get("snapshot_seq", 0) >= LIMITE_COMPACTACAO:
+        compactar()
+        estudo["snapshot_seq"] = estudo["seq_eventos"]
+    return gravados
+
+
+def registrar_evento(estudo: Dict[str, Any], tipo: str, **dados: Any) -> Dict[str, Any]:
+    """Registra um único evento (ver registrar_eventos)."""
+    return registrar_eventos(estudo, [(tipo, dados)])[0]
+
+
+def _chave_periodo(data: str, periodo: str) -> str:
+    if periodo == "dia":
+        return data[:10]
+    if periodo == "mes":
+        return data[:7]
+    ano, semana, _ = datetime.strptime(data[:10], "%Y-%m-%d").isocalendar()
+    return f"{ano}-W{semana:02d}"
+
+
+def _novo_item() -> Dict[str, int]:
+    return {
+        "questoes": 0, "acertos": 0, "revisoes": 0, "teorias": 0,
+        "respondidas": 0, "corretas": 0
+    }
+
+
+def _totais_por_dia() -> Dict[str, Dict[str, int]]:
+    """
+    Totais do log por dia, lendo apenas os eventos ainda não somados.
+
+    Os totais ficam em _TOTAIS_DIA junto com o offset já lido e a
+    identidade do arquivo (um log substituído é somado de novo).
+    """
+    caminho = caminho_eventos()
+    try:
+        info = caminho.stat()
+    except FileNotFoundError:
+        _TOTAIS_DIA.pop(caminho, None)
+        return {}
+    identidade = (info.st_dev, info.st_ino)
+
+    with _LOCK_TOTAIS:
+        estado = _TOTAIS_DIA.get(caminho)
+        if estado is None or estado[0] != identidade or estado[1] > info.st_size:
+            estado = (identidade, 0, {})
+        _, offset, por_dia = estado
+
+        for evento, offset in ler_eventos(offset):
+            tipo = evento["tipo"]
+            if tipo == "questao_marcada":
+                continue
+
+            data = evento.get("data") or evento["ts"]
+            item = por_dia.get(data[:10])
+            if item is None:
+                item = por_dia[data[:10]] = _novo_item()
+
+            if tipo == "revisao_registrada":
+                item["questoes"] += evento["questoes"]
+                item["acertos"] += evento["acertos"]
+                item["revisoes"] += 1
+            elif tipo == "teoria_registrada":
+                item["teorias"] += 1
+            elif tipo == "questao_respondida":
+                item["respondidas"] += 1
+                item["corretas"] += 1 if evento.get("correta") else 0
+
+        _TOTAIS_DIA[caminho] = (identidade, offset, por_dia)
+        return por_dia
+
+
+def agregar_eventos(periodo: str = "semana") -> Dict[str, Dict[str, int]]:
+    """
+    Agrega o histórico do log por dia, semana (ISO) ou mês.
+
+    Para cada período retorna questões e acertos registrados em revisões,
+    número de revisões e teorias, e questões respondidas individualmente
+    (com quantas corretas). Só os eventos anexados desde a chamada
+    anterior são lidos; os períodos saem dos totais por dia.
+    """
+    if periodo not in ("dia", "semana", "mes"):
+        raise ValueError(f"Período inválido: {periodo}")
+
+    agregados: Dict[str, Dict[str, int]] = {}
+    for dia, totais in _totais_por_dia().items():
+        chave = _chave_periodo(dia, periodo)
+        item = agregados.get(chave)
+        if item is None:
+            agregados[chave] = dict(totais)
+        else:
+            for campo, valor in totais.items():
+                item[campo] += valor
+
+    return dict(sorted(agregados.items()))
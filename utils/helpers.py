@@ -2,35 +2,367 @@
 Funções auxiliares para a aplicação de estudos.
 """
 
+import atexit
 import json
 import os
+import sys
+import tempfile
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
 
 # Diretório de dados
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+# Cache em processo dos JSONs já lidos.
+# Cada entrada guarda a assinatura do arquivo (mtime_ns, tamanho) no momento
+# da leitura; se o arquivo mudar em disco, a entrada é descartada.
+_CACHE_JSON: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+_CACHE_LOCK = threading.Lock()
+_CACHE_STATS = {"hits": 0, "misses": 0, "invalidacoes": 0}
 
-def carregar_json(nome_arquivo: str) -> Dict[str, Any]:
-    """Carrega um arquivo JSON do diretório de dados."""
+# Escrita adiada (write-behind): salvamentos feitos dentro da janela são
+# acumulados em _ESCRITAS_PENDENTES e gravados uma única vez por arquivo.
+# Janela None usa armazenamento.janela_escrita_segundos do config.json
+# (0 = gravação imediata, o padrão).
+_JANELA_ESCRITA: Optional[float] = None
+_ESCRITAS_PENDENTES: Dict[Path, Any] = {}
+_ESCRITA_LOCK = threading.RLock()
+_ESCRITA_TIMER: Optional[threading.Timer] = None
+_ESCRITA_STATS = {"gravacoes": 0, "adiadas": 0, "evitadas": 0}
+
+# Contador de escritas feitas pelo processo em cada arquivo de dados.
+# Junto com a assinatura em disco, forma a versão usada como chave pelos
+# caches das páginas (ver versao_arquivos).
+_VERSOES_ESCRITA: Dict[Path, int] = {}
+
+# umask do processo, lida uma vez (os.umask só consulta alterando o valor,
+# o que não é seguro com várias threads gravando)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _somente_leitura(self, *args: Any, **kwargs: Any) -> None:
+    raise TypeError("dados carregados são somente leitura; use copiar=True para alterar")
+
+
+class DicionarioCongelado(dict):
+    """dict somente leitura: qualquer alteração levanta TypeError."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _somente_leitura
+    clear = pop = popitem = setdefault = update = _somente_leitura
+
+    def __reduce__(self):
+        # Cópias (pickle, copy) são dicts comuns, que podem ser alterados
+        return (dict, (dict(self),))
+
+
+class ListaCongelada(list):
+    """list somente leitura: qualquer alteração levanta TypeError."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _somente_leitura
+    append = extend = insert = pop = remove = clear = sort = reverse = _somente_leitura
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def congelar(dados: Any) -> Any:
+    """
+    Cópia somente leitura de uma estrutura JSON, com strings internadas.
+    
+    Continua sendo dict/list (isinstance, ==, json.dumps funcionam), mas
+    pode ser compartilhada entre chamadas sem cópia defensiva.
+    """
+    if isinstance(dados, dict):
+        return DicionarioCongelado(
+            (sys.intern(k) if isinstance(k, str) else k, congelar(v)) for k, v in dados.items()
+        )
+    if isinstance(dados, (list, tuple)):
+        return ListaCongelada(congelar(v) for v in dados)
+    if isinstance(dados, str):
+        return sys.intern(dados)
+    return dados
+
+
+def e_congelado(dados: Any) -> bool:
+    """
+    True para estruturas de congelar (ex.: retornos de carregar_json).
+    
+    Como não mudam, caches derivados delas podem usar o próprio objeto
+    (identidade) como chave, sem serializar o conteúdo.
+    """
+    return isinstance(dados, (DicionarioCongelado, ListaCongelada))
+
+
+def _copiar_json(dados: Any) -> Any:
+    """Cópia profunda e alterável de uma estrutura JSON (dict/list/escalares)."""
+    if isinstance(dados, dict):
+        return {k: _copiar_json(v) for k, v in dados.items()}
+    if isinstance(dados, list):
+        return [_copiar_json(v) for v in dados]
+    return dados
+
+
+def _assinatura_arquivo(caminho: Path) -> Optional[Tuple[int, int]]:
+    """Retorna (mtime_ns, tamanho) do arquivo ou None se não existir."""
+    try:
+        st = caminho.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def carregar_json(nome_arquivo: str, copiar: bool = False) -> Dict[str, Any]:
+    """
+    Carrega um arquivo JSON do diretório de dados.
+    
+    O conteúdo é parseado e congelado (congelar) uma única vez por versão
+    do arquivo e mantido em cache no processo. Por padrão retorna essa
+    estrutura compartilhada, somente leitura, sem custo de cópia; quem
+    precisa alterar os dados pede copiar=True e recebe dicts/lists comuns.
+    """
     caminho = DATA_DIR / nome_arquivo
-    if caminho.exists():
-        with open(caminho, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+    
+    # Dados com escrita adiada ainda não estão em disco
+    with _ESCRITA_LOCK:
+        if caminho in _ESCRITAS_PENDENTES:
+            dados = _ESCRITAS_PENDENTES[caminho]
+            return _copiar_json(dados) if copiar else dados
+    
+    assinatura = _assinatura_arquivo(caminho)
+    if assinatura is None:
+        return {}
+    
+    with _CACHE_LOCK:
+        entrada = _CACHE_JSON.get(caminho)
+        if entrada is not None and entrada[0] == assinatura:
+            _CACHE_STATS["hits"] += 1
+            dados = entrada[1]
+        else:
+            _CACHE_STATS["misses"] += 1
+            with open(caminho, "r", encoding="utf-8") as f:
+                dados = congelar(json.load(f))
+            _CACHE_JSON[caminho] = (assinatura, dados)
+    
+    return _copiar_json(dados) if copiar else dados
 
 
-def salvar_json(nome_arquivo: str, dados: Dict[str, Any]) -> None:
-    """Salva dados em um arquivo JSON no diretório de dados."""
+def _modo_destino(caminho: Path) -> int:
+    """
+    Permissões para o arquivo gravado.
+    
+    mkstemp cria o temporário com 0600; o destino mantém as permissões que
+    já tinha ou, se for novo, recebe as de um open() comum (0666 & ~umask).
+    """
+    try:
+        return caminho.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def gravar_atomico(
+    caminho: Path,
+    escrever: Callable[[IO], None],
+    binario: bool = False
+) -> None:
+    """
+    Grava um arquivo via arquivo temporário + rename sobre o destino.
+    
+    escrever recebe o arquivo temporário aberto (texto UTF-8 ou binário).
+    O destino nunca fica truncado: leitores veem o conteúdo antigo ou o
+    novo, inteiro. Em caso de erro o temporário é removido.
+    """
+    fd, temporario = tempfile.mkstemp(
+        prefix=f".{caminho.name}.", suffix=".tmp", dir=caminho.parent
+    )
+    try:
+        with os.fdopen(fd, "wb" if binario else "w", encoding=None if binario else "utf-8") as f:
+            escrever(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temporario, _modo_destino(caminho))
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except FileNotFoundError:
+            pass
+        raise
+    registrar_escrita(caminho)
+    
+    # Persistir também a entrada do diretório (não suportado no Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(caminho.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _gravar_json_atomico(caminho: Path, dados: Any) -> None:
+    gravar_atomico(caminho, lambda f: json.dump(dados, f, ensure_ascii=False, indent=2))
+    _ESCRITA_STATS["gravacoes"] += 1
+
+
+def _janela_escrita() -> float:
+    """Janela de escrita adiada em segundos (0 = imediata)."""
+    if _JANELA_ESCRITA is not None:
+        return _JANELA_ESCRITA
+    config = carregar_json("config.json")
+    return float(config.get("armazenamento", {}).get("janela_escrita_segundos", 0))
+
+
+def salvar_json(nome_arquivo: str, dados: Dict[str, Any], imediato: bool = False) -> None:
+    """
+    Salva dados em um arquivo JSON no diretório de dados.
+    
+    A gravação é atômica. Com escrita adiada ativa, o conteúdo fica
+    pendente (visível para carregar_json) e salvamentos seguidos do mesmo
+    arquivo dentro da janela resultam em uma única gravação. imediato=True
+    ignora a janela e grava na hora.
+    """
+    global _ESCRITA_TIMER
     caminho = DATA_DIR / nome_arquivo
-    with open(caminho, "w", encoding="utf-8") as f:
-        json.dump(dados, f, ensure_ascii=False, indent=2)
+    janela = 0 if imediato else _janela_escrita()
+    
+    if janela <= 0:
+        with _ESCRITA_LOCK:
+            # Uma versão pendente mais antiga não deve sobrescrever esta
+            _ESCRITAS_PENDENTES.pop(caminho, None)
+            _gravar_json_atomico(caminho, dados)
+        invalidar_cache_json(nome_arquivo)
+        return
+    
+    with _ESCRITA_LOCK:
+        if caminho in _ESCRITAS_PENDENTES:
+            _ESCRITA_STATS["evitadas"] += 1
+        _ESCRITA_STATS["adiadas"] += 1
+        _ESCRITAS_PENDENTES[caminho] = congelar(dados)
+        registrar_escrita(caminho)
+        
+        if _ESCRITA_TIMER is None:
+            _ESCRITA_TIMER = threading.Timer(janela, descarregar_escritas)
+            _ESCRITA_TIMER.daemon = True
+            _ESCRITA_TIMER.start()
+
+
+def descarregar_escritas() -> int:
+    """
+    Grava imediatamente todas as escritas adiadas.
+    
+    Chamada pelo temporizador da janela e ao encerrar o processo.
+    Retorna quantos arquivos foram gravados.
+    """
+    global _ESCRITA_TIMER
+    with _ESCRITA_LOCK:
+        if _ESCRITA_TIMER is not None:
+            _ESCRITA_TIMER.cancel()
+            _ESCRITA_TIMER = None
+        
+        pendentes = list(_ESCRITAS_PENDENTES.items())
+        for caminho, dados in pendentes:
+            _gravar_json_atomico(caminho, dados)
+            del _ESCRITAS_PENDENTES[caminho]
+            _descartar_do_cache(caminho)
+    return len(pendentes)
+
+
+atexit.register(descarregar_escritas)
+
+
+def configurar_escrita_adiada(janela_segundos: Optional[float]) -> None:
+    """
+    Define a janela de escrita adiada, sobrepondo o config.json.
+    
+    0 desativa (gravando o que estiver pendente); None volta a usar a
+    configuração.
+    """
+    global _JANELA_ESCRITA
+    _JANELA_ESCRITA = janela_segundos
+    if janela_segundos == 0:
+        descarregar_escritas()
+
+
+def obter_estatisticas_escrita() -> Dict[str, int]:
+    """
+    Retorna os contadores de escrita.
+    
+    gravacoes: arquivos efetivamente gravados; adiadas: salvamentos que
+    passaram pelo buffer; evitadas: salvamentos substituídos por um mais
+    recente antes de chegar ao disco.
+    """
+    with _ESCRITA_LOCK:
+        return {**_ESCRITA_STATS, "pendentes": len(_ESCRITAS_PENDENTES)}
+
+
+def zerar_estatisticas_escrita() -> None:
+    """Zera os contadores de escrita."""
+    with _ESCRITA_LOCK:
+        for chave in _ESCRITA_STATS:
+            _ESCRITA_STATS[chave] = 0
+
+
+def registrar_escrita(caminho: Path) -> None:
+    """Marca que o processo alterou o arquivo (muda sua versão)."""
+    with _CACHE_LOCK:
+        _VERSOES_ESCRITA[caminho] = _VERSOES_ESCRITA.get(caminho, 0) + 1
+
+
+def versao_arquivos(*nomes_arquivos: str) -> Tuple[Any, ...]:
+    """
+    Versão atual de arquivos do diretório de dados.
+    
+    Combina a assinatura em disco (mtime_ns, tamanho), que detecta
+    alterações externas, com o contador de escritas do processo, que
+    muda a cada salvar_* (inclusive escritas adiadas, ainda fora do
+    disco). Serve de chave para caches: muda exatamente quando um dos
+    arquivos é gravado.
+    """
+    with _CACHE_LOCK:
+        return (str(DATA_DIR),) + tuple(
+            (nome, _assinatura_arquivo(DATA_DIR / nome), _VERSOES_ESCRITA.get(DATA_DIR / nome, 0))
+            for nome in nomes_arquivos
+        )
+
+
+def _descartar_do_cache(caminho: Path) -> None:
+    with _CACHE_LOCK:
+        if _CACHE_JSON.pop(caminho, None) is not None:
+            _CACHE_STATS["invalidacoes"] += 1
+
+
+def invalidar_cache_json(nome_arquivo: Optional[str] = None) -> None:
+    """Descarta do cache um arquivo (ou todos, se nome_arquivo for None)."""
+    if nome_arquivo is not None:
+        _descartar_do_cache(DATA_DIR / nome_arquivo)
+        return
+    with _CACHE_LOCK:
+        _CACHE_STATS["invalidacoes"] += len(_CACHE_JSON)
+        _CACHE_JSON.clear()
+
+
+def obter_estatisticas_cache_json() -> Dict[str, int]:
+    """Retorna os contadores do cache de JSON (hits, misses, invalidações)."""
+    with _CACHE_LOCK:
+        return {**_CACHE_STATS, "entradas": len(_CACHE_JSON)}
+
 
+def zerar_estatisticas_cache_json() -> None:
+    """Zera os contadores do cache de JSON."""
+    with _CACHE_LOCK:
+        for chave in _CACHE_STATS:
+            _CACHE_STATS[chave] = 0
 
-def carregar_config() -> Dict[str, Any]:
-    """Carrega as configurações do usuário."""
-    return carregar_json("config.json")
+
+def carregar_config(copiar: bool = False) -> Dict[str, Any]:
+    """Carrega as configurações do usuário (somente leitura, salvo copiar=True)."""
+    return carregar_json("config.json", copiar=copiar)
 
 
 def salvar_config(config: Dict[str, Any]) -> None:
@@ -38,69 +370,140 @@ def salvar_config(config: Dict[str, Any]) -> None:
     salvar_json("config.json", config)
 
 
+def obter_backend_estudo() -> str:
+    """
+    Retorna o backend de armazenamento do estudo: "json" (padrão) ou "sqlite".
+    
+    Definido em config.json, em armazenamento.estudo.
+    """
+    config = carregar_json("config.json")
+    return config.get("armazenamento", {}).get("estudo", "json")
+
+
 def carregar_estudo() -> Dict[str, Any]:
-    """Carrega o registro de estudos."""
-    return carregar_json("estudo.json")
+    """Carrega o registro de estudos (com o bloco de agregados)."""
+    from .agregados_estudo import garantir_agregados
+    if obter_backend_estudo() == "sqlite":
+        from .armazenamento_sqlite import carregar_estudo_sqlite, migrar_json_para_sqlite
+        migrar_json_para_sqlite()
+        estudo = carregar_estudo_sqlite()
+    else:
+        from .eventos_estudo import reaplicar_eventos
+        estudo = reaplicar_eventos(carregar_json("estudo.json", copiar=True))
+    garantir_agregados(estudo)
+    return estudo
+
+
+def _salvar_snapshot_estudo(estudo: Dict[str, Any]) -> None:
+    """Grava o estudo.json completo como snapshot do log de eventos."""
+    from .eventos_estudo import marcar_snapshot
+    marcar_snapshot(estudo)
+    salvar_json("estudo.json", estudo)
 
 
 def salvar_estudo(estudo: Dict[str, Any]) -> None:
     """Salva o registro de estudos."""
     estudo["ultima_atualizacao"] = datetime.now().isoformat()
-    salvar_json("estudo.json", estudo)
+    if obter_backend_estudo() == "sqlite":
+        from .armazenamento_sqlite import caminho_db, salvar_estudo_sqlite
+        salvar_estudo_sqlite(estudo)
+        registrar_escrita(caminho_db())
+    else:
+        _salvar_snapshot_estudo(estudo)
+    from .eventos_estudo import notificar_alteracao
+    notificar_alteracao(estudo)
 
 
-def carregar_temas() -> Dict[str, Any]:
+def salvar_registro_tema(estudo: Dict[str, Any], tema: str) -> None:
+    """
+    Salva o registro de um único tema e as estatísticas gerais.
+    
+    No backend SQLite grava apenas as linhas do tema; no JSON o arquivo
+    inteiro é reescrito.
+    """
+    estudo["ultima_atualizacao"] = datetime.now().isoformat()
+    if obter_backend_estudo() == "sqlite":
+        from .armazenamento_sqlite import caminho_db, salvar_tema_sqlite
+        salvar_tema_sqlite(estudo, tema)
+        registrar_escrita(caminho_db())
+    else:
+        _salvar_snapshot_estudo(estudo)
+    from .eventos_estudo import notificar_alteracao
+    notificar_alteracao(estudo)
+
+
+def alternar_questao_importante(
+    estudo: Dict[str, Any],
+    questao_id: Any,
+    marcada: Optional[bool] = None
+) -> bool:
+    """
+    Marca/desmarca uma questão como importante e registra a alteração.
+    
+    Se marcada for None, inverte o estado atual. Retorna o novo estado.
+    A alteração é gravada como um evento questao_marcada.
+    """
+    marcadas = estudo.setdefault("questoes_marcadas_importantes", [])
+    if marcada is None:
+        marcada = questao_id not in marcadas
+    
+    if marcada == (questao_id in marcadas):
+        return marcada
+    
+    from .eventos_estudo import registrar_evento
+    registrar_evento(estudo, "questao_marcada", questao_id=questao_id, marcada=marcada)
+    return marcada
+
+
+def carregar_temas(copiar: bool = False) -> Dict[str, Any]:
     """Carrega a lista de temas."""
-    return carregar_json("temas.json")
+    return carregar_json("temas.json", copiar=copiar)
 
 
-def carregar_pesos() -> Dict[str, Any]:
+def carregar_pesos(copiar: bool = False) -> Dict[str, Any]:
     """Carrega os pesos do ENAMED."""
-    return carregar_json("pesos_enamed.json")
+    return carregar_json("pesos_enamed.json", copiar=copiar)
 
 
-def carregar_calendario() -> Dict[str, Any]:
+def carregar_calendario(copiar: bool = False) -> Dict[str, Any]:
     """Carrega o calendário acadêmico."""
-    return carregar_json("calendario.json")
+    return carregar_json("calendario.json", copiar=copiar)
 
 
-def carregar_questoes() -> Dict[str, Any]:
+def carregar_questoes(copiar: bool = False) -> Dict[str, Any]:
     """Carrega o banco de questões."""
-    return carregar_json("questoes.json")
+    return carregar_json("questoes.json", copiar=copiar)
 
 
 def salvar_questoes(questoes: Dict[str, Any]) -> None:
-    """Salva o banco de questões."""
+    """Salva o banco de questões e recompila o formato colunar."""
+    from .banco_colunar import compilar_banco
     questoes["ultima_importacao"] = datetime.now().isoformat()
-    salvar_json("questoes.json", questoes)
+    salvar_json("questoes.json", questoes, imediato=True)
+    compilar_banco(questoes.get("questoes", []))
 
 
-def calcular_dias_ate_prova(data_prova: str) -> int:
+def calcular_dias_ate_prova(data_prova: str, hoje: Optional[datetime] = None) -> int:
     """Calcula quantos dias faltam até a prova."""
     prova = datetime.strptime(data_prova, "%Y-%m-%d")
-    hoje = datetime.now()
+    if hoje is None:
+        hoje = datetime.now()
     return (prova - hoje).days
 
 
-def calcular_semanas_ate_prova(data_prova: str) -> int:
+def calcular_semanas_ate_prova(data_prova: str, hoje: Optional[datetime] = None) -> int:
     """Calcula quantas semanas faltam até a prova."""
-    dias = calcular_dias_ate_prova(data_prova)
+    dias = calcular_dias_ate_prova(data_prova, hoje)
     return max(1, dias // 7)
 
 
-def obter_rodizio_atual(calendario: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Retorna o rodízio atual baseado na data."""
-    hoje = datetime.now().date()
-    
-    for ano, rodizios in calendario.items():
-        if isinstance(rodizios, dict):
-            for ano_num, lista_rodizios in rodizios.items():
-                for rodizio in lista_rodizios:
-                    inicio = datetime.strptime(rodizio["inicio"], "%Y-%m-%d").date()
-                    fim = datetime.strptime(rodizio["fim"], "%Y-%m-%d").date()
-                    if inicio <= hoje <= fim:
-                        return rodizio
-    return None
+def obter_rodizio_atual(
+    calendario: Dict[str, Any],
+    hoje: Optional[datetime] = None
+) -> Optional[Dict[str, Any]]:
+    """Retorna o rodízio atual baseado na data (ver rodizios.IndiceRodizios)."""
+    from .rodizios import obter_indice_rodizios
+    return obter_indice_rodizios(calendario).no_dia((hoje or datetime.now()).date())
 
 
 def calcular_porcentagem_acerto(acertos: int, total: int) -> float:
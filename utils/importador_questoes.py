@@ -0,0 +1,347 @@
+"""
+Importação de bancos de questões em streaming.
+
+O array "questoes" do JSON é lido questão a questão (json.JSONDecoder
+.raw_decode sobre blocos do arquivo), cada registro é validado e
+normalizado, e o novo questoes.json é escrito à medida que os registros
+chegam. A memória usada é limitada ao tamanho de um bloco mais o maior
+registro, independentemente do tamanho do arquivo.
+
+Registros inválidos são reportados individualmente e não interrompem a
+importação; apenas um erro de sintaxe do JSON a cancela (o questoes.json
+anterior é preservado). Questões já existentes no banco são detectadas
+pelo índice de duplicatas (ver deduplicacao).
+"""
+
+import io
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, Optional, Tuple
+
+from . import helpers
+from .deduplicacao import (
+    CONFLITANTE, NOVA, IndiceDuplicatas, carregar_indice, salvar_indice
+)
+
+# Tamanho dos blocos lidos do arquivo (caracteres)
+TAMANHO_BLOCO = 1 << 20
+
+# Tamanho máximo de um único registro antes de considerar o JSON inválido
+LIMITE_REGISTRO = 16 << 20
+
+# Quantos erros são guardados com detalhes no resultado
+MAX_ERROS_DETALHADOS = 500
+
+# Intervalo (em registros) entre chamadas do callback de progresso
+INTERVALO_PROGRESSO = 200
+
+_ESPACOS = re.compile(r"[ \t\n\r]*")
+_GABARITO = re.compile(r"^\(?([A-Za-z])\)?[.)]?$")
+
+
+class _LeitorJson:
+    """Leitor incremental de valores JSON sobre um arquivo de texto."""
+
+    def __init__(self, arquivo: IO[str], tamanho_bloco: int = TAMANHO_BLOCO):
+        self._arquivo = arquivo
+        self._tamanho_bloco = tamanho_bloco
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._fim = False
+
+    def _ler_bloco(self) -> bool:
+        bloco = self._arquivo.read(self._tamanho_bloco)
+        if not bloco:
+            self._fim = True
+            return False
+        self._buffer = self._buffer[self._pos:] + bloco
+        self._pos = 0
+        return True
+
+    def proximo_caractere(self) -> str:
+        """Próximo caractere que não é espaço ("" no fim do arquivo)."""
+        while True:
+            self._pos = _ESPACOS.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._ler_bloco():
+                break
+        return self._buffer[self._pos:self._pos + 1]
+
+    def consumir(self, esperado: str) -> None:
+        encontrado = self.proximo_caractere()
+        if encontrado != esperado:
+            raise ValueError(
+                f"JSON inválido: esperado '{esperado}', encontrado '{encontrado or 'fim do arquivo'}'"
+            )
+        self._pos += 1
+
+    def valor(self) -> Any:
+        """Decodifica o próximo valor JSON completo."""
+        self.proximo_caractere()
+        while True:
+            try:
+                valor, fim = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if len(self._buffer) - self._pos > LIMITE_REGISTRO or not self._ler_bloco():
+                    raise ValueError(f"JSON inválido: {e.msg}") from None
+                continue
+            # Um número no fim do buffer pode continuar no próximo bloco
+            if fim == len(self._buffer) and not self._fim and self._ler_bloco():
+                continue
+            self._pos = fim
+            return valor
+
+
+def iterar_questoes(arquivo: IO[str], tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[Any]:
+    """
+    Percorre os itens do array "questoes" de um JSON sem carregá-lo inteiro.
+
+    Aceita também um array de questões no nível raiz. Outros campos do
+    objeto raiz são ignorados.
+    """
+    leitor = _LeitorJson(arquivo, tamanho_bloco)
+
+    if leitor.proximo_caractere() != "[":
+        leitor.consumir("{")
+        while True:
+            if leitor.proximo_caractere() == "}":
+                raise ValueError("Formato inválido: campo 'questoes' não encontrado")
+            chave = leitor.valor()
+            leitor.consumir(":")
+            if chave == "questoes":
+                break
+            leitor.valor()
+            if leitor.proximo_caractere() != "}":
+                leitor.consumir(",")
+
+    leitor.consumir("[")
+    if leitor.proximo_caractere() == "]":
+        return
+    while True:
+        yield leitor.valor()
+        if leitor.proximo_caractere() != ",":
+            leitor.consumir("]")
+            return
+        leitor.consumir(",")
+
+
+def iterar_arquivo_questoes(caminho: Path) -> Iterator[Any]:
+    """Percorre as questões de um arquivo em disco (vazio se não existir)."""
+    if not caminho.exists():
+        return
+    with open(caminho, "r", encoding="utf-8-sig") as f:
+        yield from iterar_questoes(f)
+
+
+def _texto(valor: Any, campo: str) -> str:
+    if not isinstance(valor, str):
+        raise ValueError(f"'{campo}' deve ser texto")
+    return valor.strip()
+
+
+def normalizar_questao(questao: Any) -> Dict[str, Any]:
+    """
+    Valida um registro de questão e retorna uma cópia normalizada.
+
+    Exige enunciado, ao menos duas alternativas e um gabarito entre as
+    letras das alternativas. Textos têm espaços das pontas removidos,
+    o gabarito vira uma letra maiúscula ("(b)" -> "B") e campos opcionais
+    vazios são descartados. Levanta ValueError com o motivo da rejeição.
+    """
+    if not isinstance(questao, dict):
+        raise ValueError("registro não é um objeto")
+    q = dict(questao)
+
+    if "id" in q:
+        if isinstance(q["id"], str):
+            q["id"] = q["id"].strip()
+        if q["id"] in ("", None) or not isinstance(q["id"], (str, int)):
+            raise ValueError("'id' inválido")
+
+    q["enunciado"] = _texto(q.get("enunciado", ""), "enunciado")
+    if not q["enunciado"]:
+        raise ValueError("enunciado ausente")
+
+    alternativas = q.get("alternativas")
+    if not isinstance(alternativas, list):
+        raise ValueError("'alternativas' deve ser uma lista")
+    q["alternativas"] = [_texto(a, "alternativas") for a in alternativas]
+    if len(q["alternativas"]) < 2 or not all(q["alternativas"]):
+        raise ValueError("são necessárias ao menos duas alternativas não vazias")
+
+    gabarito = _GABARITO.match(_texto(q.get("gabarito", ""), "gabarito"))
+    if not gabarito:
+        raise ValueError("gabarito ausente ou inválido")
+    q["gabarito"] = gabarito.group(1).upper()
+    if ord(q["gabarito"]) - ord("A") >= len(q["alternativas"]):
+        raise ValueError(f"gabarito {q['gabarito']} fora das alternativas")
+
+    for campo in ("tema", "grande_area", "banca"):
+        if campo in q:
+            q[campo] = _texto(q[campo], campo)
+            if not q[campo]:
+                del q[campo]
+
+    return q
+
+
+def _registrar_erro(resultado: Dict[str, Any], indice: int, questao: Any, erro: str) -> None:
+    resultado["total_erros"] += 1
+    if len(resultado["erros"]) < MAX_ERROS_DETALHADOS:
+        resultado["erros"].append({
+            "indice": indice,
+            "id": questao.get("id") if isinstance(questao, dict) else None,
+            "erro": erro
+        })
+
+
+def _percorrer_importacao(
+    arquivo: IO[bytes],
+    indice: IndiceDuplicatas,
+    resultado: Dict[str, Any],
+    progresso: Optional[Callable[[int, int], None]],
+    tamanho_total: Optional[int]
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Lê, normaliza e classifica as questões do arquivo.
+
+    Produz (situacao, questao) para cada registro válido; erros e
+    duplicatas/conflitos são contabilizados em resultado.
+    """
+    inicio = arquivo.tell()
+    if tamanho_total is None:
+        tamanho_total = arquivo.seek(0, io.SEEK_END) - inicio
+        arquivo.seek(inicio)
+
+    texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig")
+    try:
+        for i, bruto in enumerate(iterar_questoes(texto)):
+            if progresso and i % INTERVALO_PROGRESSO == 0:
+                progresso(arquivo.tell() - inicio, tamanho_total)
+            try:
+                q = normalizar_questao(bruto)
+            except ValueError as e:
+                _registrar_erro(resultado, i, bruto, str(e))
+                continue
+
+            situacao, existente = indice.classificar(q)
+            resultado[f"{situacao}s"] += 1
+            if existente is not None and len(resultado["repetidas"]) < MAX_ERROS_DETALHADOS:
+                resultado["repetidas"].append({
+                    "indice": i,
+                    "id": q.get("id"),
+                    "situacao": situacao,
+                    "id_existente": existente[1],
+                    "gabarito": q["gabarito"],
+                    "gabarito_existente": existente[0]
+                })
+            yield situacao, q
+    finally:
+        # Não fechar o arquivo do chamador junto com o wrapper
+        texto.detach()
+
+    if progresso:
+        progresso(tamanho_total, tamanho_total)
+
+
+def _novo_resultado() -> Dict[str, Any]:
+    return {
+        "novas": 0, "duplicadas": 0, "conflitantes": 0, "repetidas": [],
+        "erros": [], "total_erros": 0
+    }
+
+
+def analisar_importacao(arquivo: IO[bytes], substituir: bool = False) -> Dict[str, Any]:
+    """
+    Relatório de deduplicação de um arquivo, sem alterar o banco.
+
+    Cada questão válida é classificada como nova, duplicada ou com
+    gabarito conflitante em relação ao banco atual (ou, com
+    substituir=True, apenas às anteriores do próprio arquivo). O arquivo
+    é devolvido à posição inicial.
+
+    Retorna {"novas", "duplicadas", "conflitantes", "repetidas": [...],
+    "erros": [...], "total_erros"}.
+    """
+    indice = IndiceDuplicatas() if substituir else carregar_indice()
+    resultado = _novo_resultado()
+
+    inicio = arquivo.tell()
+    for situacao, q in _percorrer_importacao(arquivo, indice, resultado, None, None):
+        if situacao == NOVA:
+            indice.adicionar(q)
+    arquivo.seek(inicio)
+    return resultado
+
+
+def importar_questoes(
+    arquivo: IO[bytes],
+    substituir: bool = False,
+    progresso: Optional[Callable[[int, int], None]] = None,
+    tamanho_total: Optional[int] = None,
+    incluir_conflitantes: bool = False,
+    vincular_tema: Optional[Callable[[Dict[str, Any]], Any]] = None
+) -> Dict[str, Any]:
+    """
+    Importa um arquivo JSON de questões para o questoes.json.
+
+    As questões existentes são copiadas em streaming (a menos que
+    substituir=True), seguidas das importadas válidas e novas. Duplicadas
+    são sempre ignoradas; questões com gabarito conflitante só entram com
+    incluir_conflitantes=True. O arquivo final é gravado atomicamente e o
+    banco colunar e os índices de duplicatas e de similaridade são
+    atualizados.
+
+    progresso(bytes_lidos, tamanho_total) é chamado periodicamente.
+    vincular_tema(questao), se informado, é aplicado a cada questão
+    gravada (existentes e importadas), por exemplo para gravar o
+    tema_id do catálogo (ver core.ids_temas.vincular_questao).
+    Retorna os contadores de analisar_importacao mais "importadas",
+    "existentes" e "total".
+    """
+    from .banco_colunar import compilar_banco
+    from .similaridade import construir_indice_similaridade
+
+    # Garante que o questoes.json em disco é a versão mais recente
+    helpers.descarregar_escritas()
+    caminho = helpers.DATA_DIR / "questoes.json"
+
+    indice = IndiceDuplicatas() if substituir else carregar_indice()
+    resultado = {**_novo_resultado(), "importadas": 0, "existentes": 0, "total": 0}
+
+    def escrever(f) -> None:
+        separador = ""
+
+        def gravar(q: Dict[str, Any]) -> None:
+            nonlocal separador
+            if vincular_tema is not None:
+                vincular_tema(q)
+            f.write(separador + "    " + json.dumps(q, ensure_ascii=False))
+            separador = ",\n"
+
+        f.write('{\n  "questoes": [\n')
+
+        if not substituir:
+            for q in iterar_arquivo_questoes(caminho):
+                gravar(q)
+                resultado["existentes"] += 1
+
+        for situacao, q in _percorrer_importacao(arquivo, indice, resultado, progresso, tamanho_total):
+            if situacao == NOVA or (situacao == CONFLITANTE and incluir_conflitantes):
+                gravar(q)
+                indice.adicionar(q)
+                resultado["importadas"] += 1
+
+        resultado["total"] = resultado["existentes"] + resultado["importadas"]
+        f.write("\n  ],\n")
+        f.write(f'  "total": {resultado["total"]},\n')
+        f.write(f'  "ultima_importacao": "{datetime.now().isoformat()}"\n}}\n')
+
+    helpers.gravar_atomico(caminho, escrever)
+    helpers.invalidar_cache_json("questoes.json")
+    salvar_indice(indice)
+    compilar_banco()
+    construir_indice_similaridade()
+    return resultado
@@ -0,0 +1,106 @@
+"""
+Modo rápido de resolução de questões.
+
+No modo normal cada clique (alternativa, gabarito, próxima) é uma ida ao
+servidor e um rerun. No modo rápido o lote de questões da sessão vai
+uma única vez, com os gabaritos, para um componente HTML estático
+(componentes/resolver_rapido) que marca, corrige e navega no navegador.
+
+O componente devolve as respostas em um único envio a cada
+sincronizar_a_cada questões respondidas e ao finalizar (0 = só ao
+finalizar). Cada envio traz todas as respostas até ali, então aplicar o
+mesmo envio de novo não muda nada; a correção é refeita no servidor com
+os gabaritos do lote, sem confiar no que o navegador informa.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import streamlit.components.v1 as components
+
+PASTA_COMPONENTE = Path(__file__).parent / "componentes" / "resolver_rapido"
+
+SINCRONIZAR_A_CADA_PADRAO = 5
+
+_MARCADOR = re.compile(r'\(?([A-Ea-e])\)?')
+
+_componente = components.declare_component("resolver_rapido", path=str(PASTA_COMPONENTE))
+
+
+def letra_alternativa(alternativa: str) -> str:
+    """Letra de uma alternativa ("(A) ...", "A) ...", "A. ..."), em maiúscula."""
+    if not alternativa:
+        return ""
+    match = _MARCADOR.search(alternativa[:5])
+    if match:
+        return match.group(1).upper()
+    return alternativa[0].upper() if alternativa[0].isalpha() else ""
+
+
+def preparar_lote(questoes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Questões no formato enviado ao componente (só os campos exibidos)."""
+    return [
+        {
+            "id": questao.get("id"),
+            "tema": questao.get("tema", "Tema não informado"),
+            "banca": questao.get("banca", ""),
+            "enunciado": questao.get("enunciado", "Enunciado não disponível"),
+            "alternativas": [
+                {"letra": letra_alternativa(alt), "texto": alt}
+                for alt in questao.get("alternativas", [])
+            ],
+            "gabarito": str(questao.get("gabarito", "")).strip().upper()
+        }
+        for questao in questoes
+    ]
+
+
+def mesclar_respostas(respostas: Dict[int, Dict[str, Any]],
+                      enviadas: Dict[str, str],
+                      lote: List[Dict[str, Any]]) -> int:
+    """
+    Aplica as respostas de um envio do componente às respostas da sessão.
+
+    enviadas mapeia a posição da questão no lote (string, vinda do JSON)
+    à letra marcada. Posições e letras inválidas são ignoradas. Retorna
+    quantas respostas foram incluídas ou alteradas.
+    """
+    alteradas = 0
+    for posicao, letra in (enviadas or {}).items():
+        try:
+            indice = int(posicao)
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= indice < len(lote):
+            continue
+        letras = {alt["letra"] for alt in lote[indice]["alternativas"]}
+        letra = str(letra).strip().upper()
+        if letra not in letras:
+            continue
+
+        resposta = {"resposta": letra, "correta": letra == lote[indice]["gabarito"]}
+        if respostas.get(indice) != resposta:
+            respostas[indice] = resposta
+            alteradas += 1
+    return alteradas
+
+
+def resolver_rapido(lote: List[Dict[str, Any]],
+                    respostas: Dict[int, Dict[str, Any]],
+                    sincronizar_a_cada: int = SINCRONIZAR_A_CADA_PADRAO,
+                    chave: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Exibe o componente com o lote e retorna o último envio (ou None).
+
+    O envio é {"respostas": {posição: letra}, "importantes": [posições],
+    "finalizado": bool}. respostas (as já conhecidas pelo servidor)
+    restauram o estado do componente quando a página é recarregada.
+    """
+    return _componente(
+        questoes=lote,
+        respostas={str(i): r["resposta"] for i, r in respostas.items()},
+        sincronizar_a_cada=int(sincronizar_a_cada),
+        key=chave,
+        default=None
+    )
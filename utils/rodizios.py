@@ -0,0 +1,122 @@
+"""
+Índice de rodízios do calendário acadêmico.
+
+As datas de todos os rodízios (de qualquer número de anos) são
+convertidas uma única vez por versão do calendario.json e ordenadas pelo
+início, para que as consultas por data, por intervalo e por semana sejam
+buscas binárias em vez de varreduras com strptime.
+
+O calendário tem o formato {"ano_N": {"AAAA": [rodizio, ...]}}; listas de
+rodízios diretamente sob uma chave de nível superior também são aceitas.
+"""
+
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import helpers
+
+_LOCK = threading.Lock()
+_INDICE: Optional[Tuple[Any, str, "IndiceRodizios"]] = None
+
+
+def _listar_rodizios(calendario: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Rodízios do calendário na ordem em que aparecem no arquivo."""
+    rodizios = []
+    for valor in calendario.values():
+        listas = valor.values() if isinstance(valor, dict) else [valor]
+        for lista in listas:
+            if isinstance(lista, (list, tuple)):
+                rodizios.extend(r for r in lista if isinstance(r, dict))
+    return rodizios
+
+
+def _data(texto: Any) -> Optional[date]:
+    try:
+        return datetime.strptime(texto, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+class IndiceRodizios:
+    """
+    Rodízios ordenados por data de início, com buscas por bisect.
+
+    Rodízios sem datas válidas são ignorados. Se houver sobreposição,
+    vale o rodízio que aparece primeiro no calendário (como na varredura
+    original).
+    """
+
+    def __init__(self, calendario: Dict[str, Any]):
+        entradas = []
+        for ordem, rodizio in enumerate(_listar_rodizios(calendario)):
+            inicio, fim = _data(rodizio.get("inicio")), _data(rodizio.get("fim"))
+            if inicio and fim:
+                entradas.append((inicio, fim, ordem, rodizio))
+        entradas.sort(key=lambda e: (e[0], e[2]))
+
+        self.inicios: List[date] = [e[0] for e in entradas]
+        self.fins: List[date] = [e[1] for e in entradas]
+        self._ordem: List[int] = [e[2] for e in entradas]
+        self.rodizios: List[Dict[str, Any]] = [e[3] for e in entradas]
+
+        # Maior fim entre os rodízios [0..i] (não decrescente), para
+        # descartar de uma vez todos os que terminam antes de uma data
+        self._maior_fim: List[date] = []
+        for fim in self.fins:
+            self._maior_fim.append(max(fim, self._maior_fim[-1]) if self._maior_fim else fim)
+
+    def __len__(self) -> int:
+        return len(self.rodizios)
+
+    def _posicoes(self, inicio: date, fim: date) -> range:
+        """Posições candidatas a sobrepor [inicio, fim]."""
+        return range(bisect_left(self._maior_fim, inicio), bisect_right(self.inicios, fim))
+
+    def no_dia(self, dia: date) -> Optional[Dict[str, Any]]:
+        """Rodízio em andamento no dia (ou None)."""
+        melhor = None
+        for i in self._posicoes(dia, dia):
+            if self.fins[i] >= dia and (melhor is None or self._ordem[i] < self._ordem[melhor]):
+                melhor = i
+        return self.rodizios[melhor] if melhor is not None else None
+
+    def sobrepostos(self, inicio: date, fim: date) -> List[Dict[str, Any]]:
+        """Rodízios que têm ao menos um dia em [inicio, fim], por data de início."""
+        return [self.rodizios[i] for i in self._posicoes(inicio, fim) if self.fins[i] >= inicio]
+
+    def por_semana(self, primeira_semana: date, semanas: int) -> List[Optional[Dict[str, Any]]]:
+        """
+        Rodízio de cada uma das semanas a partir de primeira_semana.
+
+        Vale o rodízio em andamento no primeiro dia da semana ou, se não
+        houver, no último (semanas de transição de/para férias).
+        """
+        resultado = []
+        for n in range(semanas):
+            inicio = primeira_semana + timedelta(weeks=n)
+            resultado.append(self.no_dia(inicio) or self.no_dia(inicio + timedelta(days=6)))
+        return resultado
+
+
+def obter_indice_rodizios(calendario: Dict[str, Any]) -> IndiceRodizios:
+    """
+    Índice do calendário, reconstruído apenas quando o conteúdo muda.
+
+    O calendário congelado de carregar_json é reconhecido por identidade;
+    dicts comuns são comparados pelo conteúdo serializado.
+    """
+    global _INDICE
+    with _LOCK:
+        if _INDICE is not None and _INDICE[0] is calendario and helpers.e_congelado(calendario):
+            return _INDICE[2]
+
+    versao = json.dumps(calendario, sort_keys=True, ensure_ascii=False)
+    with _LOCK:
+        if _INDICE is None or _INDICE[1] != versao:
+            _INDICE = (calendario, versao, IndiceRodizios(calendario))
+        else:
+            _INDICE = (calendario, versao, _INDICE[2])
+        return _INDICE[2]
@@ -0,0 +1,307 @@
+"""
+Detecção de questões quase duplicadas (MinHash + LSH).
+
+Cada questão vira um conjunto de shingles (trigramas de palavras do
+enunciado normalizado e cada alternativa normalizada, sem marcador e sem
+ordem) e é resumida por uma assinatura MinHash de NUM_PERMUTACOES
+valores. A assinatura é dividida em BANDAS faixas; questões com uma
+faixa idêntica são candidatas, e candidatas com similaridade estimada
+(fração de valores iguais) >= LIMIAR_SIMILARIDADE são unidas no mesmo
+grupo (union-find). O custo é proporcional ao número de questões, não
+ao número de pares.
+
+O índice (assinaturas e grupos) fica em questoes.minhash.npz, alinhado
+por posição ao questoes.json e ao banco colunar.
+"""
+
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from . import helpers
+from .deduplicacao import normalizar_alternativa, normalizar_texto
+
+ARQUIVO_INDICE = "questoes.minhash.npz"
+
+NUM_PERMUTACOES = 64
+BANDAS = 16
+LINHAS_POR_BANDA = NUM_PERMUTACOES // BANDAS
+
+# Similaridade de Jaccard estimada mínima para duas questões serem agrupadas
+LIMIAR_SIMILARIDADE = 0.7
+
+# Questões processadas por lote ao calcular assinaturas
+TAMANHO_LOTE = 2000
+
+# Permutações calculadas por vez sobre os shingles do lote (limita os
+# temporários a PERMUTACOES_POR_VEZ x shingles do lote)
+PERMUTACOES_POR_VEZ = 8
+
+# Funções de hash h(x) = (a*x + b) mod PRIMO, fixas para que assinaturas
+# calculadas em momentos diferentes sejam comparáveis
+PRIMO = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20240917)
+_A = _rng.integers(1, int(PRIMO), NUM_PERMUTACOES, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, int(PRIMO), NUM_PERMUTACOES, dtype=np.uint64)[:, None]
+
+# Assinatura de questões sem texto (nunca agrupadas)
+SEM_TEXTO = np.uint32(np.iinfo(np.uint32).max)
+
+# Multiplicador ímpar que combina os valores de uma banda em uma chave de
+# 64 bits (colisões só acrescentam candidatos, conferidos pela assinatura)
+_MISTURA = np.uint64(0x9E3779B97F4A7C15)
+
+_LOCK = threading.Lock()
+_INDICES: Dict[Path, "IndiceSimilaridade"] = {}
+
+
+def shingles(questao: Dict[str, Any]) -> np.ndarray:
+    """Hashes (crc32) dos shingles da questão, sem repetição."""
+    palavras = normalizar_texto(str(questao.get("enunciado", ""))).split()
+    if len(palavras) >= 3:
+        conjunto = {" ".join(palavras[i:i + 3]) for i in range(len(palavras) - 2)}
+    else:
+        conjunto = set(palavras)
+    for alternativa in questao.get("alternativas", []):
+        texto = normalizar_alternativa(alternativa)
+        if texto:
+            conjunto.add("alt:" + texto)
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in conjunto), dtype=np.uint64, count=len(conjunto)
+    )
+
+
+def calcular_assinaturas(questoes: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """
+    Assinaturas MinHash (n x NUM_PERMUTACOES, uint32) das questões.
+
+    Os shingles de um lote de questões são concatenados e o mínimo por
+    questão é obtido com np.minimum.reduceat, sem laço por questão. As
+    permutações são calculadas PERMUTACOES_POR_VEZ de cada vez sobre um
+    buffer reaproveitado.
+    """
+    blocos: List[np.ndarray] = []
+    lote: List[np.ndarray] = []
+
+    def processar() -> None:
+        tamanhos = np.array([len(s) for s in lote])
+        assinaturas = np.full((len(lote), NUM_PERMUTACOES), SEM_TEXTO, dtype=np.uint32)
+        com_texto = tamanhos > 0
+        if com_texto.any():
+            valores = np.concatenate([s for s in lote if len(s)])
+            inicios = np.concatenate(([0], np.cumsum(tamanhos[com_texto])[:-1]))
+            minimos = np.empty((NUM_PERMUTACOES, len(inicios)), dtype=np.uint32)
+            hashes = np.empty((PERMUTACOES_POR_VEZ, len(valores)), dtype=np.uint64)
+            for i in range(0, NUM_PERMUTACOES, PERMUTACOES_POR_VEZ):
+                faixa = slice(i, i + PERMUTACOES_POR_VEZ)
+                parcial = hashes[:len(_A[faixa])]
+                np.multiply(_A[faixa], valores[None, :], out=parcial)
+                np.add(parcial, _B[faixa], out=parcial)
+                np.remainder(parcial, PRIMO, out=parcial)
+                minimos[faixa] = np.minimum.reduceat(parcial, inicios, axis=1)
+            assinaturas[com_texto] = minimos.T
+        blocos.append(assinaturas)
+        lote.clear()
+
+    for q in questoes:
+        lote.append(shingles(q))
+        if len(lote) >= TAMANHO_LOTE:
+            processar()
+    if lote:
+        processar()
+
+    if not blocos:
+        return np.empty((0, NUM_PERMUTACOES), dtype=np.uint32)
+    return np.concatenate(blocos)
+
+
+def chaves_bandas(assinaturas: np.ndarray) -> np.ndarray:
+    """Chave (uint64) de cada banda de cada assinatura: n x BANDAS."""
+    faixas = assinaturas.reshape(len(assinaturas), BANDAS, LINHAS_POR_BANDA).astype(np.uint64)
+    chaves = faixas[:, :, 0].copy()
+    for j in range(1, LINHAS_POR_BANDA):
+        chaves *= _MISTURA
+        chaves ^= faixas[:, :, j]
+    return chaves
+
+
+def _raiz(pais: np.ndarray, i: int) -> int:
+    while pais[i] != i:
+        pais[i] = pais[pais[i]]
+        i = pais[i]
+    return i
+
+
+def agrupar(assinaturas: np.ndarray, limiar: float = LIMIAR_SIMILARIDADE) -> np.ndarray:
+    """
+    Rótulo de grupo (0..k-1) de cada questão, via LSH por bandas.
+
+    Em cada balde de uma banda, os membros são comparados apenas com o
+    primeiro; pares que escapam de uma banda costumam se encontrar em outra.
+    Baldes de uma questão só são descartados antes do laço.
+    """
+    n = len(assinaturas)
+    pais = np.arange(n)
+    com_texto = np.flatnonzero(assinaturas[:, 0] != SEM_TEXTO) if n else np.empty(0, dtype=np.int64)
+    chaves = chaves_bandas(assinaturas[com_texto])
+
+    for banda in range(BANDAS):
+        _, baldes, tamanhos = np.unique(chaves[:, banda], return_inverse=True, return_counts=True)
+        repetidos = tamanhos[baldes] >= 2
+        if not repetidos.any():
+            continue
+        baldes = baldes[repetidos]
+        ordem = np.argsort(baldes, kind="stable")
+        fronteiras = np.cumsum(tamanhos[tamanhos >= 2])[:-1]
+
+        for membros in np.split(com_texto[repetidos][ordem], fronteiras):
+            primeiro, outros = membros[0], membros[1:]
+            similares = (assinaturas[outros] == assinaturas[primeiro]).mean(axis=1) >= limiar
+            raiz = _raiz(pais, primeiro)
+            for outro in outros[similares]:
+                r = _raiz(pais, outro)
+                if r != raiz:
+                    pais[r] = raiz
+
+    # Raízes de todos de uma vez (saltos de ponteiro até estabilizar)
+    avos = pais[pais]
+    while not np.array_equal(avos, pais):
+        pais = avos
+        avos = pais[pais]
+    _, rotulos = np.unique(pais, return_inverse=True)
+    return rotulos.astype(np.int32)
+
+
+class IndiceSimilaridade:
+    """Assinaturas e grupos de quase duplicatas do banco de questões."""
+
+    def __init__(self, assinaturas: np.ndarray, grupos: np.ndarray, origem: Tuple[int, int]):
+        self.assinaturas = assinaturas
+        self.grupos = grupos
+        self.origem = origem
+        # Baldes LSH: por banda, chaves ordenadas e as questões na mesma ordem
+        self._chaves: Optional[np.ndarray] = None
+        self._membros: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.grupos)
+
+    @property
+    def num_grupos(self) -> int:
+        return int(self.grupos.max()) + 1 if len(self.grupos) else 0
+
+    def _baldes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Chaves de banda ordenadas (BANDAS x m) e as questões correspondentes."""
+        if self._chaves is None:
+            com_texto = np.flatnonzero(self.assinaturas[:, 0] != SEM_TEXTO).astype(np.int32)
+            chaves = chaves_bandas(self.assinaturas[com_texto]).T
+            ordem = np.argsort(chaves, axis=1, kind="stable")
+            self._membros = com_texto[ordem]
+            self._chaves = np.take_along_axis(chaves, ordem, axis=1)
+        return self._chaves, self._membros
+
+    def similares(
+        self,
+        indice: int,
+        limiar: float = LIMIAR_SIMILARIDADE,
+        limite: int = 20
+    ) -> List[Tuple[int, float]]:
+        """
+        Questões mais parecidas com a do índice: [(indice, similaridade)].
+
+        Só as questões que dividem algum balde LSH com ela são comparadas.
+        """
+        assinatura = self.assinaturas[indice]
+        if assinatura[0] == SEM_TEXTO:
+            return []
+        chaves, membros = self._baldes()
+        alvo = chaves_bandas(assinatura[None, :])[0]
+        inicios = [np.searchsorted(chaves[b], alvo[b], side="left") for b in range(BANDAS)]
+        fins = [np.searchsorted(chaves[b], alvo[b], side="right") for b in range(BANDAS)]
+        candidatos = np.unique(np.concatenate([
+            membros[b, inicio:fim] for b, (inicio, fim) in enumerate(zip(inicios, fins))
+        ]))
+        candidatos = candidatos[candidatos != indice]
+
+        similaridade = (self.assinaturas[candidatos] == assinatura).mean(axis=1)
+        escolhidos = np.flatnonzero(similaridade >= limiar)
+        escolhidos = escolhidos[np.argsort(-similaridade[escolhidos], kind="stable")][:limite]
+        return [(int(candidatos[i]), float(similaridade[i])) for i in escolhidos]
+
+    def grupo(self, indice: int) -> np.ndarray:
+        """Índices das questões do mesmo grupo (incluindo a própria)."""
+        return np.flatnonzero(self.grupos == self.grupos[indice])
+
+    def um_por_grupo(
+        self,
+        indices: np.ndarray,
+        rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Mantém uma questão de cada grupo entre os índices dados.
+
+        Sem rng fica a primeira de cada grupo (na ordem dada); com rng, uma
+        escolhida ao acaso. A ordem relativa dos escolhidos é preservada.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if rng is not None:
+            indices = rng.permutation(indices)
+        _, primeiros = np.unique(self.grupos[indices], return_index=True)
+        return indices[np.sort(primeiros)]
+
+
+def _assinatura_banco() -> Tuple[int, int]:
+    try:
+        st = (helpers.DATA_DIR / "questoes.json").stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def construir_indice_similaridade(
+    questoes: Optional[Iterable[Dict[str, Any]]] = None
+) -> IndiceSimilaridade:
+    """
+    Calcula assinaturas e grupos do banco e grava questoes.minhash.npz.
+
+    Sem questoes, o questoes.json é lido em streaming.
+    """
+    origem = _assinatura_banco()
+    if questoes is None:
+        from .importador_questoes import iterar_arquivo_questoes
+        questoes = iterar_arquivo_questoes(helpers.DATA_DIR / "questoes.json")
+
+    assinaturas = calcular_assinaturas(questoes)
+    grupos = agrupar(assinaturas)
+    indice = IndiceSimilaridade(assinaturas, grupos, origem)
+
+    helpers.gravar_atomico(
+        helpers.DATA_DIR / ARQUIVO_INDICE,
+        lambda f: np.savez(f, origem=np.array(origem, dtype=np.int64), assinaturas=assinaturas, grupos=grupos),
+        binario=True
+    )
+    with _LOCK:
+        _INDICES[helpers.DATA_DIR / ARQUIVO_INDICE] = indice
+    return indice
+
+
+def carregar_indice_similaridade() -> IndiceSimilaridade:
+    """Índice do banco atual, reconstruído se o questoes.json tiver mudado."""
+    caminho = helpers.DATA_DIR / ARQUIVO_INDICE
+    origem = _assinatura_banco()
+
+    with _LOCK:
+        indice = _INDICES.get(caminho)
+        if indice is None and caminho.exists():
+            with np.load(caminho, allow_pickle=False) as npz:
+                indice = IndiceSimilaridade(
+                    npz["assinaturas"], npz["grupos"], tuple(int(x) for x in npz["origem"])
+                )
+            _INDICES[caminho] = indice
+        if indice is not None and indice.origem == origem:
+            return indice
+
+    return construir_indice_similaridade()